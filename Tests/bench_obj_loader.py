@@ -0,0 +1,85 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Mesure du chargement d'un gros fichier OBJ : ancien chargeur ligne par ligne
+# (Python pur) contre le chargeur vectorisé, sur un seul processus puis avec
+# le pool de processus. Le fichier est généré une fois (sommets, coordonnées
+# de texture et faces à quatre coins) dans le dossier temporaire.
+# Lancement : python Tests/bench_obj_loader.py [nombre de lignes]
+import os  # Importer le module os
+import sys  # Importer le module sys
+import time  # Importer le module time
+import tempfile  # Importer le module tempfile
+import numpy as np  # Importer la bibliothèque NumPy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine.obj_loader import load_obj  # Importer le chargeur OBJ vectorisé
+
+RUNS = 2  # Mesures par chargeur (la meilleure est gardée)
+
+
+# Fonction pour l'ancien chargeur de main.py (une ligne à la fois)
+def load_obj_lines(filename):
+    vertices, texcoords, faces = [], [], []
+    with open(filename, "r") as file:
+        for line in file:
+            if line.startswith("v "):
+                vertices.append([float(coord) for coord in line.strip().split()[1:4]])
+            elif line.startswith("vt "):
+                texcoords.append([float(coord) for coord in line.strip().split()[1:3]])
+            elif line.startswith("f "):
+                face_vertices, face_texcoords = [], []
+                for v in line.strip().split()[1:]:
+                    v_split = v.split("/")
+                    face_vertices.append(int(v_split[0]) - 1)
+                    if len(v_split) >= 2 and v_split[1]:
+                        face_texcoords.append(int(v_split[1]) - 1)
+                if len(face_vertices) >= 3:
+                    faces.append((face_vertices[:3], face_texcoords[:3]))
+    return vertices, texcoords, faces
+
+
+# Fonction pour générer un fichier OBJ d'environ lines lignes (un tiers de chaque type)
+def generate(lines):
+    filename = os.path.join(tempfile.gettempdir(), f"virtulouvre-bench-{lines}.obj")
+    if os.path.exists(filename):
+        return filename
+    count = lines // 3
+    rng = np.random.default_rng(0)
+    with open(filename, "w") as f:
+        f.write("".join("v %.6f %.6f %.6f\n" % tuple(p) for p in rng.random((count, 3)) * 100))
+        f.write("".join("vt %.6f %.6f\n" % tuple(p) for p in rng.random((count, 2))))
+        f.write("".join(
+            "f %d/%d %d/%d %d/%d %d/%d\n" % (a, a, b, b, c, c, d, d)
+            for a, b, c, d in rng.integers(1, count + 1, (count, 4))
+        ))
+    return filename
+
+
+# Fonction pour mesurer un chargeur (meilleur temps en secondes)
+def measure(function, *args):
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Fonction principale : comparer les chargeurs
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000_000
+    filename = generate(lines)
+    cores = os.cpu_count() or 1
+    print(f"{filename} : {lines} lignes, {os.path.getsize(filename) / 1048576:.0f} Mo, {cores} cœurs")
+    reference = measure(load_obj_lines, filename)
+    print(f"{'chargeur':<28}{'s':>8}{'gain':>8}")
+    print(f"{'ligne par ligne':<28}{reference:>8.2f}{1.0:>7.1f}x")
+    for workers in sorted({1, cores}):
+        seconds = measure(load_obj, filename, workers)
+        print(f"{f'vectorisé, {workers} processus':<28}{seconds:>8.2f}{reference / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Mesure du coût d'affichage d'une image de la vidéo du menu : temps par image,
+# surfaces allouées et octets alloués côté Python/NumPy, pour l'ancien chemin
+# (make_surface + rotate) et pour les chemins sans allocation.
+# Lancement : python Tests/bench_video_blit.py [largeur] [hauteur]
+import os  # Importer le module os
+import sys  # Importer le module sys
+import time  # Importer le module time
+import tracemalloc  # Importer le suivi des allocations
+import numpy as np  # Importer la bibliothèque NumPy
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Pas besoin de fenêtre visible
+import pygame  # Importer la bibliothèque Pygame
+
+FRAMES = 200  # Nombre d'images mesurées par chemin
+
+surfaces_created = 0  # Surfaces allouées pendant la mesure
+
+
+# Fonction pour compter les surfaces créées par une fonction de pygame
+def counted(function):
+    def wrapper(*args, **kwargs):
+        global surfaces_created
+        surfaces_created += 1
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+pygame.surfarray.make_surface = counted(pygame.surfarray.make_surface)
+pygame.transform.rotate = counted(pygame.transform.rotate)
+pygame.image.frombuffer = counted(pygame.image.frombuffer)
+
+
+# Fonction pour mesurer un chemin d'affichage : (ms par image, surfaces par image, pic d'octets alloués)
+def measure(blit, frames, screen):
+    global surfaces_created
+    blit(frames[0], screen)  # Préparation (surfaces persistantes, caches)
+    surfaces_created = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        blit(frames[i % len(frames)], screen)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / FRAMES * 1000, surfaces_created / FRAMES, peak
+
+
+# Fonction pour l'ancien chemin : image (hauteur, largeur, 3) vue comme (largeur, hauteur), puis tournée
+def blit_make_surface(frame, screen):
+    surface = pygame.surfarray.make_surface(frame)  # Lignes et colonnes inversées
+    screen.blit(pygame.transform.rotate(surface, -90), (0, 0))  # Seconde surface pour les remettre
+
+
+# Fonction pour le chemin avec copie en octets (nouvelle surface à chaque image)
+def blit_frombuffer(frame, screen):
+    size = (frame.shape[1], frame.shape[0])
+    screen.blit(pygame.image.frombuffer(frame.tobytes(), size, "RGB"), (0, 0))
+
+
+persistent = {}  # Surfaces persistantes des chemins sans allocation
+
+
+# Fonction pour le chemin pixels3d : transposition faite pendant la copie dans une surface persistante
+def blit_pixels3d(frame, screen):
+    size = (frame.shape[1], frame.shape[0])
+    if "pixels3d" not in persistent:
+        persistent["pixels3d"] = pygame.Surface(size).convert()
+    surface = persistent["pixels3d"]
+    view = pygame.surfarray.pixels3d(surface)  # Vue (largeur, hauteur, 3) des pixels
+    view[...] = frame.transpose(1, 0, 2)  # Copie transposée, sans tableau intermédiaire
+    del view  # Déverrouiller la surface
+    screen.blit(surface, (0, 0))
+
+
+# Fonction pour le chemin du lecteur : surface persistante partageant ses pixels avec un tableau NumPy
+def blit_shared_buffer(frame, screen):
+    size = (frame.shape[1], frame.shape[0])
+    if "shared" not in persistent:
+        pixels = np.empty_like(frame)  # Même disposition (ligne, colonne) : aucune transposition
+        persistent["shared"] = (pixels, pygame.image.frombuffer(pixels, size, "RGB"))
+    pixels, surface = persistent["shared"]
+    np.copyto(pixels, frame)
+    screen.blit(surface, (0, 0))
+
+
+# Fonction principale : comparer les chemins à la taille demandée
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 1280
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 720
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+
+    print(f"{width}x{height}, {FRAMES} images")
+    print(f"{'chemin':<24}{'ms/image':>10}{'surfaces/image':>16}{'Ko (pic)':>12}")
+    for name, blit in (
+        ("make_surface + rotate", blit_make_surface),
+        ("frombuffer(tobytes)", blit_frombuffer),
+        ("pixels3d transposé", blit_pixels3d),
+        ("tampon partagé", blit_shared_buffer),
+    ):
+        ms, surfaces, peak = measure(blit, frames, screen)
+        print(f"{name:<24}{ms:>10.2f}{surfaces:>16.1f}{peak / 1024:>12.0f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Vérification du calcul incrémental des ensembles visibles : une scène
+# (sol et pilier) est calculée, puis une boîte est ajoutée dans un espace
+# dégagé. Le résultat incrémental doit contenir tout ce que voit un calcul
+# complet de la scène modifiée (il peut voir plus, jamais moins).
+# Lancement : python Tests/check_pvs_incremental.py
+import os  # Importer le module os
+import sys  # Importer le module sys
+import shutil  # Importer le module shutil
+import tempfile  # Importer le module tempfile
+import numpy as np  # Importer la bibliothèque NumPy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine import pvs  # Importer les ensembles potentiellement visibles
+
+
+# Fonction pour ajouter une boîte (coins min et max) aux sommets et aux faces
+def add_box(vertices, faces, low, high):
+    base = len(vertices) + 1  # Indices OBJ à partir de 1
+    for x in (low[0], high[0]):
+        for y in (low[1], high[1]):
+            for z in (low[2], high[2]):
+                vertices.append((x, y, z))
+    for quad in ((0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)):
+        faces.append([base + corner for corner in quad])
+
+
+# Fonction pour écrire une scène : sol plat découpé en dalles, pilier, et boîte facultative
+def write_scene(filename, with_box):
+    vertices, faces = [], []
+    for i in range(20):  # Sol de 80 x 80 en dalles de 4
+        for j in range(20):
+            base = len(vertices) + 1
+            vertices += [(i * 4, 0, j * 4), (i * 4, 0, j * 4 + 4), (i * 4 + 4, 0, j * 4 + 4), (i * 4 + 4, 0, j * 4)]
+            faces.append([base, base + 1, base + 2, base + 3])
+    add_box(vertices, faces, (38, 0, 38), (42, 24, 42))  # Pilier
+    if with_box:
+        add_box(vertices, faces, (12, 20, 60), (14, 22, 62))  # Petite boîte en hauteur, dans le vide
+    with open(filename, "w") as f:
+        f.write("".join("v %g %g %g\n" % vertex for vertex in vertices))
+        f.write("".join("f " + " ".join(map(str, face)) + "\n" for face in faces))
+
+
+# Fonction pour lire les groupes visibles de chaque cellule, par clé de groupe
+def visible_keys(filename):
+    header, bits = pvs._read_pvs(filename)
+    visible = np.unpackbits(np.asarray(bits), axis=1)[:, : len(header["clusters"])].astype(bool)
+    keys = [tuple(cluster["key"]) for cluster in header["clusters"]]
+    return keys, visible
+
+
+# Fonction principale : comparer le calcul incrémental et le calcul complet
+def main():
+    folder = tempfile.mkdtemp(prefix="virtulouvre-pvs-")
+    os.chdir(folder)  # Caches écrits dans le dossier temporaire
+    try:
+        model = os.path.join(folder, "scene.obj")
+        write_scene(model, False)
+        pvs.bake(model)  # Calcul complet de la scène d'origine
+        write_scene(model, True)
+        cells, baked, _ = pvs.bake(model)  # Calcul incrémental après l'ajout de la boîte
+        keys, incremental = visible_keys(model)
+
+        shutil.rmtree(pvs.CACHE_DIR)  # Calcul complet de la scène modifiée
+        pvs.bake(model)
+        full_keys, full = visible_keys(model)
+        assert keys == full_keys, "Groupes différents entre les deux calculs"
+
+        missing = full & ~incremental  # Vu par le calcul complet, oublié par l'incrémental
+        extra = incremental & ~full
+        print(f"{baked}/{cells} cellules recalculées")
+        print(f"{full.sum()} couples (cellule, groupe) visibles, {missing.sum()} oubliés, {extra.sum()} en plus")
+        if missing.any():
+            print("ÉCHEC : le calcul incrémental cache des groupes visibles")
+            sys.exit(1)
+        print("OK")
+    finally:
+        os.chdir(os.path.dirname(folder))
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Moteur de VirtuLouvre : chargement des ressources et rendu, utilisés par main.py
@@ -0,0 +1,82 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Catalogue des œuvres exposées (config/artworks.json) : position, orientation
+# et taille de chaque tableau, image et modèle 3D facultatif, image très haute
+# définition facultative. Les ressources ne sont pas chargées ici : elles sont
+# préchargées au fil de la visite (ou lues par tuiles, engine/gigapixel.py).
+import os  # Importer le module os
+import json  # Importer le module json
+import math  # Importer le module math
+import numpy as np  # Importer la bibliothèque NumPy
+
+ARTWORKS_FILE = os.path.join("config", "artworks.json")  # Catalogue des œuvres
+
+
+# Classe pour une œuvre du catalogue
+class Artwork:
+    def __init__(self, name, center, yaw=0.0, width=1.0, height=1.0, texture=None, mesh=None, gigapixel=None):
+        self.name = name  # Nom affiché dans les messages
+        self.center = np.asarray(center, dtype=np.float32)  # Centre du tableau (ou origine du modèle)
+        self.yaw = yaw  # Orientation en degrés autour de l'axe vertical
+        self.width, self.height = width, height  # Taille du tableau
+        self.texture = texture  # Image du tableau (chemin), ou None
+        self.mesh = mesh  # Modèle OBJ (chemin), ou None
+        self.gigapixel = gigapixel  # Image source de la pyramide de tuiles (chemin), ou None
+        right = np.array([math.cos(math.radians(yaw)), 0.0, -math.sin(math.radians(yaw))]) * width / 2
+        up = np.array([0.0, height / 2, 0.0])
+        self.corners = np.array(
+            [self.center - right + up, self.center + right + up,
+             self.center + right - up, self.center - right - up],
+            dtype=np.float32,
+        )  # Haut gauche, haut droit, bas droit, bas gauche
+        self.radius = math.hypot(width, height) / 2  # Rayon de la sphère englobante
+
+    # Clés des ressources de l'œuvre dans le gestionnaire des ressources OpenGL
+    def asset_key(self, kind):
+        return f"œuvre:{self.name}:{kind}"
+
+    # Ajouter le tableau au lot de primitives (texture déjà envoyée)
+    def draw(self, batch, texture_id):
+        batch.quads(
+            [self.corners],
+            (1.0, 1.0, 1.0, 1.0),
+            [(0, 1), (1, 1), (1, 0), (0, 0)],  # Image envoyée du bas vers le haut
+            texture_id,
+        )
+
+
+# Fonction pour charger le catalogue des œuvres (liste vide si le fichier manque)
+def load_artworks(filename=ARTWORKS_FILE):
+    if not os.path.exists(filename):
+        return []
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            entries = json.load(f).get("artworks", [])
+    except (OSError, ValueError) as e:  # Fichier illisible
+        print(f"Catalogue des œuvres illisible : {e}")
+        return []
+
+    artworks = []
+    for entry in entries:
+        try:
+            artwork = Artwork(
+                entry["name"],
+                entry["center"],
+                entry.get("yaw", 0.0),
+                entry.get("width", 1.0),
+                entry.get("height", 1.0),
+                entry.get("texture"),
+                entry.get("mesh"),
+                entry.get("gigapixel"),  # Seule sa pyramide de tuiles est nécessaire
+            )
+        except (KeyError, TypeError, ValueError) as e:  # Entrée incomplète
+            print(f"Œuvre ignorée dans le catalogue : {e}")
+            continue
+        missing = [path for path in (artwork.texture, artwork.mesh) if path and not os.path.exists(path)]
+        if missing:
+            print(f"Œuvre « {artwork.name} » ignorée, fichier introuvable : {', '.join(missing)}")
+            continue
+        artworks.append(artwork)
+    return artworks
@@ -0,0 +1,117 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Chargement asynchrone des ressources : les fils de travail lisent et décodent
+# les fichiers, le fil principal ne fait que les envois OpenGL.
+import os  # Importer le module os
+import time  # Importer le module time
+import queue  # Importer le module queue pour la file des tâches
+import threading  # Importer le module threading
+from concurrent.futures import Future  # Importer les résultats différés
+
+DECODE_SHARE = 0.8  # Part de la progression attribuée au décodage (le reste à l'envoi)
+
+
+# Classe pour charger un ensemble de ressources en arrière-plan
+class AssetLoader:
+    def __init__(self, workers=None, throttle=0.0):
+        self.throttle = throttle  # Pause entre deux décodages (préchargement discret)
+        self.tasks = queue.Queue()  # Décodages en attente
+        self.jobs = []  # Ressources à charger, dans l'ordre d'ajout
+        self.results = {}  # Résultat de l'envoi de chaque ressource, par nom
+        self.cancelled = False  # Chargement annulé
+        # Fils démons : quitter le programme n'attend jamais la fin d'un décodage
+        self.threads = [
+            threading.Thread(target=self._work, name=f"chargement-{i}", daemon=True)
+            for i in range(workers or min(4, os.cpu_count() or 1))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    # Boucle d'un fil de travail : décoder les ressources une par une
+    def _work(self):
+        while True:
+            task = self.tasks.get()  # Attendre la prochaine tâche
+            if task is None:  # Signal d'arrêt
+                return
+            future, decode, filename = task
+            if not future.set_running_or_notify_cancel():  # Tâche annulée
+                continue
+            try:
+                future.set_result(decode(filename))  # Lecture et décodage
+            except BaseException as e:  # L'erreur sera relancée par poll()
+                future.set_exception(e)
+            if self.throttle:
+                time.sleep(self.throttle)  # Laisser le fil principal respirer
+
+    # Ajouter une ressource : decode(filename) tourne dans un fil, upload(data) sur le fil principal
+    def add(self, name, filename, decode, upload):
+        future = Future()  # Résultat du décodage
+        self.tasks.put((future, decode, filename))
+        self.jobs.append(
+            {
+                "name": name,  # Nom de la ressource
+                "size": os.path.getsize(filename) if os.path.exists(filename) else 0,
+                "future": future,  # Décodage en cours
+                "upload": upload,  # Envoi à la carte graphique
+                "uploaded": False,  # Envoi terminé
+            }
+        )
+
+    # Envoyer les ressources décodées, dans la limite de temps donnée (fil principal)
+    def poll(self, budget=0.008):
+        start = time.perf_counter()  # Démarrer le chronomètre
+        for job in self.jobs:
+            if job["uploaded"] or not job["future"].done():
+                continue
+            data = job["future"].result()  # Relance l'erreur éventuelle du décodage
+            self.results[job["name"]] = job["upload"](data)  # Envoi OpenGL
+            job["uploaded"] = True
+            job["future"] = None  # Libérer les données décodées
+            if time.perf_counter() - start >= budget:  # Laisser la main à l'affichage
+                break
+
+    # Vérifier si toutes les ressources sont prêtes
+    def done(self):
+        return all(job["uploaded"] for job in self.jobs)
+
+    # Calculer la progression réelle (pondérée par la taille des fichiers)
+    def progress(self):
+        total = sum(max(job["size"], 1) for job in self.jobs)  # Travail total
+        if not total:
+            return 1.0
+        completed = 0.0  # Travail terminé
+        for job in self.jobs:
+            if job["uploaded"]:
+                completed += max(job["size"], 1)
+            elif job["future"].done():
+                completed += max(job["size"], 1) * DECODE_SHARE
+        return completed / total
+
+    # Récupérer le nombre de ressources et d'octets déjà chargés
+    def stats(self):
+        finished = [job for job in self.jobs if job["uploaded"]]  # Ressources prêtes
+        return {
+            "done": len(finished),
+            "total": len(self.jobs),
+            "bytes_loaded": sum(
+                job["size"]
+                for job in self.jobs
+                if job["uploaded"] or job["future"].done()
+            ),
+            "bytes_total": sum(job["size"] for job in self.jobs),
+        }
+
+    # Annuler les décodages qui n'ont pas commencé (fermeture de la fenêtre)
+    def cancel(self):
+        self.cancelled = True
+        for job in self.jobs:
+            if job["future"] is not None:
+                job["future"].cancel()
+        self.close()
+
+    # Arrêter les fils de travail une fois leurs tâches terminées
+    def close(self):
+        for _ in self.threads:
+            self.tasks.put(None)  # Un signal d'arrêt par fil
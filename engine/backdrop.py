@@ -0,0 +1,76 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Arrière-plan figé du menu pause : la scène est capturée une seule fois à
+# l'ouverture du menu, réduite et floutée, puis affichée à la place du rendu 3D.
+import cv2  # Importer la bibliothèque OpenCV
+import numpy as np  # Importer la bibliothèque NumPy
+from OpenGL.GL import *  # Importer les fonctions OpenGL
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+
+DOWNSAMPLE = 4  # Facteur de réduction avant le flou
+BLUR_KERNEL = (7, 7)  # Noyau du flou gaussien sur l'image réduite (≈ 21x21 en pleine taille)
+
+
+# Classe pour l'image figée affichée derrière les menus
+class FrozenBackdrop:
+    def __init__(self):
+        self.texture = None  # Texture de l'image capturée
+        self.size = None  # Taille de l'écran capturé
+        self.ready = False  # Vrai tant que l'image capturée est valable
+
+    # Capturer l'image affichée (à appeler juste après le rendu de la scène)
+    def capture(self, width, height, blur=True):
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE)  # Lignes du bas vers le haut
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+        if blur:  # Réduire puis flouter : le flou coûte DOWNSAMPLE² fois moins cher
+            pixels = cv2.resize(
+                pixels,
+                (max(1, width // DOWNSAMPLE), max(1, height // DOWNSAMPLE)),
+                interpolation=cv2.INTER_AREA,
+            )
+            pixels = cv2.GaussianBlur(pixels, BLUR_KERNEL, 0)  # Flou séparable (lignes puis colonnes)
+        pixels = np.ascontiguousarray(pixels)
+
+        if self.texture is None:
+            self.texture = registry.texture("arrière-plan")
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)  # Agrandissement lissé
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(
+            GL_TEXTURE_2D, 0, GL_RGBA, pixels.shape[1], pixels.shape[0], 0,
+            GL_RGBA, GL_UNSIGNED_BYTE, pixels,
+        )
+        registry.set_bytes("texture", self.texture, pixels.nbytes)
+        self.size = (width, height)
+        self.ready = True
+
+    # Ajouter l'image figée au lot de primitives (projection orthographique, y vers le bas)
+    def draw(self, batch):
+        if not self.ready:
+            return
+        width, height = self.size
+        batch.quads(
+            [[(0, 0), (width, 0), (width, height), (0, height)]],
+            (1.0, 1.0, 1.0, 1.0),
+            [(0, 1), (1, 1), (1, 0), (0, 0)],  # Lignes lues du bas vers le haut
+            self.texture,
+        )
+
+    # Abandonner l'image capturée (retour au jeu) ; la texture est gardée pour la prochaine pause
+    def clear(self):
+        self.ready = False
+
+    # Libérer la texture (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        if self.texture is not None:
+            if delete:
+                registry.delete_texture(self.texture)
+            else:
+                registry.forget("texture", self.texture)
+        self.texture, self.ready = None, False
@@ -0,0 +1,183 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Dessin par lots des primitives simples (sol, viseur, barres, rectangles
+# arrondis) : les sommets sont ajoutés dans des tableaux NumPy pendant l'image,
+# puis envoyés en une fois et dessinés avec un appel par état OpenGL.
+import ctypes  # Importer ctypes pour les décalages dans le tampon
+import numpy as np  # Importer la bibliothèque NumPy
+from OpenGL.GL import *  # Importer les fonctions OpenGL
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+
+BATCH_VERTEX_SIZE = 9  # Flottants par sommet : x, y, z, u, v, r, g, b, a
+BATCH_STRIDE = BATCH_VERTEX_SIZE * 4  # Taille d'un sommet en octets
+CORNER_SEGMENTS = 8  # Segments par quart de cercle des rectangles arrondis
+
+# Quarts de cercle unité précalculés : (coin, point, cos/sin), dans l'ordre
+# haut gauche, haut droit, bas droit, bas gauche (y vers le bas)
+_angles = np.linspace(0.0, np.pi / 2, CORNER_SEGMENTS + 1)
+CORNER_TABLE = np.stack(
+    [
+        np.stack((np.cos(_angles + start), np.sin(_angles + start)), axis=1)
+        for start in (np.pi, 1.5 * np.pi, 0.0, 0.5 * np.pi)
+    ]
+).astype(np.float32)
+# Index des triangles (centre, point i, point i + 1) de chaque éventail
+_fan = np.arange(CORNER_SEGMENTS)
+FAN_INDEX = np.stack((np.zeros_like(_fan), _fan + 1, _fan + 2), axis=1).reshape(-1)
+
+
+# Classe pour un tableau de sommets qui s'agrandit au besoin
+class _VertexArray:
+    def __init__(self, capacity=256):
+        self.data = np.empty((capacity, BATCH_VERTEX_SIZE), dtype=np.float32)
+        self.count = 0  # Nombre de sommets utilisés
+
+    # Réserver n sommets et retourner la vue correspondante
+    def reserve(self, n):
+        if self.count + n > len(self.data):  # Doubler la capacité
+            grown = np.empty(
+                (max(len(self.data) * 2, self.count + n), BATCH_VERTEX_SIZE), dtype=np.float32
+            )
+            grown[: self.count] = self.data[: self.count]
+            self.data = grown
+        view = self.data[self.count : self.count + n]
+        self.count += n
+        return view
+
+
+# Classe pour accumuler des primitives et les dessiner par état OpenGL
+class PrimitiveBatch:
+    def __init__(self):
+        self.buckets = {}  # (mode, texture, épaisseur) -> sommets, dans l'ordre d'ajout
+        self.spare = {}  # Tableaux des lots déjà dessinés, réutilisés à l'image suivante
+        self.vbo = None  # Tampon des sommets, réutilisé d'une image à l'autre
+        self.vbo_size = 0  # Taille du tampon en octets
+
+    # Ajouter des sommets (positions (n, 2) ou (n, 3), coordonnées de texture (n, 2) facultatives)
+    def _append(self, mode, positions, color, texcoords=None, texture=None, width=1.0):
+        positions = np.asarray(positions, dtype=np.float32).reshape(len(positions), -1)
+        key = (mode, texture, width)
+        bucket = self.buckets.get(key)
+        if bucket is None:  # Nouvel état : l'ordre d'ajout donne l'ordre de dessin
+            bucket = self.buckets[key] = self.spare.pop(key, None) or _VertexArray()
+        view = bucket.reserve(len(positions))
+        view[:, : positions.shape[1]] = positions
+        view[:, positions.shape[1] : 3] = 0.0  # z = 0 en 2D
+        view[:, 3:5] = 0.0 if texcoords is None else texcoords
+        view[:, 5:9] = (*color, 1.0)[:4] if len(color) == 3 else color
+
+    # Ajouter des triangles : tableau (n, 3, 2 ou 3)
+    def triangles(self, triangles, color, texcoords=None, texture=None):
+        triangles = np.asarray(triangles, dtype=np.float32)
+        self._append(
+            GL_TRIANGLES,
+            triangles.reshape(-1, triangles.shape[-1]),
+            color,
+            None if texcoords is None else np.asarray(texcoords, np.float32).reshape(-1, 2),
+            texture,
+        )
+
+    # Ajouter des quadrilatères : tableau (n, 4, 2 ou 3), coins dans l'ordre du contour
+    def quads(self, quads, color, texcoords=None, texture=None):
+        quads = np.asarray(quads, dtype=np.float32)
+        order = [0, 1, 2, 0, 2, 3]  # Deux triangles par quadrilatère
+        uvs = None
+        if texcoords is not None:
+            uvs = np.broadcast_to(
+                np.asarray(texcoords, np.float32), quads.shape[:2] + (2,)
+            )[:, order]
+        self.triangles(quads[:, order], color, uvs, texture)
+
+    # Ajouter un rectangle 2D
+    def rect(self, x, y, width, height, color):
+        self.quads(
+            [[(x, y), (x + width, y), (x + width, y + height), (x, y + height)]], color
+        )
+
+    # Ajouter des segments : tableau (n, 2, 2 ou 3)
+    def lines(self, lines, color, width=1.0):
+        lines = np.asarray(lines, dtype=np.float32)
+        self._append(GL_LINES, lines.reshape(-1, lines.shape[-1]), color, width=width)
+
+    # Ajouter un rectangle 2D aux coins arrondis (y vers le bas)
+    def rounded_rect(self, x, y, width, height, radius, color):
+        if width <= 0 or height <= 0:
+            return
+        radius = min(radius, width / 2, height / 2)  # Le rayon ne dépasse pas le rectangle
+        left, top = x + radius, y + radius  # Centres des coins
+        right, bottom = x + width - radius, y + height - radius
+        self.quads(
+            [
+                [(left, y), (right, y), (right, y + height), (left, y + height)],  # Corps
+                [(x, top), (left, top), (left, bottom), (x, bottom)],  # Bord gauche
+                [(right, top), (x + width, top), (x + width, bottom), (right, bottom)],  # Bord droit
+            ],
+            color,
+        )
+        centers = np.array(
+            [(left, top), (right, top), (right, bottom), (left, bottom)], dtype=np.float32
+        )
+        fans = np.empty((4, CORNER_SEGMENTS + 2, 2), dtype=np.float32)
+        fans[:, 0] = centers  # Centre de chaque éventail
+        fans[:, 1:] = centers[:, None] + CORNER_TABLE * radius  # Arc de chaque coin
+        self.triangles(fans[:, FAN_INDEX].reshape(-1, 3, 2), color)
+
+    # Dessiner tous les lots : un envoi du tampon et un appel de dessin par état
+    def flush(self):
+        buckets = [(key, bucket.count) for key, bucket in self.buckets.items() if bucket.count]
+        if not buckets:
+            return
+        data = np.concatenate(
+            [self.buckets[key].data[:count] for key, count in buckets]
+        )
+        for key, bucket in self.buckets.items():  # Garder les tableaux pour l'image suivante
+            bucket.count = 0
+            self.spare[key] = bucket
+        self.buckets = {}
+
+        if self.vbo is None:
+            self.vbo = registry.buffer("primitives")
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        if data.nbytes > self.vbo_size:  # Agrandir le tampon
+            self.vbo_size = max(data.nbytes, self.vbo_size * 2)
+            glBufferData(GL_ARRAY_BUFFER, self.vbo_size, None, GL_STREAM_DRAW)
+            registry.set_bytes("buffer", self.vbo, self.vbo_size)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)  # Un seul envoi
+
+        glPushAttrib(GL_ENABLE_BIT | GL_LINE_BIT)  # Sauvegarder les états modifiés
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, BATCH_STRIDE, None)
+        glTexCoordPointer(2, GL_FLOAT, BATCH_STRIDE, ctypes.c_void_p(3 * 4))
+        glColorPointer(4, GL_FLOAT, BATCH_STRIDE, ctypes.c_void_p(5 * 4))
+        first = 0
+        for (mode, texture, width), count in buckets:  # Un appel par état
+            if texture is None:
+                glDisable(GL_TEXTURE_2D)
+            else:
+                glEnable(GL_TEXTURE_2D)
+                glBindTexture(GL_TEXTURE_2D, texture)
+            if mode == GL_LINES:
+                glLineWidth(width)
+            glDrawArrays(mode, first, count)
+            first += count
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopAttrib()  # Restaurer les états
+        glColor4f(1.0, 1.0, 1.0, 1.0)  # Le tableau de couleurs laisse la couleur courante indéfinie
+
+    # Libérer le tampon (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        if self.vbo is not None:
+            if delete:
+                registry.delete_buffers(self.vbo)
+            else:
+                registry.forget("buffer", self.vbo)
+        self.buckets, self.spare = {}, {}
+        self.vbo, self.vbo_size = None, 0
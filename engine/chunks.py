@@ -0,0 +1,120 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Découpage spatial des maillages : les triangles sont rangés par case d'une
+# grille posée sur leurs centres, chaque bloc garde sa plage d'indices et sa
+# boîte englobante. À chaque image, les boîtes sont testées contre la pyramide
+# de vue en une seule opération NumPy et seuls les blocs visibles sont
+# dessinés, du plus proche au plus lointain.
+import numpy as np  # Importer la bibliothèque NumPy
+
+CHUNK_TRIANGLES = 2048  # Nombre moyen de triangles visé par bloc
+
+
+# Classe pour les blocs d'un maillage (indices rangés bloc par bloc)
+class MeshChunks:
+    def __init__(self, first, count, mins, maxs):
+        self.first = np.asarray(first, dtype=np.int64)  # Premier indice de chaque bloc
+        self.count = np.asarray(count, dtype=np.int64)  # Nombre d'indices de chaque bloc
+        self.mins = np.asarray(mins, dtype=np.float64).reshape(-1, 3)  # Coins minimaux des boîtes
+        self.maxs = np.asarray(maxs, dtype=np.float64).reshape(-1, 3)  # Coins maximaux des boîtes
+        self.total_triangles = int(self.count.sum()) // 3  # Triangles du maillage
+        self.last = {"chunks": 0, "triangles": 0}  # Blocs et triangles dessinés à la dernière image
+        self.frames = 0  # Images comptées
+        self.drawn = 0  # Triangles dessinés depuis le début
+        self.fewest = None  # Moins de triangles dessinés en une image
+        self.most = 0  # Plus de triangles dessinés en une image
+
+    # Convertir les blocs pour l'en-tête JSON du cache des maillages
+    def to_header(self):
+        return {
+            "first": self.first.tolist(),
+            "count": self.count.tolist(),
+            "min": self.mins.tolist(),
+            "max": self.maxs.tolist(),
+        }
+
+    # Relire les blocs depuis l'en-tête du cache
+    @classmethod
+    def from_header(cls, data):
+        return cls(data["first"], data["count"], data["min"], data["max"])
+
+    # Blocs (parmi candidates, par défaut tous) dont la boîte touche l'intérieur de tous les plans (n, 4)
+    def cull(self, planes, candidates=None):
+        if candidates is None:
+            candidates = np.arange(len(self.first))
+        normals = planes[:, :3]
+        # Coin de chaque boîte le plus avancé du côté intérieur de chaque plan : (blocs, plans, 3)
+        corners = np.where(normals[None] >= 0, self.maxs[candidates, None], self.mins[candidates, None])
+        inside = np.all(np.einsum("npk,pk->np", corners, normals) + planes[:, 3] >= 0, axis=1)
+        return candidates[inside]
+
+    # Ranger des blocs du plus proche de l'œil au plus lointain
+    def sort(self, indices, eye):
+        eye = np.asarray(eye, dtype=np.float64)
+        closest = np.clip(eye, self.mins[indices], self.maxs[indices])  # Point de la boîte le plus proche
+        return indices[np.argsort(np.linalg.norm(closest - eye, axis=1), kind="stable")]
+
+    # Compter les blocs et triangles dessinés à cette image
+    def record(self, order):
+        triangles = int(self.count[order].sum()) // 3
+        self.last = {"chunks": len(order), "triangles": triangles}
+        self.frames += 1
+        self.drawn += triangles
+        self.fewest = triangles if self.fewest is None else min(self.fewest, triangles)
+        self.most = max(self.most, triangles)
+
+    # Blocs visibles dans la pyramide de vue (plans (6, 4)), du plus proche de l'œil au plus lointain
+    def visible(self, planes, eye):
+        order = self.sort(self.cull(planes), eye)
+        self.record(order)
+        return order
+
+    # Plages d'indices (premier, nombre) des blocs donnés, dans leur ordre
+    def ranges(self, order):
+        return zip(self.first[order].tolist(), self.count[order].tolist())
+
+    # Récupérer les statistiques de dessin
+    def stats(self):
+        return {
+            "chunks": len(self.first),
+            "triangles": self.total_triangles,
+            "frames": self.frames,
+            "average": self.drawn / self.frames if self.frames else 0.0,
+            "fewest": self.fewest or 0,
+            "most": self.most,
+            **{f"last_{key}": value for key, value in self.last.items()},
+        }
+
+
+# Fonction pour découper un maillage indexé en blocs ; retourne les indices rangés par bloc et les blocs
+def build_chunks(interleaved, indices, chunk_triangles=CHUNK_TRIANGLES):
+    triangles = np.asarray(indices).reshape(-1, 3)
+    if not len(triangles):
+        return indices, MeshChunks([], [], [], [])
+    corners = np.asarray(interleaved)[:, :3][triangles]  # Positions des coins : (triangles, 3, 3)
+    centers = corners.mean(axis=1)  # Centres des triangles
+    low = centers.min(axis=0)
+    extent = centers.max(axis=0) - low
+
+    # Cases de taille égale sur les axes non plats, en nombre proportionnel au maillage
+    cells = max(1, round(len(triangles) / chunk_triangles))
+    active = extent > extent.max() * 1e-3  # Axes où le maillage s'étend
+    if active.any():
+        side = (np.prod(extent[active]) / cells) ** (1.0 / active.sum())  # Côté d'une case
+        dims = np.where(active, np.maximum(np.ceil(extent / side), 1), 1).astype(np.int64)
+    else:  # Tous les triangles au même endroit
+        dims = np.ones(3, dtype=np.int64)
+    cell = np.clip(
+        ((centers - low) / np.where(active, extent, 1.0) * dims).astype(np.int64), 0, dims - 1
+    )
+    keys = (cell[:, 0] * dims[1] + cell[:, 1]) * dims[2] + cell[:, 2]  # Numéro de case
+
+    order = np.argsort(keys, kind="stable")  # Triangles rangés case par case
+    _, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    ordered = corners[order]
+    mins = np.minimum.reduceat(ordered.min(axis=1), starts)  # Boîte de chaque bloc
+    maxs = np.maximum.reduceat(ordered.max(axis=1), starts)
+    chunks = MeshChunks(starts * 3, counts * 3, mins, maxs)
+    return np.ascontiguousarray(triangles[order].reshape(-1)), chunks
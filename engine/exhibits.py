@@ -0,0 +1,225 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Écrans vidéo du musée : chaque écran lit sa vidéo dans un fil de travail
+# (VideoStream) et envoie ses images à une texture par deux tampons de pixels
+# (GL_PIXEL_UNPACK_BUFFER) utilisés à tour de rôle, pour que le fil de rendu
+# n'attende jamais la fin d'une copie. Les écrans sont décrits dans
+# config/screens.json.
+import os  # Importer le module os
+import json  # Importer le module json
+import ctypes  # Importer ctypes pour les copies dans les tampons
+import math  # Importer le module math
+import numpy as np  # Importer la bibliothèque NumPy
+from OpenGL.GL import *  # Importer les fonctions OpenGL
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+from engine.video import VideoStream  # Importer la lecture de vidéo en arrière-plan
+from engine.frustum import player_frustum, spheres_visible  # Importer les tests de visibilité
+
+SCREENS_FILE = os.path.join("config", "screens.json")  # Écrans vidéo du musée
+SCREEN_VIDEO_SIZE = (640, 360)  # Taille des images envoyées aux écrans
+MAX_PLAY_DISTANCE = 40.0  # Au-delà, la vidéo d'un écran est mise en pause
+MAX_UPLOADS_PER_FRAME = 2  # Envois de texture par image, répartis entre les écrans visibles
+
+
+# Fonction pour charger les écrans vidéo : liste de (fichier, centre, lacet en degrés, largeur),
+# vide si le fichier manque
+def load_screens(filename=SCREENS_FILE):
+    if not os.path.exists(filename):
+        return []
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            entries = json.load(f).get("screens", [])
+    except (OSError, ValueError) as e:  # Fichier illisible
+        print(f"Liste des écrans vidéo illisible : {e}")
+        return []
+
+    screens = []
+    for entry in entries:
+        try:
+            screen = (
+                entry["video"],
+                tuple(float(value) for value in entry["center"]),
+                float(entry.get("yaw", 0.0)),
+                float(entry.get("width", 4.0)),
+            )
+        except (KeyError, TypeError, ValueError) as e:  # Entrée incomplète
+            print(f"Écran vidéo ignoré : {e}")
+            continue
+        if len(screen[1]) != 3:
+            print(f"Écran vidéo ignoré, centre invalide : {entry['center']}")
+            continue
+        if not os.path.exists(screen[0]):
+            print(f"Écran vidéo ignoré, fichier introuvable : {screen[0]}")
+            continue
+        screens.append(screen)
+    return screens
+
+
+# Classe pour un écran vidéo placé dans le musée
+class VideoScreen:
+    def __init__(self, open_capture, filename, center, yaw, width, size=SCREEN_VIDEO_SIZE):
+        self.stream = VideoStream(open_capture, filename, size, buffer_size=4)
+        self.size = tuple(size)  # Taille des images (largeur, hauteur)
+        self.center = np.asarray(center, dtype=np.float32)  # Centre de l'écran
+        height = width * self.size[1] / self.size[0]  # Hauteur au format de la vidéo
+        right = np.array([math.cos(math.radians(yaw)), 0.0, -math.sin(math.radians(yaw))])
+        up = np.array([0.0, height / 2, 0.0])
+        right = right * width / 2
+        self.corners = np.array(
+            [self.center - right + up, self.center + right + up,
+             self.center + right - up, self.center - right - up],
+            dtype=np.float32,
+        )  # Haut gauche, haut droit, bas droit, bas gauche
+        self.radius = math.hypot(width, height) / 2  # Rayon de la sphère englobante
+        self.texture = None  # Texture affichée
+        self.pbos = None  # Deux tampons de pixels utilisés à tour de rôle
+        self.pbo_index = 0  # Tampon rempli à la prochaine image
+        self.pending = False  # Un tampon rempli attend d'être copié dans la texture
+        self.ready = False  # La texture contient au moins une image
+        self.uploads = 0  # Images envoyées à la carte graphique
+
+    # Créer la texture et les tampons de pixels
+    def _create(self):
+        width, height = self.size
+        nbytes = width * height * 3
+        self.texture = registry.texture("écrans vidéo")
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, None)
+        registry.set_bytes("texture", self.texture, nbytes)
+        self.pbos = [registry.buffer("écrans vidéo"), registry.buffer("écrans vidéo")]
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, nbytes, None, GL_STREAM_DRAW)
+            registry.set_bytes("buffer", pbo, nbytes)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+    # Envoyer l'image due : copie du tampon rempli à l'image précédente vers la texture,
+    # puis écriture de la nouvelle image dans l'autre tampon (retourne True si une image est prise)
+    def upload(self, now=None):
+        pixels = self.stream.pixels(now)
+        if pixels is None and not self.pending:
+            return False
+        if self.texture is None:
+            self._create()
+        width, height = self.size
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)  # Lignes RGB non alignées sur 4 octets
+        if self.pending:  # Copie asynchrone côté carte graphique, depuis le tampon déjà rempli
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pbos[1 - self.pbo_index])
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexSubImage2D(
+                GL_TEXTURE_2D, 0, 0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE, ctypes.c_void_p(0)
+            )
+            self.pending, self.ready = False, True
+        if pixels is not None:  # Écrire la nouvelle image dans l'autre tampon
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pbos[self.pbo_index])
+            # Abandonner l'ancien contenu du tampon : pas d'attente si la carte le lit encore
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, pixels.nbytes, None, GL_STREAM_DRAW)
+            address = glMapBuffer(GL_PIXEL_UNPACK_BUFFER, GL_WRITE_ONLY)
+            if address:
+                ctypes.memmove(address, pixels.ctypes.data, pixels.nbytes)
+                glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+                self.pbo_index = 1 - self.pbo_index
+                self.pending = True
+                self.uploads += 1
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        return pixels is not None
+
+    # Ajouter l'écran au lot de primitives (coordonnées du monde)
+    def draw(self, batch):
+        if self.ready:
+            batch.quads(
+                [self.corners],
+                (1.0, 1.0, 1.0, 1.0),
+                [(0, 0), (1, 0), (1, 1), (0, 1)],  # Première ligne de la vidéo en haut
+                self.texture,
+            )
+        else:  # Pas encore d'image : écran noir
+            batch.quads([self.corners], (0.0, 0.0, 0.0, 1.0))
+
+    # Libérer la texture et les tampons (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        if self.texture is not None:
+            if delete:
+                registry.delete_texture(self.texture)
+                registry.delete_buffers(*self.pbos)
+            else:
+                registry.forget("texture", self.texture)
+                for pbo in self.pbos:
+                    registry.forget("buffer", pbo)
+        self.texture, self.pbos = None, None
+        self.pbo_index, self.pending, self.ready = 0, False, False
+
+
+# Classe pour l'ensemble des écrans vidéo du musée
+class VideoScreens:
+    def __init__(self):
+        self.screens = []  # Écrans ouverts
+        self.visible = np.zeros(0, dtype=bool)  # Écrans visibles à la dernière image
+        self.next_upload = 0  # Premier écran servi à la prochaine image (tour de rôle)
+
+    # Ouvrir les écrans décrits par (fichier, centre, lacet en degrés, largeur)
+    def open(self, open_capture, exhibits):
+        if self.screens:
+            return
+        self.screens = [
+            VideoScreen(open_capture, filename, center, yaw, width)
+            for filename, center, yaw, width in exhibits
+        ]
+
+    # Mettre en pause les écrans invisibles ou lointains, envoyer les images des autres
+    def update(self, player):
+        if not self.screens:
+            return
+        centers = np.array([screen.center for screen in self.screens])
+        radii = np.array([screen.radius for screen in self.screens])
+        near = np.linalg.norm(centers - player.position, axis=1) - radii <= MAX_PLAY_DISTANCE
+        visible = self.visible = near & spheres_visible(player_frustum(player), centers, radii)
+
+        budget = MAX_UPLOADS_PER_FRAME  # Les écrans servis en premier changent à chaque image
+        count = len(self.screens)
+        for offset in range(count):
+            index = (self.next_upload + offset) % count
+            screen = self.screens[index]
+            if not visible[index]:
+                screen.stream.pause()  # Plus de décodage hors de vue
+                continue
+            screen.stream.resume()
+            if budget and screen.upload():
+                budget -= 1
+                self.next_upload = (index + 1) % count
+
+    # Ajouter les écrans visibles au lot de primitives
+    def draw(self, batch):
+        for screen, visible in zip(self.screens, self.visible):
+            if visible:
+                screen.draw(batch)
+
+    # Pause de tous les écrans (menus du jeu)
+    def pause(self):
+        for screen in self.screens:
+            screen.stream.pause()
+
+    # Récupérer les statistiques des écrans
+    def stats(self):
+        return [
+            {**screen.stream.stats(), "uploads": screen.uploads} for screen in self.screens
+        ]
+
+    # Libérer les textures et tampons (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        for screen in self.screens:
+            screen.release(delete)
+
+    # Arrêter les fils de lecture
+    def close(self):
+        for screen in self.screens:
+            screen.stream.close()
+        self.screens, self.visible = [], np.zeros(0, dtype=bool)
@@ -0,0 +1,67 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Pyramide de vue de la caméra : matrices équivalentes à gluPerspective et
+# gluLookAt calculées avec NumPy, plans extraits de leur produit, et tests de
+# visibilité de sphères sans lecture de l'état OpenGL.
+import math  # Importer le module math
+import numpy as np  # Importer la bibliothèque NumPy
+
+
+# Fonction pour calculer la matrice de gluPerspective (fov vertical en degrés)
+def perspective_matrix(fov, aspect, near, far):
+    f = 1.0 / math.tan(math.radians(fov) / 2)
+    return np.array(
+        [
+            [f / aspect, 0.0, 0.0, 0.0],
+            [0.0, f, 0.0, 0.0],
+            [0.0, 0.0, (far + near) / (near - far), 2 * far * near / (near - far)],
+            [0.0, 0.0, -1.0, 0.0],
+        ],
+        dtype=np.float64,
+    )
+
+
+# Fonction pour calculer la matrice de gluLookAt
+def look_at_matrix(eye, target, up):
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    upward = np.cross(side, forward)
+    matrix = np.identity(4)
+    matrix[0, :3], matrix[1, :3], matrix[2, :3] = side, upward, -forward
+    matrix[:3, 3] = -matrix[:3, :3] @ eye  # Translation de la caméra
+    return matrix
+
+
+# Fonction pour extraire les 6 plans (a, b, c, d) normalisés d'une matrice projection x vue
+def frustum_planes(matrix):
+    rows = np.asarray(matrix, dtype=np.float64)
+    planes = np.array(
+        [
+            rows[3] + rows[0],  # Gauche
+            rows[3] - rows[0],  # Droite
+            rows[3] + rows[1],  # Bas
+            rows[3] - rows[1],  # Haut
+            rows[3] + rows[2],  # Proche
+            rows[3] - rows[2],  # Éloigné
+        ]
+    )
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+
+# Fonction pour obtenir les plans de la pyramide de vue du joueur
+def player_frustum(player):
+    projection = perspective_matrix(player.fov, player.aspect, player.near, player.far)
+    view = look_at_matrix(player.position, player.position + player.front, player.up)
+    return frustum_planes(projection @ view)
+
+
+# Fonction pour tester des sphères (centres (n, 3), rayons (n,)) : tableau de booléens
+def spheres_visible(planes, centers, radii):
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    distances = centers @ planes[:, :3].T + planes[:, 3]  # (n, 6) distances signées
+    return np.all(distances >= -np.asarray(radii, dtype=np.float64).reshape(-1, 1), axis=1)
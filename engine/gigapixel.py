@@ -0,0 +1,361 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Œuvres très haute définition : à chaque image, seules les tuiles de la
+# pyramide (engine/tile_pyramid.py) dont le niveau correspond à la taille de
+# l'œuvre à l'écran sont demandées. Elles sont lues dans des fils de travail et
+# rangées dans une texture de tuiles de taille fixe, dont la place la moins
+# récemment utilisée est réattribuée ; en attendant, la tuile plus grossière
+# déjà présente est affichée. Le mode inspection rapproche la vue (champ de
+# vision réduit) sur l'œuvre visée par le viseur.
+import math  # Importer le module math
+import time  # Importer le module time
+import queue  # Importer le module queue pour la file des lectures
+import threading  # Importer le module threading
+from collections import OrderedDict  # Importer le dictionnaire ordonné (ordre d'utilisation)
+from concurrent.futures import Future  # Importer les résultats différés
+import numpy as np  # Importer la bibliothèque NumPy
+from OpenGL.GL import *  # Importer les fonctions OpenGL
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+from engine.frustum import player_frustum, spheres_visible  # Importer les tests de visibilité
+from engine.tile_pyramid import open_pyramid, TILE_SIZE, BORDER, STEP  # Importer les pyramides de tuiles
+
+ATLAS_SIZE = 4096  # Taille de la texture de tuiles (256 places de 256 pixels, 64 Mo)
+MAX_PENDING = 16  # Lectures de tuiles en attente au plus
+UPLOAD_BUDGET = 0.004  # Temps maximal d'envoi des tuiles par image (s)
+DETAIL = 1.0  # Un niveau plus fin est demandé dès qu'un pixel de l'image couvre plus de DETAIL pixels de l'écran
+INSPECT_DISTANCE = 15.0  # Distance maximale pour inspecter une œuvre visée
+MAX_ZOOM = 64.0  # Grossissement maximal en inspection
+ZOOM_STEP = 1.25  # Grossissement par cran de la molette
+
+
+# Classe pour la texture de tuiles : places de taille fixe, réattribuées par ordre d'utilisation
+class TileCache:
+    def __init__(self, size=ATLAS_SIZE):
+        self.size = size  # Taille de la texture
+        self.per_row = size // TILE_SIZE  # Places par ligne
+        self.capacity = self.per_row * self.per_row  # Nombre de places
+        self.texture = None  # Texture créée au premier envoi
+        self.slots = OrderedDict()  # Tuile -> place, de la moins à la plus récemment utilisée
+        self.last_used = {}  # Tuile -> dernière image où elle a servi
+        self.free = list(range(self.capacity - 1, -1, -1))  # Places libres
+        self.frame = 0  # Numéro de l'image en cours
+        self.counters = {"uploads": 0, "evictions": 0}
+
+    # Créer la texture (une seule allocation, quel que soit le grossissement)
+    def _create(self):
+        self.texture = registry.texture("tuiles")
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)  # Le niveau est choisi par tuile
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, self.size, self.size, 0, GL_RGB, GL_UNSIGNED_BYTE, None)
+        registry.set_bytes("texture", self.texture, self.size * self.size * 4)
+
+    # Récupérer la place d'une tuile (None si absente) et la marquer comme utilisée
+    def get(self, key):
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.slots.move_to_end(key)
+            self.last_used[key] = self.frame
+        return slot
+
+    # Origine d'une place dans la texture (pixels)
+    def origin(self, slot):
+        return (slot % self.per_row) * TILE_SIZE, (slot // self.per_row) * TILE_SIZE
+
+    # Ranger une tuile, en réattribuant la place la moins récemment utilisée ;
+    # retourne None si toutes les places servent à l'image en cours
+    def store(self, key, pixels):
+        if self.free:
+            slot = self.free.pop()
+        else:
+            oldest = next(iter(self.slots))
+            if self.last_used[oldest] >= self.frame:  # Tuile affichée : ne pas la remplacer
+                return None
+            slot = self.slots.pop(oldest)
+            del self.last_used[oldest]
+            self.counters["evictions"] += 1
+        if self.texture is None:
+            self._create()
+        x, y = self.origin(slot)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)  # Lignes BGR non alignées sur 4 octets
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, TILE_SIZE, TILE_SIZE, GL_BGR, GL_UNSIGNED_BYTE, pixels)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        self.slots[key] = slot
+        self.last_used[key] = self.frame
+        self.counters["uploads"] += 1
+        return slot
+
+    # Fin de l'image
+    def end_frame(self):
+        self.frame += 1
+
+    # Libérer la texture (delete=False si le contexte OpenGL a disparu) ; toutes les places sont vidées
+    def release(self, delete=True):
+        if self.texture is not None:
+            if delete:
+                registry.delete_texture(self.texture)
+            else:
+                registry.forget("texture", self.texture)
+        self.texture = None
+        self.slots.clear()
+        self.last_used.clear()
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+
+# Classe pour une œuvre affichée depuis sa pyramide de tuiles
+class GigapixelPainting:
+    def __init__(self, index, artwork, pyramid):
+        self.index = index  # Numéro de l'œuvre (clé des tuiles)
+        self.artwork = artwork  # Œuvre du catalogue (coins, taille)
+        self.pyramid = pyramid  # Pyramide projetée en mémoire
+        corners = artwork.corners.astype(np.float64)
+        self.origin = corners[0]  # Coin haut gauche = pixel (0, 0) de l'image
+        self.right = corners[1] - corners[0]  # Largeur de l'œuvre
+        self.down = corners[3] - corners[0]  # Hauteur de l'œuvre, vers le bas
+        self.normal = np.cross(self.right, self.down)  # Normale du plan de l'œuvre
+
+    # Position dans le musée d'un point (u, v) de l'image, coordonnées entre 0 et 1
+    def point(self, u, v):
+        return self.origin + u * self.right + v * self.down
+
+    # Coordonnées (u, v) de la projection d'un point sur le plan de l'œuvre
+    def uv(self, position):
+        offset = np.asarray(position, dtype=np.float64) - self.origin
+        return (
+            offset @ self.right / (self.right @ self.right),
+            offset @ self.down / (self.down @ self.down),
+        )
+
+
+# Classe pour afficher et inspecter les œuvres très haute définition
+class GigapixelViewer:
+    def __init__(self, workers=2):
+        self.workers = workers  # Fils de lecture des tuiles
+        self.cache = TileCache()  # Texture de tuiles
+        self.paintings = []  # Œuvres dont la pyramide est disponible
+        self.tasks = queue.PriorityQueue()  # Lectures en attente, les niveaux grossiers d'abord
+        self.threads = []  # Fils démarrés au premier besoin
+        self.pending = {}  # Tuile -> résultat différé de sa lecture
+        self.sequence = 0  # Ordre d'arrivée des demandes de même priorité
+        self.quads = []  # Tuiles à dessiner : (place, œuvre, niveau, ligne, colonne, u0, v0, u1, v1)
+        self.inspecting = None  # Œuvre inspectée
+        self.zoom = 1.0  # Grossissement du mode inspection
+
+    # Ouvrir les pyramides des œuvres du catalogue qui en ont une
+    def open(self, artworks):
+        self.paintings = []
+        for artwork in artworks:
+            if not artwork.gigapixel:
+                continue
+            pyramid = open_pyramid(artwork.gigapixel)
+            if pyramid is None:
+                print(
+                    f"Œuvre « {artwork.name} » sans pyramide de tuiles, "
+                    f"lancer : python -m engine.tile_pyramid {artwork.gigapixel}"
+                )
+                continue
+            self.paintings.append(GigapixelPainting(len(self.paintings), artwork, pyramid))
+
+    # Vérifier si une œuvre est affichée par ses tuiles
+    def shows(self, artwork):
+        return any(painting.artwork is artwork for painting in self.paintings)
+
+    # Boucle d'un fil de travail : lire les tuiles demandées
+    def _work(self):
+        while True:
+            _, _, task = self.tasks.get()  # Attendre la prochaine lecture
+            if task is None:  # Signal d'arrêt
+                return
+            future, painting, level, row, col = task
+            if not future.set_running_or_notify_cancel():  # Tuile plus demandée
+                continue
+            try:
+                future.set_result(painting.pyramid.read_tile(level, row, col))
+            except BaseException as e:  # Fichier illisible : la tuile reste absente
+                future.set_exception(e)
+
+    # Demander la lecture d'une tuile
+    def _request(self, key):
+        if not self.threads:
+            self.threads = [
+                threading.Thread(target=self._work, name=f"tuiles-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self.threads:
+                thread.start()
+        index, level, row, col = key
+        future = Future()
+        self.pending[key] = future
+        self.sequence += 1
+        self.tasks.put((-level, self.sequence, (future, self.paintings[index], level, row, col)))
+
+    # Choisir les régions de l'œuvre à afficher et leur niveau : (niveau, u0, v0, u1, v1)
+    def _select(self, painting, player, planes, pixel_angle):
+        levels = painting.pyramid.levels
+        regions = []
+        stack = [(len(levels) - 1, 0.0, 0.0, 1.0, 1.0)]  # Toute l'œuvre au niveau le plus grossier
+        while stack:
+            level, u0, v0, u1, v1 = stack.pop()
+            center = painting.point((u0 + u1) / 2, (v0 + v1) / 2)
+            radius = np.linalg.norm(painting.point(u1, v1) - painting.point(u0, v0)) / 2
+            if not spheres_visible(planes, center, radius)[0]:  # Région hors du champ de vision
+                continue
+            u, v = painting.uv(player.position)
+            closest = painting.point(min(max(u, u0), u1), min(max(v, v0), v1))  # Point le plus proche de l'œil
+            distance = max(float(np.linalg.norm(closest - player.position)), player.near)
+            texel = np.linalg.norm(painting.right) / levels[level]["width"]  # Taille d'un pixel de l'image
+            if level > 0 and texel > distance * pixel_angle * DETAIL:  # Pas assez fin : diviser en quatre
+                um, vm = (u0 + u1) / 2, (v0 + v1) / 2
+                stack += [
+                    (level - 1, u0, v0, um, vm), (level - 1, um, v0, u1, vm),
+                    (level - 1, u0, vm, um, v1), (level - 1, um, vm, u1, v1),
+                ]
+            else:
+                regions.append((level, u0, v0, u1, v1))
+        return regions
+
+    # Couvrir une région par les tuiles présentes de son niveau, ou à défaut d'un niveau plus grossier
+    def _cover(self, painting, level, u0, v0, u1, v1, quads, missing):
+        info = painting.pyramid.levels[level]
+        width, height = info["width"], info["height"]
+        first_col = min(int(u0 * width // STEP), info["cols"] - 1)
+        last_col = min(max(math.ceil(u1 * width / STEP) - 1, first_col), info["cols"] - 1)
+        first_row = min(int(v0 * height // STEP), info["rows"] - 1)
+        last_row = min(max(math.ceil(v1 * height / STEP) - 1, first_row), info["rows"] - 1)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                # Partie de la région couverte par la tuile
+                tu0, tu1 = max(u0, col * STEP / width), min(u1, min((col + 1) * STEP, width) / width)
+                tv0, tv1 = max(v0, row * STEP / height), min(v1, min((row + 1) * STEP, height) / height)
+                if tu1 <= tu0 or tv1 <= tv0:
+                    continue
+                key = (painting.index, level, row, col)
+                slot = self.cache.get(key)
+                if slot is not None:
+                    quads.append((slot, painting, level, row, col, tu0, tv0, tu1, tv1))
+                    continue
+                missing.append(key)
+                if level + 1 < len(painting.pyramid.levels):  # En attendant : niveau plus grossier
+                    self._cover(painting, level + 1, tu0, tv0, tu1, tv1, quads, missing)
+
+    # Calculer les tuiles à afficher et celles qui manquent
+    def _resolve(self, selections):
+        quads, missing = [], []
+        for painting, regions in selections:
+            for region in regions:
+                self._cover(painting, *region, quads, missing)
+        return quads, missing
+
+    # Œuvre visée par le viseur (centre de l'écran), ou None
+    def target(self, player):
+        eye = np.asarray(player.position, dtype=np.float64)
+        front = np.asarray(player.front, dtype=np.float64)
+        for painting in self.paintings:
+            facing = front @ painting.normal
+            if abs(facing) < 1e-9:  # Regard parallèle à l'œuvre
+                continue
+            t = (painting.origin - eye) @ painting.normal / facing
+            if not 0 < t * np.linalg.norm(front) <= INSPECT_DISTANCE:
+                continue
+            u, v = painting.uv(eye + t * front)
+            if 0 <= u <= 1 and 0 <= v <= 1:
+                return painting
+        return None
+
+    # Entrer en inspection de l'œuvre visée, ou en sortir
+    def toggle_inspection(self, player):
+        if self.inspecting is not None:
+            self.inspecting, self.zoom = None, 1.0
+            return
+        self.inspecting = self.target(player)
+
+    # Modifier le grossissement (crans de la molette)
+    def zoom_by(self, steps):
+        if self.inspecting is not None:
+            self.zoom = min(max(self.zoom * ZOOM_STEP ** steps, 1.0), MAX_ZOOM)
+
+    # Mettre à jour les tuiles pour l'image en cours (fil principal)
+    def update(self, player, screen_height):
+        if not self.paintings:
+            return
+        if self.inspecting is not None and self.target(player) is not self.inspecting:
+            self.inspecting, self.zoom = None, 1.0  # Le viseur a quitté l'œuvre
+        planes = player_frustum(player)
+        pixel_angle = 2 * math.tan(math.radians(player.fov) / 2) / screen_height  # Angle couvert par un pixel
+        selections = [
+            (painting, self._select(painting, player, planes, pixel_angle)) for painting in self.paintings
+        ]
+        _, missing = self._resolve(selections)  # Marque les tuiles affichées : elles ne seront pas remplacées
+        wanted = set(missing)
+
+        # Envois des tuiles lues, dans le budget de l'image
+        start = time.perf_counter()
+        for key, future in list(self.pending.items()):
+            if time.perf_counter() - start >= UPLOAD_BUDGET:
+                break
+            if not future.done():
+                continue
+            del self.pending[key]
+            if future.cancelled() or future.exception() is not None or key not in wanted:
+                continue
+            self.cache.store(key, future.result())
+
+        # Abandonner les lectures devenues inutiles, demander les nouvelles (les plus grossières d'abord)
+        for key, future in list(self.pending.items()):
+            if key not in wanted and future.cancel():
+                del self.pending[key]
+        for key in sorted(wanted, key=lambda key: -key[1]):
+            if len(self.pending) >= MAX_PENDING:
+                break
+            if key not in self.pending:
+                self._request(key)
+
+        self.quads, _ = self._resolve(selections)  # Tuiles présentes, y compris celles envoyées à l'instant
+        self.cache.end_frame()
+
+    # Ajouter les tuiles visibles au lot de primitives
+    def draw(self, batch):
+        if not self.quads or self.cache.texture is None:
+            return
+        corners, texcoords = [], []
+        for slot, painting, level, row, col, u0, v0, u1, v1 in self.quads:
+            info = painting.pyramid.levels[level]
+            x, y = self.cache.origin(slot)
+            s0, s1 = (  # Coordonnées dans la texture de tuiles, bordure exclue
+                (x + BORDER + u * info["width"] - col * STEP) / self.cache.size for u in (u0, u1)
+            )
+            t0, t1 = ((y + BORDER + v * info["height"] - row * STEP) / self.cache.size for v in (v0, v1))
+            corners.append(
+                [painting.point(u0, v0), painting.point(u1, v0), painting.point(u1, v1), painting.point(u0, v1)]
+            )
+            texcoords.append([(s0, t0), (s1, t0), (s1, t1), (s0, t1)])  # Première ligne d'une tuile en haut
+        batch.quads(corners, (1.0, 1.0, 1.0, 1.0), texcoords, self.cache.texture)
+
+    # Récupérer les statistiques des tuiles
+    def stats(self):
+        return {
+            "paintings": len(self.paintings),
+            "resident": len(self.cache.slots),
+            "capacity": self.cache.capacity,
+            "atlas_bytes": self.cache.size * self.cache.size * 4,
+            **self.cache.counters,
+        }
+
+    # Libérer la texture et abandonner les lectures (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+        self.quads = []
+        self.inspecting, self.zoom = None, 1.0
+        for _ in self.threads:
+            self.sequence += 1
+            self.tasks.put((1, self.sequence, None))  # Signal d'arrêt, après les lectures en cours
+        self.threads = []
+        self.cache.release(delete)
@@ -0,0 +1,78 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Gestionnaire des ressources OpenGL (textures et tampons) rangées par clé, pour
+# les réutiliser d'une visite du musée à l'autre.
+from OpenGL import platform  # Importer l'accès au contexte OpenGL courant
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+
+
+# Fonction pour récupérer le contexte OpenGL courant (None s'il n'y en a pas)
+def current_context():
+    try:
+        context = platform.GetCurrentContext()
+    except Exception:  # Pas de contexte ou plateforme non prise en charge
+        return None
+    return context or None
+
+
+# Classe pour gérer les textures et les tampons OpenGL du jeu
+class GpuAssetManager:
+    def __init__(self):
+        self.assets = {}  # Ressources par clé : {"kind", "handle"}
+        self.context = None  # Contexte OpenGL dans lequel les ressources existent
+
+    # Vérifier que les ressources appartiennent toujours au contexte courant (True si perdu)
+    def check_context(self):
+        context = current_context()
+        lost = self.context is not None and context != self.context  # Contexte perdu ou recréé
+        if lost:
+            print("Contexte OpenGL perdu, les ressources seront rechargées")
+            self.forget()
+        self.context = context
+        return lost
+
+    # Récupérer l'identifiant d'une ressource (None si elle n'est pas chargée)
+    def get(self, key):
+        asset = self.assets.get(key)
+        return asset["handle"] if asset else None
+
+    # Confier une ressource au gestionnaire ("texture" : identifiant, "mesh" : tuple de tampons)
+    def adopt(self, key, kind, handle):
+        if key in self.assets:  # Remplacer une ancienne version
+            self.release(key)
+        if self.context is None:
+            self.context = current_context()
+        self.assets[key] = {"kind": kind, "handle": handle}
+        return handle
+
+    # Libérer une ressource
+    def release(self, key):
+        asset = self.assets.pop(key, None)
+        if asset is None:
+            return
+        if asset["kind"] == "texture":
+            registry.delete_texture(asset["handle"])  # Supprimer la texture
+        elif asset["kind"] == "mesh":
+            registry.delete_buffers(*asset["handle"][:2])  # Supprimer le VBO et le tampon d'éléments
+
+    # Libérer toutes les ressources (fermeture du jeu)
+    def release_all(self):
+        if current_context() != self.context:  # Le contexte n'existe plus
+            self.forget()
+            return
+        for key in list(self.assets):
+            self.release(key)
+
+    # Oublier les ressources sans les supprimer (leur contexte a déjà disparu)
+    def forget(self):
+        for asset in self.assets.values():  # Retirer les identifiants morts du registre
+            if asset["kind"] == "texture":
+                registry.forget("texture", asset["handle"])
+            elif asset["kind"] == "mesh":
+                for vbo in asset["handle"][:2]:
+                    registry.forget("buffer", vbo)
+        self.assets.clear()
+        self.context = None
@@ -0,0 +1,139 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Registre des ressources OpenGL : chaque texture ou tampon est créé par ici,
+# avec son propriétaire et sa taille estimée, pour suivre la mémoire graphique
+# et repérer les propriétaires dont les objets créés dans la boucle d'affichage
+# ne cessent d'augmenter (les objets gardés volontairement, eux, plafonnent).
+from OpenGL.GL import (
+    glGenTextures,
+    glDeleteTextures,
+    glGenBuffers,
+    glDeleteBuffers,
+)  # Importer les fonctions OpenGL
+
+LEAK_SAMPLE_FRAMES = 60  # Images entre deux relevés des objets créés dans la boucle d'affichage
+LEAK_SAMPLES = 10  # Relevés consécutifs en hausse avant alerte (environ 10 s à 60 images par seconde)
+
+
+# Classe pour suivre les ressources OpenGL du jeu
+class GpuRegistry:
+    def __init__(self):
+        self.objects = {}  # Ressources vivantes : (type, identifiant) -> informations
+        self.frame = 0  # Numéro de l'image en cours
+        self.in_frame = False  # Vrai entre begin_frame() et end_frame()
+        self.frame_counts = {}  # Objets vivants créés dans la boucle d'affichage, par propriétaire
+        self.last_counts = {}  # Les mêmes nombres au relevé précédent
+        self.growth = {}  # Relevés consécutifs en hausse, par propriétaire
+        self.created = 0  # Nombre total de créations
+        self.deleted = 0  # Nombre total de suppressions
+
+    # Enregistrer une ressource
+    def _track(self, kind, handle, owner, nbytes=0):
+        self.created += 1
+        if self.in_frame:
+            self.frame_counts[owner] = self.frame_counts.get(owner, 0) + 1
+        self.objects[(kind, handle)] = {
+            "owner": owner,  # Partie du jeu qui a créé la ressource
+            "bytes": nbytes,  # Taille estimée en mémoire graphique
+            "frame": self.frame if self.in_frame else None,  # Image de création
+        }
+        return handle
+
+    # Retirer une ressource du registre (retourne False si elle n'y était pas)
+    def _untrack(self, kind, handle):
+        info = self.objects.pop((kind, handle), None)
+        if info is None:
+            return False
+        if info["frame"] is not None:  # Créé dans la boucle d'affichage
+            self.frame_counts[info["owner"]] -= 1
+        self.deleted += 1
+        return True
+
+    # Créer une texture
+    def texture(self, owner):
+        return self._track("texture", int(glGenTextures(1)), owner)
+
+    # Créer un tampon (VBO, tampon d'éléments...)
+    def buffer(self, owner):
+        return self._track("buffer", int(glGenBuffers(1)), owner)
+
+    # Mettre à jour la taille estimée d'une ressource après l'envoi de ses données
+    def set_bytes(self, kind, handle, nbytes):
+        info = self.objects.get((kind, handle))
+        if info is not None:
+            info["bytes"] = int(nbytes)
+
+    # Supprimer une texture
+    def delete_texture(self, texture_id):
+        if self._untrack("texture", texture_id):
+            glDeleteTextures([texture_id])
+
+    # Supprimer des tampons
+    def delete_buffers(self, *buffers):
+        buffers = [vbo for vbo in buffers if self._untrack("buffer", vbo)]
+        if buffers:
+            glDeleteBuffers(len(buffers), buffers)
+
+    # Oublier une ressource sans appel OpenGL (son contexte a déjà disparu)
+    def forget(self, kind, handle):
+        self._untrack(kind, handle)
+
+    # Marquer le début d'une image de la boucle d'affichage
+    def begin_frame(self):
+        self.frame += 1
+        self.in_frame = True
+
+    # Marquer la fin d'une image ; à chaque relevé, signaler les propriétaires dont les objets
+    # créés dans la boucle d'affichage augmentent depuis LEAK_SAMPLES relevés
+    def end_frame(self):
+        self.in_frame = False
+        if self.frame % LEAK_SAMPLE_FRAMES:
+            return
+        for owner, count in self.frame_counts.items():
+            if count > self.last_counts.get(owner, 0):
+                self.growth[owner] = self.growth.get(owner, 0) + 1
+            else:  # Nombre stable ou en baisse : objets gardés volontairement
+                self.growth.pop(owner, None)
+            if self.growth.get(owner) == LEAK_SAMPLES:  # Une seule alerte par hausse continue
+                print(
+                    f"Fuite OpenGL probable : '{owner}' garde {count} objets créés "
+                    f"dans la boucle d'affichage, en hausse depuis {LEAK_SAMPLES} relevés"
+                )
+        self.last_counts = dict(self.frame_counts)
+
+    # Compter, par propriétaire, les objets vivants créés dans la boucle d'affichage
+    def frame_objects(self):
+        return {owner: count for owner, count in self.frame_counts.items() if count}
+
+    # Récupérer le nombre d'objets vivants et la mémoire estimée, par type et par propriétaire
+    def stats(self):
+        kinds, owners = {}, {}
+        for (kind, _), info in self.objects.items():
+            for table, key in ((kinds, kind), (owners, info["owner"])):
+                entry = table.setdefault(key, {"count": 0, "bytes": 0})
+                entry["count"] += 1
+                entry["bytes"] += info["bytes"]
+        return {
+            "live": len(self.objects),
+            "bytes": sum(info["bytes"] for info in self.objects.values()),
+            "created": self.created,
+            "deleted": self.deleted,
+            "kinds": kinds,
+            "owners": owners,
+        }
+
+    # Afficher le bilan des ressources dans la console
+    def report(self):
+        stats = self.stats()
+        print(
+            f"Ressources OpenGL : {stats['live']} vivantes, "
+            f"{stats['bytes'] / 1048576:.1f} Mo estimés "
+            f"({stats['created']} créées, {stats['deleted']} supprimées)"
+        )
+        for owner, entry in sorted(stats["owners"].items()):
+            print(f"  {owner} : {entry['count']} objets, {entry['bytes'] / 1048576:.2f} Mo")
+
+
+registry = GpuRegistry()  # Registre partagé par tout le jeu
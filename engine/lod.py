@@ -0,0 +1,239 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Niveaux de détail des modèles des œuvres (statues, cadres) : chaque modèle
+# est simplifié hors ligne (engine/simplify.py) en plusieurs niveaux rangés
+# dans un seul tampon de sommets et d'indices (cache/lod). Pendant la visite,
+# le niveau de chaque objet est choisi d'après sa taille à l'écran, avec une
+# marge pour éviter les changements incessants à la limite entre deux niveaux.
+# Utilisation hors ligne : python -m engine.lod [modèles.obj...]
+import os  # Importer le module os
+import sys  # Importer le module sys pour les arguments
+import json  # Importer le module json pour l'en-tête du cache
+import math  # Importer le module math
+import time  # Importer le module time
+import hashlib  # Importer le module hashlib pour les clés du cache
+import numpy as np  # Importer la bibliothèque NumPy
+
+from engine.obj_loader import load_obj  # Importer le chargeur OBJ vectorisé
+from engine.mesh import build_indexed_mesh, check_face_indices, VERTEX_SIZE  # Importer la préparation des maillages
+from engine.mesh_cache import load_cached_mesh  # Importer le cache des maillages
+from engine.simplify import simplify  # Importer la simplification des maillages
+
+CACHE_DIR = os.path.join("cache", "lod")  # Dossier des niveaux de détail
+CACHE_VERSION = 1  # Version du format, à incrémenter si le format change
+LOD_RATIOS = (1.0, 0.5, 0.25, 0.125)  # Part des triangles gardée à chaque niveau
+MIN_TRIANGLES = 64  # Un niveau n'est pas simplifié en dessous de ce nombre de triangles
+FULL_DETAIL_PIXELS = 400  # Hauteur à l'écran (pixels) au-dessus de laquelle le modèle complet est dessiné
+HYSTERESIS = 0.2  # Marge (en niveaux) à franchir avant de changer de niveau
+LOD_BIASES = {"haute": 0.0, "moyenne": 0.5, "basse": 1.0}  # Décalage des niveaux selon le préréglage
+
+
+# Classe pour les niveaux de détail d'un modèle (plages d'indices d'un même tampon)
+class MeshLods:
+    def __init__(self, first, count, center, radius):
+        self.first = [int(value) for value in first]  # Premier indice de chaque niveau
+        self.count = [int(value) for value in count]  # Nombre d'indices de chaque niveau
+        self.center = np.asarray(center, dtype=np.float64)  # Centre de la sphère englobante (repère du modèle)
+        self.radius = float(radius)  # Rayon de la sphère englobante
+        self.level = 0  # Niveau dessiné à la dernière image
+
+    # Convertir les niveaux pour l'en-tête JSON du cache
+    def to_header(self):
+        return {"first": self.first, "count": self.count, "center": self.center.tolist(), "radius": self.radius}
+
+    # Relire les niveaux depuis l'en-tête du cache
+    @classmethod
+    def from_header(cls, data):
+        return cls(data["first"], data["count"], data["center"], data["radius"])
+
+    # Plage d'indices (premier, nombre) du niveau courant
+    def ranges(self):
+        return [(self.first[self.level], self.count[self.level])]
+
+
+# Classe pour le choix des niveaux de détail pendant la visite
+class LodSelector:
+    def __init__(self):
+        self.bias = 0.0  # Décalage des niveaux (positif : moins de détails, plus d'images par seconde)
+        self.selections = 0  # Modèles dessinés depuis le début
+        self.triangles = 0  # Triangles dessinés depuis le début
+        self.full_triangles = 0  # Triangles qu'auraient coûté les modèles complets
+        self.switches = 0  # Changements de niveau
+
+    # Régler le décalage des niveaux (None : selon le préréglage graphique)
+    def set_bias(self, bias, preset=None):
+        self.bias = float(bias) if bias is not None else LOD_BIASES.get(preset, 0.0)
+
+    # Choisir le niveau d'un modèle placé en origin (tourné de yaw degrés) et retourner sa plage d'indices
+    def select(self, lods, origin, yaw, player, screen_height):
+        angle = math.radians(yaw)
+        offset = np.array([  # Centre de la sphère englobante dans le repère du musée
+            lods.center[0] * math.cos(angle) + lods.center[2] * math.sin(angle),
+            lods.center[1],
+            -lods.center[0] * math.sin(angle) + lods.center[2] * math.cos(angle),
+        ])
+        distance = float(np.linalg.norm(np.asarray(origin) + offset - np.asarray(player.position)))
+        last = len(lods.first) - 1
+        if distance > lods.radius and last:
+            # Hauteur de la sphère à l'écran, puis niveau continu : un niveau de plus à chaque moitié
+            pixels = lods.radius * screen_height / (distance * math.tan(math.radians(player.fov) / 2))
+            wanted = math.log2(FULL_DETAIL_PIXELS / max(pixels, 1e-6)) + self.bias
+        else:  # Œil dans la sphère : modèle complet, sauf décalage
+            wanted = self.bias
+        level = lods.level
+        if wanted >= level + 1 + HYSTERESIS or wanted < level - HYSTERESIS:  # Sortie de la marge
+            level = min(max(int(math.floor(wanted)), 0), last)
+        if level != lods.level:
+            lods.level = level
+            self.switches += 1
+        self.selections += 1
+        self.triangles += lods.count[level] // 3
+        self.full_triangles += lods.count[0] // 3
+        return lods.ranges()
+
+    # Récupérer les statistiques des niveaux de détail
+    def stats(self):
+        return {
+            "selections": self.selections,
+            "triangles": self.triangles,
+            "full_triangles": self.full_triangles,
+            "share": self.triangles / self.full_triangles if self.full_triangles else 1.0,
+            "switches": self.switches,
+        }
+
+
+# Fonction pour calculer la sphère englobante des positions d'un maillage
+def _bounding_sphere(positions):
+    if not len(positions):
+        return np.zeros(3), 0.0
+    center = (positions.min(axis=0) + positions.max(axis=0)) / 2
+    return center, float(np.linalg.norm(positions - center, axis=1).max())
+
+
+# Fonction pour construire les niveaux de détail d'un maillage load_obj (sommets, coordonnées, faces)
+# Retourne les sommets entrelacés et les indices de tous les niveaux, les niveaux et l'erreur de chacun
+def build_lods(vertices, texcoords, faces, ratios=LOD_RATIOS):
+    positions = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 2, 3)
+    check_face_indices(faces, len(positions), len(np.asarray(texcoords).reshape(-1, 2)))
+    triangles, corners = faces[:, 0], faces[:, 1]  # Sommets et coordonnées de texture de chaque coin
+    total = len(triangles)
+    levels, errors = [], []
+    for ratio in ratios:
+        target = max(int(total * ratio), min(MIN_TRIANGLES, total))
+        error = 0.0
+        if len(triangles) > target:  # Chaque niveau part du précédent
+            positions, triangles, corners, error = simplify(positions, triangles, corners, target)
+        if levels and len(triangles) >= len(levels[-1][1]) // 3:  # Plus rien à simplifier
+            break
+        levels.append(build_indexed_mesh(positions, texcoords, np.stack((triangles, corners), axis=1)))
+        errors.append(math.sqrt(error))
+
+    # Tous les niveaux dans un seul tampon : les indices de chaque niveau sont décalés
+    vertex_counts = [len(interleaved) for interleaved, _ in levels]
+    offsets = np.cumsum([0] + vertex_counts[:-1])
+    index_counts = [len(indices) for _, indices in levels]
+    index_dtype = np.uint16 if sum(vertex_counts) <= 0xFFFF else np.uint32
+    interleaved = np.concatenate([interleaved for interleaved, _ in levels]) if levels else (
+        np.zeros((0, VERTEX_SIZE), dtype=np.float32)
+    )
+    indices = np.concatenate(
+        [indices.astype(index_dtype) + index_dtype(offset) for (_, indices), offset in zip(levels, offsets)]
+    ) if levels else np.zeros(0, dtype=index_dtype)
+    center, radius = _bounding_sphere(interleaved[: vertex_counts[0], :3] if levels else interleaved[:, :3])
+    lods = MeshLods(np.cumsum([0] + index_counts[:-1]), index_counts, center, radius)
+    return interleaved, indices, lods, errors
+
+
+# Fonction pour obtenir les chemins du cache (données et en-tête) d'un modèle
+def lod_paths(filename):
+    name = os.path.splitext(os.path.basename(filename))[0]  # Nom du modèle
+    key = hashlib.blake2b(
+        os.path.abspath(filename).encode("utf-8"), digest_size=6
+    ).hexdigest()  # Clé tirée du chemin complet
+    base = os.path.join(CACHE_DIR, f"{name}-{key}")
+    return base + ".bin", base + ".json"
+
+
+# Fonction pour lire les niveaux de détail en cache, retourne None s'ils sont absents ou périmés
+def _read_lods(filename):
+    bin_path, header_path = lod_paths(filename)
+    if not os.path.exists(bin_path) or not os.path.exists(header_path):
+        return None
+    try:
+        stat = os.stat(filename)
+        with open(header_path, "r") as f:
+            header = json.load(f)
+        if (
+            header.get("version") != CACHE_VERSION
+            or header.get("size") != stat.st_size
+            or header.get("mtime_ns") != stat.st_mtime_ns
+        ):
+            return None  # Autre format ou modèle modifié depuis le calcul
+        index_dtype = np.dtype(header["index_dtype"])
+        vertex_bytes = header["vertex_count"] * VERTEX_SIZE * 4
+        if os.path.getsize(bin_path) != vertex_bytes + header["index_count"] * index_dtype.itemsize:
+            return None  # Fichier tronqué
+        payload = np.memmap(bin_path, dtype=np.uint8, mode="r")  # Projection en mémoire
+        interleaved = payload[:vertex_bytes].view(np.float32).reshape(-1, VERTEX_SIZE)
+        indices = payload[vertex_bytes:].view(index_dtype)
+        return interleaved, indices, MeshLods.from_header(header["lods"])
+    except (OSError, ValueError, KeyError, TypeError) as e:  # En-tête illisible
+        print(f"Niveaux de détail illisibles ({filename}) : {e}")
+        return None
+
+
+# Fonction pour calculer et écrire les niveaux de détail d'un modèle (hors ligne, analyse sur tous les cœurs)
+def bake_lods(filename):
+    stat = os.stat(filename)
+    interleaved, indices, lods, errors = build_lods(*load_obj(filename, os.cpu_count() or 1))
+    bin_path, header_path = lod_paths(filename)
+    os.makedirs(CACHE_DIR, exist_ok=True)  # Créer le dossier du cache si besoin
+    header = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "vertex_count": len(interleaved),
+        "index_count": len(indices),
+        "index_dtype": indices.dtype.str,
+        "lods": lods.to_header(),
+        "errors": errors,  # Erreur géométrique de chaque niveau (unités du modèle)
+    }
+    # Écrire dans des fichiers temporaires puis les renommer : un cache à moitié écrit n'est jamais lu
+    np.concatenate((interleaved.reshape(-1).view(np.uint8), indices.view(np.uint8))).tofile(bin_path + ".tmp")
+    with open(header_path + ".tmp", "w") as f:
+        json.dump(header, f, indent=4)
+    os.replace(bin_path + ".tmp", bin_path)
+    os.replace(header_path + ".tmp", header_path)
+    return lods, errors
+
+
+# Fonction pour charger un modèle et ses niveaux de détail (sans appel OpenGL, utilisable dans un fil de travail)
+# Sans niveaux calculés, le modèle complet du cache des maillages sert de niveau unique
+def load_lod_mesh(filename):
+    cached = _read_lods(filename)
+    if cached is not None:
+        return cached
+    print(f"Pas de niveaux de détail pour {filename} (python -m engine.lod), modèle complet")
+    interleaved, indices, _, _ = load_cached_mesh(filename)
+    center, radius = _bounding_sphere(np.asarray(interleaved)[:, :3])
+    return interleaved, indices, MeshLods([0], [len(indices)], center, radius)
+
+
+# Calcul hors ligne : python -m engine.lod [modèles.obj...] (par défaut, les modèles du catalogue)
+if __name__ == "__main__":
+    from engine.artworks import load_artworks  # Importer le catalogue des œuvres
+
+    sources = sys.argv[1:] or sorted({artwork.mesh for artwork in load_artworks() if artwork.mesh})
+    if not sources:
+        print("Aucun modèle à simplifier")
+    for source in sources:
+        started = time.perf_counter()
+        lods, errors = bake_lods(source)
+        levels = ", ".join(
+            f"{count // 3} triangles (erreur {error:.4f})" for count, error in zip(lods.count, errors)
+        )
+        print(f"{source} : {levels} en {time.perf_counter() - started:.1f} s ({CACHE_DIR})")
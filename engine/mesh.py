@@ -0,0 +1,48 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Préparation des maillages côté CPU avant leur envoi à la carte graphique.
+import numpy as np  # Importer la bibliothèque NumPy
+
+VERTEX_SIZE = 5  # Nombre de flottants par sommet entrelacé (x, y, z, u, v)
+VERTEX_STRIDE = VERTEX_SIZE * 4  # Taille d'un sommet entrelacé en octets
+
+
+# Fonction pour vérifier les indices des faces (n, 2, 3) : un indice de texture trop grand
+# déborderait sur le sommet suivant dans les clés, un indice de sommet négatif lirait la fin du tableau
+def check_face_indices(faces, vertex_count, texcoord_count):
+    if not len(faces):
+        return
+    v_index, vt_index = faces[:, 0], faces[:, 1]
+    if v_index.min() < 0 or v_index.max() >= vertex_count:
+        raise ValueError(f"Fichier OBJ invalide : indice de sommet hors limites ({vertex_count} sommets)")
+    if vt_index.min() < -1 or vt_index.max() >= texcoord_count:  # -1 : pas de coordonnée de texture
+        raise ValueError(
+            f"Fichier OBJ invalide : indice de coordonnée de texture hors limites ({texcoord_count} coordonnées)"
+        )
+
+
+# Fonction pour construire un maillage indexé à partir des données de load_obj
+def build_indexed_mesh(vertices, texcoords, faces):
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)  # Sommets
+    texcoords = np.asarray(texcoords, dtype=np.float32).reshape(-1, 2)  # Coordonnées de texture
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 2, 3)  # Faces triangulées
+
+    check_face_indices(faces, len(vertices), len(texcoords))
+    texcoords = np.vstack(
+        (texcoords, np.zeros((1, 2), np.float32))
+    )  # L'indice -1 (pas de coordonnée de texture) désigne la dernière ligne (0, 0)
+
+    # Chaque coin est identifié par le couple (sommet, coordonnée de texture)
+    base = len(texcoords)  # Nombre de valeurs possibles pour l'indice de texture + 1
+    keys = faces[:, 0].reshape(-1) * base + (faces[:, 1].reshape(-1) + 1)
+    unique_keys, indices = np.unique(keys, return_inverse=True)  # Dédoublonnage
+
+    interleaved = np.empty((len(unique_keys), VERTEX_SIZE), dtype=np.float32)
+    interleaved[:, :3] = vertices[unique_keys // base]  # Position
+    interleaved[:, 3:] = texcoords[unique_keys % base - 1]  # Coordonnées de texture
+
+    # Indices sur 16 bits quand c'est possible pour alléger le tampon d'éléments
+    index_dtype = np.uint16 if len(unique_keys) <= 0xFFFF else np.uint32
+    return interleaved, indices.reshape(-1).astype(index_dtype)
@@ -0,0 +1,152 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Cache binaire des maillages : le résultat de load_obj + build_indexed_mesh est
+# découpé en blocs (build_chunks), écrit une fois sur disque, puis relu avec
+# np.memmap aux lancements suivants. Au lancement du jeu, seules les tailles sont
+# vérifiées (la projection reste paresseuse) ; l'empreinte complète des données
+# n'est recalculée qu'à la demande (verify=True, construction hors ligne).
+#
+# Construction hors ligne, sur tous les cœurs : python -m engine.mesh_cache [modèles.obj...]
+import os  # Importer le module os
+import sys  # Importer le module sys
+import json  # Importer le module json pour l'en-tête du cache
+import time  # Importer le module time
+import hashlib  # Importer le module hashlib pour les empreintes
+import numpy as np  # Importer la bibliothèque NumPy
+
+from engine.obj_loader import load_obj  # Importer le chargeur OBJ vectorisé
+from engine.mesh import build_indexed_mesh, VERTEX_SIZE  # Importer la préparation des maillages
+from engine.chunks import build_chunks, MeshChunks  # Importer le découpage en blocs
+
+CACHE_DIR = os.path.join("cache", "meshes")  # Dossier du cache des maillages
+CACHE_VERSION = 2  # Version du format, à incrémenter si le format change
+HASH_BLOCK = 1024 * 1024  # Taille des blocs lus pour calculer une empreinte
+
+
+# Fonction pour calculer l'empreinte d'un fichier (ou d'un tableau en mémoire)
+def _digest(source):
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(source, np.ndarray):  # Contenu déjà en mémoire
+        digest.update(memoryview(source).cast("B"))
+        return digest.hexdigest()
+    with open(source, "rb") as file:  # Lire le fichier par blocs
+        for block in iter(lambda: file.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Fonction pour obtenir les chemins du cache (données et en-tête) d'un fichier source
+def cache_paths(filename):
+    name = os.path.splitext(os.path.basename(filename))[0]  # Nom du modèle
+    key = hashlib.blake2b(
+        os.path.abspath(filename).encode("utf-8"), digest_size=6
+    ).hexdigest()  # Clé tirée du chemin complet
+    base = os.path.join(CACHE_DIR, f"{name}-{key}")
+    return base + ".bin", base + ".json"
+
+
+# Fonction pour lire et vérifier le cache, retourne None s'il est absent, périmé ou corrompu
+# (verify : relire toutes les données pour comparer leur empreinte)
+def _read_cache(filename, stat, verify=False):
+    bin_path, header_path = cache_paths(filename)
+    if not os.path.exists(bin_path) or not os.path.exists(header_path):
+        return None
+    try:
+        with open(header_path, "r") as f:
+            header = json.load(f)  # Charger l'en-tête
+        if (
+            header.get("version") != CACHE_VERSION
+            or header.get("source") != os.path.abspath(filename)
+            or header.get("size") != stat.st_size
+        ):
+            return None  # Autre format, autre fichier ou taille différente
+
+        if header.get("mtime_ns") != stat.st_mtime_ns:  # Fichier touché : comparer le contenu
+            if header.get("source_hash") != _digest(filename):
+                return None  # Le contenu a changé
+            header["mtime_ns"] = stat.st_mtime_ns  # Même contenu : mettre à jour la date
+            with open(header_path, "w") as f:
+                json.dump(header, f, indent=4)
+
+        index_dtype = np.dtype(header["index_dtype"])  # Type des indices
+        vertex_bytes = header["vertex_count"] * VERTEX_SIZE * 4  # Taille des sommets
+        index_bytes = header["index_count"] * index_dtype.itemsize  # Taille des indices
+        if os.path.getsize(bin_path) != vertex_bytes + index_bytes:
+            return None  # Fichier tronqué
+
+        payload = np.memmap(bin_path, dtype=np.uint8, mode="r")  # Projection en mémoire
+        if verify and _digest(payload) != header["payload_hash"]:
+            return None  # Données corrompues
+        interleaved = payload[:vertex_bytes].view(np.float32).reshape(-1, VERTEX_SIZE)
+        indices = payload[vertex_bytes:].view(index_dtype)
+        return interleaved, indices, MeshChunks.from_header(header["chunks"]), header
+    except (OSError, ValueError, KeyError, TypeError) as e:  # En-tête illisible
+        print(f"Cache du maillage illisible, reconstruction : {e}")
+        return None
+
+
+# Fonction pour écrire le cache d'un maillage
+def _write_cache(filename, stat, interleaved, indices, chunks, parse_seconds):
+    bin_path, header_path = cache_paths(filename)
+    os.makedirs(CACHE_DIR, exist_ok=True)  # Créer le dossier du cache si besoin
+    payload = np.concatenate((interleaved.reshape(-1).view(np.uint8), indices.view(np.uint8)))
+    header = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "source_hash": _digest(filename),
+        "vertex_count": len(interleaved),
+        "index_count": len(indices),
+        "index_dtype": indices.dtype.str,
+        "payload_hash": _digest(payload),
+        "chunks": chunks.to_header(),  # Plages d'indices et boîtes des blocs
+        "parse_seconds": parse_seconds,
+    }
+    # Écrire dans des fichiers temporaires puis les renommer : un cache à moitié écrit
+    # n'est jamais lu
+    payload.tofile(bin_path + ".tmp")
+    with open(header_path + ".tmp", "w") as f:
+        json.dump(header, f, indent=4)
+    os.replace(bin_path + ".tmp", bin_path)
+    os.replace(header_path + ".tmp", header_path)
+
+
+# Fonction pour charger un maillage indexé et ses blocs en passant par le cache
+# (workers : processus d'analyse du OBJ, 1 dans le jeu ; verify : vérifier l'empreinte des données)
+def load_cached_mesh(filename, workers=1, verify=False):
+    start = time.perf_counter()  # Démarrer le chronomètre
+    stat = os.stat(filename)  # Taille et date du fichier source
+    cached = _read_cache(filename, stat, verify)
+    if cached is not None:  # Cache valide : aucune analyse du fichier texte
+        interleaved, indices, chunks, header = cached
+        seconds = time.perf_counter() - start
+        return interleaved, indices, chunks, {
+            "hit": True,
+            "seconds": seconds,
+            "saved": max(0.0, header["parse_seconds"] - seconds),
+        }
+
+    interleaved, indices = build_indexed_mesh(*load_obj(filename, workers))  # Analyse complète
+    indices, chunks = build_chunks(interleaved, indices)  # Triangles rangés par bloc
+    seconds = time.perf_counter() - start
+    if len(indices):  # Un maillage vide n'est pas mis en cache
+        try:
+            _write_cache(filename, stat, interleaved, indices, chunks, seconds)
+        except OSError as e:  # Dossier en lecture seule, disque plein...
+            print(f"Impossible d'écrire le cache du maillage : {e}")
+    return interleaved, indices, chunks, {"hit": False, "seconds": seconds, "saved": 0.0}
+
+
+# Construire (ou vérifier entièrement) le cache des modèles donnés (ou du musée), analyse sur tous les cœurs
+if __name__ == "__main__":
+    sources = sys.argv[1:] or [os.path.join("src", "models", "Untitled.obj")]
+    for source in sources:
+        _, indices, chunks, report = load_cached_mesh(source, os.cpu_count() or 1, verify=True)
+        state = "déjà à jour" if report["hit"] else "construit"
+        print(
+            f"{source} : cache {state} en {report['seconds']:.2f} s, "
+            f"{len(indices) // 3} triangles, {len(chunks.first)} blocs ({CACHE_DIR})"
+        )
@@ -0,0 +1,249 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Chargement vectorisé des fichiers OBJ : le fichier est découpé en plages
+# d'octets analysées avec NumPy, puis les résultats sont réunis dans des
+# tableaux typés. Le jeu analyse sur un seul processus ; le pool de processus
+# n'est utilisé que par les calculs hors ligne (python -m engine.mesh_cache,
+# engine.lod, engine.pvs), lancés sous une garde __main__ : avec la méthode
+# « spawn » (Windows), chaque processus réimporte le module principal.
+import os  # Importer le module os
+from concurrent.futures import ProcessPoolExecutor  # Importer le pool de processus
+import numpy as np  # Importer la bibliothèque NumPy
+
+CHUNK_SIZE = 16 * 1024 * 1024  # Taille d'une plage d'octets (16 Mo)
+
+# Codes ASCII utiles à l'analyse
+SPACE = ord(" ")  # Espace
+TAB = ord("\t")  # Tabulation
+CR = ord("\r")  # Retour chariot
+LF = ord("\n")  # Fin de ligne
+SLASH = ord("/")  # Séparateur des indices d'une face
+
+
+# Fonction pour trouver le début et la fin de chaque ligne d'un tampon
+def _line_bounds(buf):
+    ends = np.flatnonzero(buf == LF)  # Position de chaque fin de ligne
+    starts = np.empty_like(ends)  # Position du début de chaque ligne
+    if len(ends):
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+    return starts, ends
+
+
+# Fonction pour réunir les lignes retenues dans un seul tampon, mot-clé effacé
+def _gather(buf, starts, ends, lines, keyword_size):
+    # Les lignes d'un même type se suivent : on copie des séries de lignes consécutives
+    cut = np.flatnonzero(np.diff(lines) != 1) + 1
+    run_first = lines[np.r_[0, cut]]  # Première ligne de chaque série
+    run_last = lines[np.r_[cut - 1, len(lines) - 1]]  # Dernière ligne de chaque série
+    block = np.concatenate(
+        [buf[s : e + 1] for s, e in zip(starts[run_first], ends[run_last])]
+    )  # Copie des séries (fins de ligne comprises)
+    lengths = ends[lines] - starts[lines] + 1  # Longueur de chaque ligne
+    line_starts = np.cumsum(lengths) - lengths  # Début des lignes dans le tampon
+    for i in range(keyword_size):  # Remplacer le mot-clé par des espaces
+        block[line_starts + i] = SPACE
+    return block, line_starts
+
+
+# Fonction pour repérer le premier caractère de chaque mot d'un tampon
+def _token_flags(block):
+    blank = (block == SPACE) | (block == TAB) | (block == CR) | (block == LF)
+    first = ~blank  # Un mot commence sur un caractère non blanc...
+    first[1:] &= blank[:-1]  # ...précédé d'un caractère blanc
+    return first
+
+
+# Fonction pour compter les éléments marqués dans chaque segment d'un tampon
+def _count_per_segment(flags, segment_starts):
+    return np.add.reduceat(flags.view(np.uint8), segment_starts, dtype=np.int64)
+
+
+# Fonction pour convertir un tampon de nombres séparés par des blancs
+def _parse_numbers(data, dtype):
+    if len(data) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.fromstring(data, dtype=dtype, sep=" ")  # Conversion en C
+
+
+# Fonction pour ranger les valeurs de chaque ligne dans un tableau (lignes, colonnes)
+def _columns(values, counts, columns, dtype):
+    if len(values) != counts.sum():  # Un mot n'a pas pu être converti
+        raise ValueError("Fichier OBJ invalide : valeur numérique illisible")
+    first = np.cumsum(counts) - counts  # Indice de la première valeur de chaque ligne
+    index = first[:, None] + np.arange(columns)  # Indices des colonnes voulues
+    present = np.arange(columns) < counts[:, None]  # Colonnes absentes mises à 0
+    out = np.zeros((len(counts), columns), dtype=dtype)
+    out[present] = values[index[present]]
+    return out
+
+
+# Fonction pour analyser les lignes de sommets ("v") ou de coordonnées de texture ("vt")
+def _parse_attribute(buf, starts, ends, lines, keyword_size, columns):
+    if len(lines) == 0:
+        return np.zeros((0, columns), dtype=np.float32)
+    block, line_starts = _gather(buf, starts, ends, lines, keyword_size)
+    values = _parse_numbers(block.tobytes(), np.float32)
+    if len(values) == len(lines) * columns:  # Cas courant : même nombre de valeurs par ligne
+        return values.reshape(-1, columns)
+    counts = _count_per_segment(_token_flags(block), line_starts)  # Valeurs par ligne
+    return _columns(values, counts, columns, np.float32)
+
+
+# Fonction pour analyser les lignes de faces ("f")
+def _parse_faces(buf, starts, ends, lines):
+    if len(lines) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return np.zeros(0, dtype=np.int32), empty, empty
+    block, line_starts = _gather(buf, starts, ends, lines, 1)
+    data = block.tobytes()
+    if b"//" in data:  # "v//vn" devient "v/0/vn" : 0 signifie "pas de coordonnée de texture"
+        data = data.replace(b"//", b"/0/")
+        block = np.frombuffer(data, dtype=np.uint8)
+        line_starts, _ = _line_bounds(block)
+
+    corner_flags = _token_flags(block)  # Début de chaque coin "v/vt/vn"
+    corners = _count_per_segment(corner_flags, line_starts)  # Coins par face
+    corner_starts = np.flatnonzero(corner_flags)
+    slashes = _count_per_segment(block == SLASH, corner_starts)  # "/" par coin
+    values = _parse_numbers(data.replace(b"/", b" "), np.int64)  # Tous les indices
+
+    if len(values) == 0 or slashes.min() == slashes.max():  # Même format pour tous les coins
+        per_corner = int(slashes[0]) + 1 if len(slashes) else 1
+        if len(values) != len(corner_starts) * per_corner:
+            raise ValueError("Fichier OBJ invalide : indice de face illisible")
+        values = values.reshape(-1, per_corner)
+        v_raw = values[:, 0]  # Indice du sommet
+        vt_raw = values[:, 1] if per_corner >= 2 else np.zeros_like(v_raw)
+    else:  # Formats mélangés : on repère la position de chaque indice
+        per_corner = slashes + 1
+        if len(values) != per_corner.sum():
+            raise ValueError("Fichier OBJ invalide : indice de face illisible")
+        first = np.cumsum(per_corner) - per_corner  # Premier indice de chaque coin
+        v_raw = values[first]  # Indice du sommet
+        vt_raw = np.zeros_like(v_raw)  # Indice de la coordonnée de texture
+        has_vt = per_corner >= 2
+        vt_raw[has_vt] = values[first[has_vt] + 1]
+    return corners.astype(np.int32), v_raw, vt_raw
+
+
+# Fonction pour analyser une plage d'octets du fichier (exécutée dans un processus du pool)
+def _parse_range(filename, start, end):
+    with open(filename, "rb") as file:  # Ouvrir le fichier en mode binaire
+        file.seek(start)
+        data = file.read(end - start)  # Lire la plage
+    if not data.endswith(b"\n"):
+        data += b"\n"  # Terminer la dernière ligne
+    buf = np.frombuffer(data, dtype=np.uint8)
+    starts, ends = _line_bounds(buf)
+
+    # Type de chaque ligne d'après ses trois premiers caractères
+    last = len(buf) - 1
+    c0 = buf[starts]
+    c1 = buf[np.minimum(starts + 1, last)]
+    c2 = buf[np.minimum(starts + 2, last)]
+    blank1 = (c1 == SPACE) | (c1 == TAB)
+    blank2 = (c2 == SPACE) | (c2 == TAB)
+    v_lines = np.flatnonzero((c0 == ord("v")) & blank1)  # Lignes "v"
+    vt_lines = np.flatnonzero((c0 == ord("v")) & (c1 == ord("t")) & blank2)  # Lignes "vt"
+    f_lines = np.flatnonzero((c0 == ord("f")) & blank1)  # Lignes "f"
+
+    corners, v_raw, vt_raw = _parse_faces(buf, starts, ends, f_lines)
+    return {
+        "vertices": _parse_attribute(buf, starts, ends, v_lines, 1, 3),
+        "texcoords": _parse_attribute(buf, starts, ends, vt_lines, 2, 2),
+        "corners": corners,
+        "v_raw": v_raw,
+        "vt_raw": vt_raw,
+        # Nombre de "v"/"vt" déjà lus dans la plage avant chaque face (indices négatifs)
+        "v_before": np.searchsorted(v_lines, f_lines),
+        "vt_before": np.searchsorted(vt_lines, f_lines),
+    }
+
+
+# Fonction pour découper le fichier en plages qui finissent sur une fin de ligne
+def _split_ranges(filename, size, count):
+    bounds = [0]
+    with open(filename, "rb") as file:
+        for i in range(1, count):
+            file.seek(size * i // count)  # Position approximative
+            file.readline()  # Avancer jusqu'au début de la ligne suivante
+            position = min(file.tell(), size)
+            if position > bounds[-1]:
+                bounds.append(position)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# Fonction pour convertir les indices OBJ (1, 2, ... ou -1, -2, ...) en indices 0..n-1
+def _resolve_indices(raw, before):
+    return np.where(raw > 0, raw - 1, np.where(raw < 0, before + raw, -1))
+
+
+# Fonction pour découper les polygones en triangles (éventail autour du premier coin)
+def _triangulate(corners, v_index, vt_index):
+    first = np.cumsum(corners) - corners  # Premier coin de chaque face
+    keep = corners >= 3  # Ignorer les faces dégénérées
+    first, corners = first[keep], corners[keep]
+    triangles = corners - 2  # Nombre de triangles par face
+    face = np.repeat(np.arange(len(first)), triangles)  # Face de chaque triangle
+    step = np.arange(len(face)) - np.repeat(np.cumsum(triangles) - triangles, triangles)
+    a = first[face]  # Premier coin de l'éventail
+    b = a + step + 1  # Coin suivant
+    c = b + 1  # Coin d'après
+
+    faces = np.empty((len(face), 2, 3), dtype=np.int32)
+    faces[:, 0, 0], faces[:, 0, 1], faces[:, 0, 2] = v_index[a], v_index[b], v_index[c]
+    faces[:, 1, 0], faces[:, 1, 1], faces[:, 1, 2] = vt_index[a], vt_index[b], vt_index[c]
+    return faces
+
+
+# Fonction pour charger un fichier OBJ ; workers > 1 seulement depuis un point d'entrée protégé par __main__
+def load_obj(filename, workers=1):
+    size = os.path.getsize(filename)  # Taille du fichier en octets
+    count = max(1, -(-size // CHUNK_SIZE))  # Nombre de plages
+    if workers > 1 and count > 1:
+        count = max(count, workers)  # Au moins une plage par processus
+    ranges = _split_ranges(filename, size, count)
+
+    if workers > 1 and len(ranges) > 1:  # Analyser les plages en parallèle
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            parts = list(
+                pool.map(
+                    _parse_range,
+                    [filename] * len(ranges),
+                    [start for start, _ in ranges],
+                    [end for _, end in ranges],
+                )
+            )
+    else:  # Petit fichier : pas besoin de pool
+        parts = [_parse_range(filename, start, end) for start, end in ranges]
+
+    if not parts:  # Fichier vide
+        parts = [_parse_range(filename, 0, 0)]
+
+    # Décalage des indices négatifs : nombre de sommets lus dans les plages précédentes
+    v_offset = np.cumsum([0] + [len(p["vertices"]) for p in parts[:-1]])
+    vt_offset = np.cumsum([0] + [len(p["texcoords"]) for p in parts[:-1]])
+    v_before = np.concatenate(
+        [np.repeat(p["v_before"] + off, p["corners"]) for p, off in zip(parts, v_offset)]
+    )
+    vt_before = np.concatenate(
+        [np.repeat(p["vt_before"] + off, p["corners"]) for p, off in zip(parts, vt_offset)]
+    )
+
+    vertices = np.concatenate([p["vertices"] for p in parts])  # Sommets
+    texcoords = np.concatenate([p["texcoords"] for p in parts])  # Coordonnées de texture
+    corners = np.concatenate([p["corners"] for p in parts])  # Coins par face
+    v_index = _resolve_indices(np.concatenate([p["v_raw"] for p in parts]), v_before)
+    vt_index = _resolve_indices(np.concatenate([p["vt_raw"] for p in parts]), vt_before)
+
+    faces = _triangulate(corners, v_index, vt_index)  # Faces triangulées
+    return (
+        vertices,
+        texcoords,
+        faces,
+    )  # Retourner les sommets, les coordonnées de texture et les faces
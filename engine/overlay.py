@@ -0,0 +1,106 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Calque d'interface 2D gardé dans une texture OpenGL : la surface pygame n'est
+# redessinée que si l'état affiché change, et seule la zone modifiée est
+# renvoyée à la carte graphique avec glTexSubImage2D.
+import numpy as np  # Importer la bibliothèque NumPy
+import pygame  # Importer la bibliothèque Pygame
+from OpenGL.GL import *  # Importer les fonctions OpenGL
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+
+
+# Classe pour un calque d'interface plein écran (menu pause, paramètres)
+class OverlayLayer:
+    def __init__(self, owner="interface"):
+        self.owner = owner  # Propriétaire de la texture dans le registre
+        self.size = None  # Taille du calque (largeur, hauteur)
+        self.surface = None  # Surface pygame persistante
+        self.pixels = None  # Derniers pixels envoyés (lignes du bas vers le haut)
+        self.texture = None  # Texture OpenGL du calque
+        self.state = None  # État affiché (clé fournie par l'appelant)
+        self.result = None  # Valeur retournée par la dernière fonction de dessin
+        self.uploaded_bytes = 0  # Octets envoyés lors de la dernière mise à jour
+
+    # Redessiner le calque si l'état a changé ; draw(surface) dessine l'interface
+    def update(self, size, state, draw, background=(0, 0, 0, 0)):
+        size = tuple(size)
+        if size != self.size:  # Première utilisation ou changement de résolution
+            self.release()
+            self.size = size
+            self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        elif state == self.state:  # Rien n'a changé : aucun dessin, aucun envoi
+            self.uploaded_bytes = 0
+            return self.result
+
+        self.state = state
+        self.surface.fill(background)
+        self.result = draw(self.surface)
+        self._upload()
+        return self.result
+
+    # Forcer le prochain update() à redessiner le calque
+    def invalidate(self):
+        self.state = None
+
+    # Envoyer la zone modifiée du calque à la carte graphique
+    def _upload(self):
+        width, height = self.size
+        pixels = np.frombuffer(
+            pygame.image.tostring(self.surface, "RGBA", True), dtype=np.uint8
+        ).reshape(height, width, 4)
+
+        if self.texture is None:  # Première fois : envoyer tout le calque
+            self.texture = registry.texture(self.owner)
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+            glTexImage2D(
+                GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixels
+            )
+            registry.set_bytes("texture", self.texture, pixels.nbytes)
+            self.pixels, self.uploaded_bytes = pixels, pixels.nbytes
+            return
+
+        # Rectangle englobant des pixels modifiés
+        changed = np.any(pixels != self.pixels, axis=2)
+        rows = np.flatnonzero(changed.any(axis=1))
+        self.pixels = pixels
+        if not len(rows):  # Même image (ex. : la souris a bougé sans changer de survol)
+            self.uploaded_bytes = 0
+            return
+        cols = np.flatnonzero(changed[rows[0] : rows[-1] + 1].any(axis=0))
+        y0, y1 = rows[0], rows[-1] + 1
+        x0, x1 = cols[0], cols[-1] + 1
+        dirty = np.ascontiguousarray(pixels[y0:y1, x0:x1])
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexSubImage2D(
+            GL_TEXTURE_2D, 0, int(x0), int(y0), int(x1 - x0), int(y1 - y0),
+            GL_RGBA, GL_UNSIGNED_BYTE, dirty,
+        )  # Envoyer seulement la zone modifiée
+        self.uploaded_bytes = dirty.nbytes
+
+    # Ajouter le calque au lot de primitives (projection orthographique, y vers le bas)
+    def draw(self, batch):
+        if self.texture is None:
+            return
+        width, height = self.size
+        batch.quads(
+            [[(0, 0), (width, 0), (width, height), (0, height)]],
+            (1.0, 1.0, 1.0, 1.0),
+            [(0, 1), (1, 1), (1, 0), (0, 0)],  # Pixels retournés : v = 1 en haut
+            self.texture,
+        )
+
+    # Libérer la texture (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        if self.texture is not None:
+            if delete:
+                registry.delete_texture(self.texture)
+            else:
+                registry.forget("texture", self.texture)
+        self.texture, self.pixels, self.state = None, None, None
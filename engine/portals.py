@@ -0,0 +1,211 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Visibilité par salles et portes (config/rooms.json) : le musée est un graphe
+# de salles (boîtes englobantes) reliées par des portes (quadrilatères). La
+# visibilité part de la salle du visiteur et traverse les portes qui restent
+# dans la pyramide de vue, rétrécie à chaque porte à la partie visible de
+# celle-ci. Seuls les blocs du modèle des salles atteintes sont testés puis
+# dessinés : le coût d'une image dépend de ce qui est visible, pas de la
+# taille du musée.
+import os  # Importer le module os
+import json  # Importer le module json
+import numpy as np  # Importer la bibliothèque NumPy
+
+from engine.frustum import player_frustum  # Importer la pyramide de vue du joueur
+
+ROOMS_FILE = os.path.join("config", "rooms.json")  # Description des salles et des portes
+MAX_DEPTH = 16  # Nombre maximal de portes traversées
+EPSILON = 1e-6  # Tolérance des tests géométriques
+
+
+# Classe pour une salle du musée
+class Room:
+    def __init__(self, name, low, high):
+        self.name = name  # Nom de la salle
+        self.low = np.asarray(low, dtype=np.float64)  # Coin minimal de la boîte
+        self.high = np.asarray(high, dtype=np.float64)  # Coin maximal de la boîte
+        self.portals = []  # Portes : (coins (4, 3), salle voisine)
+        self.chunks = np.zeros(0, dtype=np.int64)  # Blocs du modèle qui touchent la salle
+
+    # Vérifier si un point est dans la salle
+    def contains(self, point):
+        return bool(np.all(point >= self.low) and np.all(point <= self.high))
+
+
+# Fonction pour couper un polygone (n, 3) par un plan (a, b, c, d) : partie du côté positif
+def clip_polygon(polygon, plane):
+    if not len(polygon):
+        return polygon
+    distances = polygon @ plane[:3] + plane[3]
+    result = []
+    for index in range(len(polygon)):  # Algorithme de Sutherland-Hodgman
+        current, following = polygon[index], polygon[(index + 1) % len(polygon)]
+        d0, d1 = distances[index], distances[(index + 1) % len(polygon)]
+        if d0 >= 0:
+            result.append(current)
+        if (d0 >= 0) != (d1 >= 0):  # Le côté traverse le plan
+            result.append(current + (following - current) * (d0 / (d0 - d1)))
+    return np.array(result).reshape(-1, 3)
+
+
+# Fonction pour construire la pyramide de vue qui passe par un polygone vu depuis l'œil
+def portal_frustum(eye, polygon, far_plane):
+    center = polygon.mean(axis=0)
+    planes = []
+    for index in range(len(polygon)):  # Un plan par côté, passant par l'œil
+        a, b = polygon[index], polygon[(index + 1) % len(polygon)]
+        normal = np.cross(a - eye, b - eye)
+        norm = np.linalg.norm(normal)
+        if norm < EPSILON:  # Côté dégénéré
+            continue
+        normal /= norm
+        if normal @ (center - eye) < 0:  # Orienter vers l'intérieur
+            normal = -normal
+        planes.append(np.append(normal, -normal @ eye))
+    # Plan de la porte : seul ce qui est derrière elle est vu à travers
+    normal = np.cross(polygon[1] - polygon[0], polygon[2] - polygon[0])
+    norm = np.linalg.norm(normal)
+    if norm > EPSILON:
+        normal /= norm
+        if normal @ (center - eye) < 0:
+            normal = -normal
+        planes.append(np.append(normal, -normal @ center))
+    planes.append(far_plane)
+    return np.array(planes)
+
+
+# Classe pour le graphe des salles et des portes
+class PortalGraph:
+    def __init__(self):
+        self.rooms = []  # Salles
+        self.outside = np.zeros(0, dtype=np.int64)  # Blocs hors de toute salle (toujours testés)
+        self.current = None  # Dernière salle du visiteur
+        self.last_rooms = 0  # Salles visibles à la dernière image
+        self.frames = 0  # Images comptées
+        self.visited = 0  # Salles visibles depuis le début
+
+    # Lire la description des salles et des portes, puis répartir les blocs du modèle entre les salles
+    def open(self, chunks, filename=ROOMS_FILE):
+        self.rooms, self.current = [], None
+        self.frames = self.visited = 0
+        if os.path.exists(filename):
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    scene = json.load(f)
+                rooms = {
+                    room["name"]: Room(room["name"], room["min"], room["max"])
+                    for room in scene.get("rooms", [])
+                }
+                for portal in scene.get("portals", []):
+                    names = portal["rooms"]
+                    if any(name not in rooms for name in names):
+                        print(f"Porte ignorée, salle inconnue : {' / '.join(names)}")
+                        continue
+                    corners = np.asarray(portal["corners"], dtype=np.float64).reshape(-1, 3)
+                    first, second = rooms[names[0]], rooms[names[1]]
+                    first.portals.append((corners, second))  # Porte traversable dans les deux sens
+                    second.portals.append((corners, first))
+                self.rooms = list(rooms.values())
+            except (OSError, ValueError, KeyError, TypeError) as e:  # Description illisible
+                print(f"Description des salles illisible, pas de visibilité par portes : {e}")
+                self.rooms = []
+
+        # Un bloc appartient à toutes les salles que sa boîte touche
+        assigned = np.zeros(len(chunks.first), dtype=bool)
+        for room in self.rooms:
+            touches = np.all(chunks.maxs >= room.low, axis=1) & np.all(chunks.mins <= room.high, axis=1)
+            room.chunks = np.flatnonzero(touches)
+            assigned |= touches
+        self.outside = np.flatnonzero(~assigned)
+
+    # Trouver la salle qui contient un point (la dernière salle et ses voisines d'abord)
+    def locate(self, point):
+        if self.current is not None:
+            if self.current.contains(point):
+                return self.current
+            for _, neighbour in self.current.portals:
+                if neighbour.contains(point):
+                    return neighbour
+        for room in self.rooms:
+            if room.contains(point):
+                return room
+        return None
+
+    # Vérifier si l'œil est dans l'embrasure d'une porte (plus près que le plan proche)
+    @staticmethod
+    def _in_doorway(eye, corners, near):
+        normal = np.cross(corners[1] - corners[0], corners[2] - corners[0])
+        norm = np.linalg.norm(normal)
+        if norm < EPSILON or abs((eye - corners[0]) @ normal) / norm >= near:
+            return False
+        projected = eye - ((eye - corners[0]) @ normal) / norm**2 * normal  # Œil projeté sur la porte
+        return bool(
+            np.all(projected >= corners.min(axis=0) - near)
+            and np.all(projected <= corners.max(axis=0) + near)
+        )
+
+    # Parcourir les salles visibles : liste de (salle, plans de la pyramide qui y mène)
+    def flood(self, player, planes):
+        eye = np.asarray(player.position, dtype=np.float64)
+        start = self.locate(eye)
+        self.current = start
+        if start is None:
+            return []
+        reached = [(start, planes)]
+        stack = [(start, planes, (start,))]
+        while stack:
+            room, frustum, path = stack.pop()
+            if len(path) > MAX_DEPTH:
+                continue
+            for corners, neighbour in room.portals:
+                if neighbour in path:  # Pas de retour en arrière par un cycle
+                    continue
+                if self._in_doorway(eye, corners, player.near):  # Porte trop proche pour être coupée
+                    narrowed = frustum  # La vue n'est pas rétrécie
+                else:
+                    polygon = corners
+                    for plane in frustum:  # Partie de la porte encore visible
+                        polygon = clip_polygon(polygon, plane)
+                        if len(polygon) < 3:
+                            break
+                    if len(polygon) < 3:
+                        continue
+                    narrowed = portal_frustum(eye, polygon, planes[5])
+                reached.append((neighbour, narrowed))
+                stack.append((neighbour, narrowed, path + (neighbour,)))
+        return reached
+
+    # Blocs du modèle à dessiner, du plus proche au plus lointain
+    # (possible : blocs (masque, indices) que les ensembles visibles gardent, ou None)
+    def visible_chunks(self, chunks, player, possible=None):
+        planes = player_frustum(player)
+        reached = self.flood(player, planes) if self.rooms else []
+        if not reached:  # Pas de description, ou visiteur hors des salles : pyramide de vue seule
+            self.last_rooms = 0
+            if possible is None:
+                return chunks.visible(planes, player.position)
+            order = chunks.sort(chunks.cull(planes, possible[1]), player.position)
+            chunks.record(order)
+            return order
+        mask = possible[0] if possible is not None else None
+        parts = [chunks.cull(planes, self.outside if mask is None else self.outside[mask[self.outside]])]
+        for room, frustum in reached:
+            candidates = room.chunks if mask is None else room.chunks[mask[room.chunks]]
+            parts.append(chunks.cull(frustum, candidates))
+        order = chunks.sort(np.unique(np.concatenate(parts)), player.position)
+        chunks.record(order)
+        self.last_rooms = len({room.name for room, _ in reached})
+        self.frames += 1
+        self.visited += self.last_rooms
+        return order
+
+    # Récupérer les statistiques de visibilité
+    def stats(self):
+        return {
+            "rooms": len(self.rooms),
+            "frames": self.frames,
+            "average": self.visited / self.frames if self.frames else 0.0,
+            "last_rooms": self.last_rooms,
+        }
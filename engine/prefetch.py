@@ -0,0 +1,156 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Préchargement des œuvres le long du trajet du visiteur : les positions des
+# prochaines secondes sont prédites à partir de la vitesse et de la direction
+# du regard, les œuvres proches de ce trajet sont décodées dans des fils de
+# travail puis envoyées à la carte graphique dans un budget de temps par image.
+import numpy as np  # Importer la bibliothèque NumPy
+
+from engine.assets import AssetLoader  # Importer le chargement asynchrone des ressources
+from engine.frustum import player_frustum, spheres_visible  # Importer les tests de visibilité
+
+PREDICT_HORIZON = 4.0  # Durée de la prédiction (s)
+PREDICT_STEP = 0.5  # Intervalle entre deux positions prédites (s)
+PREFETCH_RADIUS = 12.0  # Distance au trajet prédit en deçà de laquelle une œuvre est préchargée
+VIEW_DISTANCE = 30.0  # Distance à laquelle une œuvre visible doit être prête
+UPLOAD_BUDGET = 0.004  # Temps maximal d'envoi OpenGL par image (s)
+MIN_SPEED = 10.0  # Vitesse supposée à l'arrêt (unités/s), pour anticiper dans la direction du regard
+
+
+# Fonction pour rendre un décodage sans erreur : une ressource illisible est signalée puis ignorée
+def _safe_decode(decode, name):
+    def run(filename):
+        try:
+            return decode(filename)
+        except Exception as e:
+            print(f"Préchargement : « {name} » illisible ({filename}) : {e}")
+            return None
+
+    return run
+
+
+# Fonction pour ignorer l'envoi d'une ressource illisible
+def _safe_upload(upload):
+    def run(data):
+        return None if data is None else upload(data)
+
+    return run
+
+
+# Classe pour précharger les œuvres que le visiteur va atteindre
+class Prefetcher:
+    def __init__(self, assets, workers=2):
+        self.assets = assets  # Gestionnaire des ressources OpenGL (GpuAssetManager)
+        self.workers = workers  # Fils de décodage
+        self.artworks = []  # Œuvres du catalogue
+        self.centers = np.zeros((0, 3), dtype=np.float32)  # Centres des œuvres
+        self.radii = np.zeros(0, dtype=np.float32)  # Rayons des sphères englobantes
+        self.kinds = {}  # Type de ressource -> (décodage, envoi, type pour le gestionnaire)
+        self.loader = None  # Chargement en cours (créé au premier besoin)
+        self.queued = set()  # Clés des ressources demandées
+        self.seen = set()  # Œuvres déjà comptées comme visibles (jusqu'à ce qu'elles s'éloignent)
+        self.counters = {"hits": 0, "misses": 0, "prefetched": 0}
+
+    # Définir le catalogue et les fonctions de chargement par type ("texture", "mesh")
+    def open(self, artworks, kinds):
+        self.artworks = list(artworks)
+        self.kinds = kinds
+        self.centers = np.array(
+            [artwork.center for artwork in self.artworks], dtype=np.float32
+        ).reshape(-1, 3)
+        self.radii = np.array([artwork.radius for artwork in self.artworks], dtype=np.float32)
+
+    # Ressources d'une œuvre : (clé, fichier, type)
+    def _resources(self, artwork):
+        return [
+            (artwork.asset_key(kind), filename, kind)
+            for kind, filename in (("texture", artwork.texture), ("mesh", artwork.mesh))
+            if filename
+        ]
+
+    # Vérifier si toutes les ressources d'une œuvre sont envoyées
+    def ready(self, artwork):
+        return all(self.assets.get(key) is not None for key, _, _ in self._resources(artwork))
+
+    # Demander le chargement d'une œuvre
+    def _request(self, artwork):
+        if self.loader is None:
+            self.loader = AssetLoader(self.workers)
+        for key, filename, kind in self._resources(artwork):
+            if key in self.queued:
+                continue
+            decode, upload, _ = self.kinds[kind]
+            self.loader.add(key, filename, _safe_decode(decode, artwork.name), _safe_upload(upload))
+            self.queued.add(key)
+
+    # Prédire les positions du visiteur : (n, 3), de l'instant présent à PREDICT_HORIZON
+    def predict(self, player, delta_time):
+        # Player.update ajoute la vitesse à chaque image : la ramener à une vitesse par seconde
+        velocity = np.asarray(player.velocity, dtype=np.float32) / max(delta_time, 1e-3)
+        speed = float(np.linalg.norm(velocity))
+        if speed < MIN_SPEED:  # À l'arrêt ou presque : anticiper dans la direction du regard
+            direction = np.array([player.front[0], 0.0, player.front[2]], dtype=np.float32)
+            norm = np.linalg.norm(direction)
+            velocity = direction / norm * MIN_SPEED if norm else velocity
+        times = np.arange(0.0, PREDICT_HORIZON + 1e-6, PREDICT_STEP, dtype=np.float32)
+        return np.asarray(player.position, dtype=np.float32) + times[:, None] * velocity
+
+    # Mettre à jour le préchargement (une fois par image, fil principal)
+    def update(self, player, delta_time):
+        if not self.artworks:
+            return
+        # Œuvres proches du trajet prédit, de la plus proche dans le temps à la plus lointaine
+        path = self.predict(player, delta_time)
+        distances = np.linalg.norm(self.centers[:, None] - path[None], axis=2) - self.radii[:, None]
+        close = distances <= PREFETCH_RADIUS
+        arrival = np.where(close.any(axis=1), close.argmax(axis=1), len(path))  # Premier instant proche
+        for index in np.argsort(arrival, kind="stable"):
+            if arrival[index] < len(path):
+                artwork = self.artworks[index]
+                if not all(key in self.queued for key, _, _ in self._resources(artwork)):
+                    self._request(artwork)
+                    self.counters["prefetched"] += 1
+
+        # Œuvres visibles : prêtes à temps (réussite) ou non (raté, demandées en urgence)
+        near = np.linalg.norm(self.centers - player.position, axis=1) - self.radii <= VIEW_DISTANCE
+        visible = near & spheres_visible(player_frustum(player), self.centers, self.radii)
+        for index, artwork in enumerate(self.artworks):
+            if not near[index]:
+                self.seen.discard(artwork.name)  # Compter de nouveau au prochain passage
+            elif visible[index] and artwork.name not in self.seen:
+                self.seen.add(artwork.name)
+                if self.ready(artwork):
+                    self.counters["hits"] += 1
+                else:
+                    self.counters["misses"] += 1
+                    print(f"Préchargement : « {artwork.name} » visible avant d'être prête")
+                    self._request(artwork)
+
+        # Envois OpenGL dans le budget de l'image
+        if self.loader is not None:
+            self.loader.poll(UPLOAD_BUDGET)
+            for key, handle in self.loader.results.items():
+                if handle is not None and self.assets.get(key) is None:
+                    _, _, asset_kind = self.kinds[key.rsplit(":", 1)[1]]
+                    self.assets.adopt(key, asset_kind, handle)
+            self.loader.results.clear()
+
+    # Récupérer les statistiques du préchargement
+    def stats(self):
+        seen = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": self.counters["hits"] / seen if seen else 1.0,
+            "artworks": len(self.artworks),
+            "ready": sum(1 for artwork in self.artworks if self.ready(artwork)),
+        }
+
+    # Oublier les chargements (contexte OpenGL perdu ou fermeture) ; les ressources envoyées appartiennent à assets
+    def release(self, delete=True):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+        self.queued.clear()
+        self.seen.clear()
@@ -0,0 +1,348 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Ensembles potentiellement visibles (PVS) : étape hors ligne qui découpe le
+# volume du musée en cellules de vue et le maillage en groupes de triangles
+# (cases fixes de l'espace), puis lance des rayons depuis chaque cellule pour
+# trouver les groupes visibles, sur tous les cœurs du processeur. Le résultat
+# est un tableau de bits par cellule, relu avec np.memmap. Au lancement
+# suivant, seules les cellules touchées par une modification du maillage sont
+# recalculées.
+#
+# Utilisation : python -m engine.pvs [modèle.obj]
+import os  # Importer le module os
+import sys  # Importer le module sys
+import json  # Importer le module json pour l'en-tête
+import time  # Importer le module time
+import hashlib  # Importer le module hashlib pour les clés et empreintes
+import multiprocessing  # Importer le calcul sur plusieurs processus
+import numpy as np  # Importer la bibliothèque NumPy
+
+MODEL_FILE = os.path.join("src", "models", "Untitled.obj")  # Modèle du musée
+CACHE_DIR = os.path.join("cache", "pvs")  # Dossier des ensembles visibles
+CACHE_VERSION = 1  # Version du format, à incrémenter si le format change
+CELL_SIZE = 4.0  # Côté d'une cellule de vue
+CLUSTER_SIZE = 8.0  # Côté des cases qui regroupent les triangles
+SAMPLES = 4  # Points de vue tirés dans chaque cellule
+DIRECTIONS = 256  # Rayons lancés depuis chaque point de vue
+RAY_BATCH = 256  # Rayons testés ensemble contre un lot de triangles
+TRIANGLE_BATCH = 2048  # Triangles testés ensemble
+EPSILON = 1e-7  # Tolérance du test d'intersection
+
+_scene = {}  # Géométrie du processus de calcul (remplie par _init_worker)
+
+
+# Fonction pour obtenir les chemins des ensembles visibles (bits et en-tête) d'un modèle
+def pvs_paths(filename):
+    name = os.path.splitext(os.path.basename(filename))[0]  # Nom du modèle
+    key = hashlib.blake2b(
+        os.path.abspath(filename).encode("utf-8"), digest_size=6
+    ).hexdigest()  # Clé tirée du chemin complet
+    base = os.path.join(CACHE_DIR, f"{name}-{key}")
+    return base + ".pvs", base + ".json"
+
+
+# Fonction pour grouper les triangles (n, 3, 3) par case fixe de l'espace ;
+# retourne les groupes (clé, empreinte, boîte) et les triangles rangés groupe par groupe
+def build_clusters(triangles):
+    centers = triangles.mean(axis=1)
+    cells = np.floor(centers / CLUSTER_SIZE).astype(np.int64)  # Case de chaque triangle
+    _, inverse = np.unique(cells, axis=0, return_inverse=True)
+    order = np.argsort(inverse.reshape(-1), kind="stable")
+    ordered = triangles[order]
+    _, starts, counts = np.unique(inverse.reshape(-1)[order], return_index=True, return_counts=True)
+    clusters = []
+    for start, count in zip(starts, counts):
+        group = ordered[start : start + count]
+        rows = group.reshape(count, 9)
+        rows = rows[np.lexsort(rows.T[::-1])]  # Empreinte indépendante de l'ordre des triangles
+        clusters.append(
+            {
+                "key": cells[order[start]].tolist(),  # Case : identité stable d'un calcul à l'autre
+                "hash": hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest(),
+                "min": group.reshape(-1, 3).min(axis=0).tolist(),
+                "max": group.reshape(-1, 3).max(axis=0).tolist(),
+                "start": int(start),
+                "count": int(count),
+            }
+        )
+    return clusters, ordered
+
+
+# Fonction pour calculer la grille des cellules de vue couvrant le maillage
+def view_grid(triangles):
+    points = triangles.reshape(-1, 3)
+    origin = np.floor(points.min(axis=0) / CELL_SIZE) * CELL_SIZE  # Grille calée sur des multiples de CELL_SIZE
+    dims = np.maximum(np.ceil((points.max(axis=0) - origin) / CELL_SIZE), 1).astype(np.int64)
+    return {"origin": origin.tolist(), "cell": CELL_SIZE, "dims": dims.tolist()}
+
+
+# Fonction pour répartir des directions régulièrement sur la sphère (spirale de Fibonacci)
+def sphere_directions(count):
+    index = np.arange(count) + 0.5
+    polar = np.arccos(1 - 2 * index / count)
+    azimuth = np.pi * (1 + 5**0.5) * index
+    return np.stack(
+        [np.cos(azimuth) * np.sin(polar), np.cos(polar), np.sin(azimuth) * np.sin(polar)], axis=1
+    )
+
+
+# Fonction pour préparer un processus de calcul (la géométrie est copiée une fois par processus)
+def _init_worker(triangles, clusters, grid):
+    _scene["v0"] = triangles[:, 0].astype(np.float32)
+    _scene["e1"] = (triangles[:, 1] - triangles[:, 0]).astype(np.float32)
+    _scene["e2"] = (triangles[:, 2] - triangles[:, 0]).astype(np.float32)
+    _scene["starts"] = np.array([cluster["start"] for cluster in clusters])
+    _scene["counts"] = np.array([cluster["count"] for cluster in clusters])
+    _scene["mins"] = np.array([cluster["min"] for cluster in clusters])
+    _scene["maxs"] = np.array([cluster["max"] for cluster in clusters])
+    _scene["grid"] = grid
+    _scene["directions"] = sphere_directions(DIRECTIONS)
+
+
+# Fonction pour trouver le premier triangle touché par des rayons (Möller-Trumbore, un lot de triangles)
+def _intersect(origins, directions, v0, e1, e2):
+    p = np.cross(directions[:, None], e2[None])  # (rayons, triangles, 3)
+    det = np.einsum("rtk,tk->rt", p, e1)
+    valid = np.abs(det) > EPSILON  # Rayon non parallèle au triangle
+    inverse = np.where(valid, 1.0 / np.where(valid, det, 1.0), 0.0)
+    s = origins[:, None] - v0[None]
+    u = np.einsum("rtk,rtk->rt", s, p) * inverse
+    q = np.cross(s, e1[None])
+    v = np.einsum("rk,rtk->rt", directions, q) * inverse
+    t = np.einsum("rtk,tk->rt", q, e2) * inverse
+    hit = valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > EPSILON)
+    t = np.where(hit, t, np.inf)
+    return t.min(axis=1)
+
+
+# Fonction pour calculer les groupes visibles depuis une cellule (processus de calcul) : bits compactés
+def _bake_cell(cell):
+    grid = _scene["grid"]
+    dims = np.array(grid["dims"])
+    coords = np.array(np.unravel_index(cell, dims))
+    low = np.array(grid["origin"]) + coords * grid["cell"]
+    high = low + grid["cell"]
+    mins, maxs = _scene["mins"], _scene["maxs"]
+    visible = np.all(maxs >= low, axis=1) & np.all(mins <= high, axis=1)  # Groupes dans la cellule
+
+    rng = np.random.default_rng(cell)  # Tirage reproductible : même résultat à chaque calcul
+    samples = low + rng.random((SAMPLES, 3)) * grid["cell"]
+    rotations = np.linalg.qr(rng.normal(size=(SAMPLES, 3, 3)))[0]  # Directions tournées par point de vue
+    origins = np.repeat(samples, DIRECTIONS, axis=0).astype(np.float32)
+    directions = (_scene["directions"] @ rotations).reshape(-1, 3).astype(np.float32)
+
+    center = (low + high) / 2
+    closest = np.clip(center, mins, maxs)
+    order = np.argsort(np.linalg.norm(closest - center, axis=1))  # Groupes proches d'abord
+    inverse = 1.0 / np.where(np.abs(directions) > EPSILON, directions, EPSILON)
+    for first in range(0, len(origins), RAY_BATCH):
+        batch = slice(first, first + RAY_BATCH)
+        o, d, inv = origins[batch], directions[batch], inverse[batch]
+        best = np.full(len(o), np.inf)  # Distance du premier triangle touché
+        owner = np.full(len(o), -1)  # Groupe du premier triangle touché
+        for index in order:
+            # Rayons qui entrent dans la boîte du groupe avant leur meilleur impact
+            t0, t1 = (mins[index] - o) * inv, (maxs[index] - o) * inv
+            enter = np.minimum(t0, t1).max(axis=1)
+            leave = np.maximum(t0, t1).min(axis=1)
+            rays = np.flatnonzero((leave >= np.maximum(enter, 0)) & (enter < best))
+            if not len(rays):
+                continue
+            start, count = _scene["starts"][index], _scene["counts"][index]
+            for offset in range(start, start + count, TRIANGLE_BATCH):
+                stop = min(offset + TRIANGLE_BATCH, start + count)
+                triangles = slice(offset, stop)
+                t = _intersect(
+                    o[rays], d[rays], _scene["v0"][triangles], _scene["e1"][triangles], _scene["e2"][triangles]
+                )
+                closer = t < best[rays]
+                best[rays[closer]] = t[closer]
+                owner[rays[closer]] = index
+        visible[owner[owner >= 0]] = True
+    return cell, np.packbits(visible)
+
+
+# Fonction pour lire des ensembles visibles déjà calculés : (en-tête, bits (cellules, octets)) ou None
+def _read_pvs(filename):
+    data_path, header_path = pvs_paths(filename)
+    if not os.path.exists(data_path) or not os.path.exists(header_path):
+        return None
+    try:
+        with open(header_path, "r") as f:
+            header = json.load(f)
+        if header.get("version") != CACHE_VERSION:
+            return None
+        cells = int(np.prod(header["grid"]["dims"]))
+        width = (len(header["clusters"]) + 7) // 8  # Octets par cellule
+        if os.path.getsize(data_path) != cells * width:
+            return None  # Fichier tronqué
+        bits = np.memmap(data_path, dtype=np.uint8, mode="r").reshape(cells, width)
+        return header, bits
+    except (OSError, ValueError, KeyError, TypeError) as e:  # En-tête illisible
+        print(f"Ensembles visibles illisibles ({filename}) : {e}")
+        return None
+
+
+# Fonction pour trouver les cellules à recalculer après une modification du maillage
+def _affected_cells(old_header, old_bits, clusters, grid):
+    old_clusters = old_header["clusters"]
+    new_hashes = {tuple(cluster["key"]): cluster["hash"] for cluster in clusters}
+    old_hashes = {tuple(cluster["key"]): cluster["hash"] for cluster in old_clusters}
+    changed = {  # Groupes ajoutés, retirés ou modifiés
+        key for key in new_hashes.keys() | old_hashes.keys() if new_hashes.get(key) != old_hashes.get(key)
+    }
+    if not changed:
+        return np.zeros(len(old_bits), dtype=bool), changed
+
+    # Zone modifiée : cases des groupes changés et leurs voisines
+    changed_keys = np.array(sorted(changed))
+    old_keys = np.array([cluster["key"] for cluster in old_clusters])
+    near = np.any(np.abs(old_keys[:, None] - changed_keys[None]).max(axis=2) <= 1, axis=1)  # Groupes voisins
+    visible = np.unpackbits(old_bits, axis=1)[:, : len(old_clusters)].astype(bool)
+    affected = visible[:, near].any(axis=1)  # Cellules qui voyaient la zone modifiée
+
+    # Cellules dans la zone modifiée (elles ne voyaient peut-être rien avant)
+    dims = np.array(grid["dims"])
+    coords = np.stack(np.unravel_index(np.arange(len(old_bits)), dims), axis=1)
+    centers = np.array(grid["origin"]) + (coords + 0.5) * grid["cell"]
+    cell_keys = np.floor(centers / CLUSTER_SIZE).astype(np.int64)
+    affected |= np.any(np.abs(cell_keys[:, None] - changed_keys[None]).max(axis=2) <= 1, axis=1)
+    return affected, changed
+
+
+# Fonction pour calculer (ou mettre à jour) les ensembles visibles d'un modèle
+def bake(filename, workers=None):
+    from engine.mesh_cache import load_cached_mesh  # Importer le cache des maillages
+
+    interleaved, indices, _, _ = load_cached_mesh(filename, workers or os.cpu_count() or 1)  # Hors ligne : tous les cœurs
+    triangles = np.asarray(interleaved)[:, :3][np.asarray(indices).reshape(-1, 3)].astype(np.float64)
+    clusters, ordered = build_clusters(triangles)
+    grid = view_grid(triangles)
+    cells = int(np.prod(grid["dims"]))
+    width = (len(clusters) + 7) // 8
+    settings = {"cluster": CLUSTER_SIZE, "samples": SAMPLES, "directions": DIRECTIONS}
+
+    bits = np.zeros((cells, width), dtype=np.uint8)
+    todo = np.arange(cells)
+    previous = _read_pvs(filename)
+    if previous is not None and previous[0]["grid"] == grid and previous[0].get("settings") == settings:
+        old_header, old_bits = previous
+        affected, changed = _affected_cells(old_header, old_bits, clusters, grid)
+        # Recopier les autres cellules, bits replacés selon la case de chaque groupe
+        positions = {tuple(cluster["key"]): index for index, cluster in enumerate(clusters)}
+        old_visible = np.unpackbits(old_bits, axis=1)[:, : len(old_header["clusters"])].astype(bool)
+        new_visible = np.zeros((cells, len(clusters)), dtype=bool)
+        for old_index, cluster in enumerate(old_header["clusters"]):
+            new_index = positions.get(tuple(cluster["key"]))
+            if new_index is not None:
+                new_visible[:, new_index] = old_visible[:, old_index]
+        # Groupes ajoutés ou modifiés : visibles par défaut depuis les cellules non recalculées
+        # (un objet posé dans un espace dégagé peut être vu de cellules qui ne voyaient rien autour)
+        fresh = [positions[key] for key in changed if key in positions]
+        if fresh:
+            new_visible[np.ix_(~affected, fresh)] = True
+        bits = np.packbits(new_visible, axis=1).reshape(cells, width)
+        todo = np.flatnonzero(affected)
+        print(f"{len(changed)} groupes modifiés, {len(todo)}/{cells} cellules à recalculer")
+        del previous, old_bits, old_visible  # Fermer la projection avant le remplacement
+
+    start = time.perf_counter()
+    if len(todo):
+        with multiprocessing.Pool(workers, _init_worker, (ordered, clusters, grid)) as pool:
+            for done, (cell, row) in enumerate(pool.imap_unordered(_bake_cell, todo.tolist(), chunksize=4), 1):
+                bits[cell] = row
+                if done % 100 == 0 or done == len(todo):
+                    print(f"{done}/{len(todo)} cellules ({time.perf_counter() - start:.0f} s)")
+
+    stat = os.stat(filename)
+    header = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "grid": grid,
+        "settings": settings,
+        "clusters": [{key: cluster[key] for key in ("key", "hash", "min", "max")} for cluster in clusters],
+    }
+    data_path, header_path = pvs_paths(filename)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    bits.tofile(data_path + ".tmp")
+    with open(header_path + ".tmp", "w") as f:
+        json.dump(header, f)
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(header_path + ".tmp", header_path)
+    return cells, len(todo), len(clusters)
+
+
+# Classe pour consulter les ensembles visibles pendant la visite
+class PotentialVisibility:
+    def __init__(self):
+        self.bits = None  # Bits par cellule (projection en mémoire), None sans calcul
+        self.grid = None  # Grille des cellules de vue
+        self.overlap = None  # Bloc du modèle x groupe : la boîte du bloc touche celle du groupe
+        self.clusters = 0  # Nombre de groupes
+        self.cell = None  # Dernière cellule consultée
+        self.found = None  # Blocs possibles dans cette cellule : (masque, indices)
+        self.changes = 0  # Changements de cellule
+        self.fraction = 0.0  # Somme des parts de blocs gardées à chaque changement
+
+    # Ouvrir les ensembles visibles du modèle et les relier aux blocs de dessin
+    def open(self, filename, chunks):
+        self.bits, self.cell, self.found = None, None, None
+        self.changes, self.fraction = 0, 0.0
+        previous = _read_pvs(filename)
+        if previous is None:
+            if os.path.exists(filename):
+                print(f"Pas d'ensembles visibles pour {filename}, lancer : python -m engine.pvs {filename}")
+            return
+        header, bits = previous
+        stat = os.stat(filename) if os.path.exists(filename) else None
+        if stat is not None and (header["size"] != stat.st_size or header["mtime_ns"] != stat.st_mtime_ns):
+            print(f"Ensembles visibles périmés, lancer : python -m engine.pvs {filename}")
+            return
+        mins = np.array([cluster["min"] for cluster in header["clusters"]]).reshape(-1, 3)
+        maxs = np.array([cluster["max"] for cluster in header["clusters"]]).reshape(-1, 3)
+        self.overlap = np.all(chunks.maxs[:, None] >= mins[None], axis=2) & np.all(
+            chunks.mins[:, None] <= maxs[None], axis=2
+        )
+        self.grid = header["grid"]
+        self.clusters = len(mins)
+        self.bits = bits
+
+    # Blocs possibles depuis une position : (masque, indices), ou None hors de la grille
+    def lookup(self, position):
+        if self.bits is None:
+            return None
+        coords = np.floor((np.asarray(position) - self.grid["origin"]) / self.grid["cell"]).astype(np.int64)
+        if np.any(coords < 0) or np.any(coords >= self.grid["dims"]):
+            self.cell = None
+            return None
+        cell = int(np.ravel_multi_index(coords, self.grid["dims"]))
+        if cell != self.cell:  # Nouvelle cellule : une seule lecture de bits
+            visible = np.unpackbits(self.bits[cell])[: self.clusters].astype(bool)
+            mask = self.overlap[:, visible].any(axis=1)
+            self.cell, self.found = cell, (mask, np.flatnonzero(mask))
+            self.changes += 1
+            self.fraction += mask.mean() if len(mask) else 1.0
+        return self.found
+
+    # Récupérer les statistiques des ensembles visibles
+    def stats(self):
+        return {
+            "loaded": self.bits is not None,
+            "changes": self.changes,
+            "kept": self.fraction / self.changes if self.changes else 1.0,
+        }
+
+
+# Calculer les ensembles visibles du modèle donné (ou du musée)
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else MODEL_FILE
+    started = time.perf_counter()
+    cells, baked, clusters = bake(source)
+    print(
+        f"{source} : {baked}/{cells} cellules calculées, {clusters} groupes, "
+        f"{time.perf_counter() - started:.0f} s ({CACHE_DIR})"
+    )
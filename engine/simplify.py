@@ -0,0 +1,141 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Simplification des maillages par fusion d'arêtes guidée par les quadriques
+# d'erreur (Garland et Heckbert). Les fusions sont faites par vagues : à chaque
+# vague, toutes les arêtes sont évaluées en une fois avec NumPy, puis un
+# ensemble d'arêtes sans sommet commun, choisies parmi les moins coûteuses,
+# est fusionné d'un coup. Les bords libres sont retenus par des plans
+# perpendiculaires et les fusions qui retourneraient une face sont refusées.
+import numpy as np  # Importer la bibliothèque NumPy
+
+BOUNDARY_WEIGHT = 100.0  # Poids des plans qui retiennent les bords libres
+FLIP_LIMIT = 0.2  # Cosinus minimal entre l'ancienne et la nouvelle normale d'une face
+WAVE_SHARE = 0.5  # Part des fusions possibles faites à chaque vague (les moins coûteuses)
+
+
+# Fonction pour calculer les normales (non normalisées) des faces
+def _face_normals(positions, faces):
+    a, b, c = positions[faces[:, 0]], positions[faces[:, 1]], positions[faces[:, 2]]
+    return np.cross(b - a, c - a)
+
+
+# Fonction pour lister les arêtes (a < b) des faces ; keys : une clé entière par côté de face
+def _edges(faces, count):
+    sides = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    keys = sides[:, 0] * count + sides[:, 1]  # Tri d'entiers, bien plus rapide que des lignes
+    unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    return np.stack((unique // count, unique % count), axis=1), inverse, counts
+
+
+# Fonction pour calculer la quadrique d'erreur de chaque sommet (sommets, 4, 4)
+def _vertex_quadrics(positions, faces):
+    normals = _face_normals(positions, faces)
+    areas = np.linalg.norm(normals, axis=1)
+    valid = areas > 1e-12
+    normals = normals[valid] / areas[valid, None]
+    planes = np.c_[normals, -(normals * positions[faces[valid, 0]]).sum(axis=1)]  # (a, b, c, d)
+    quadrics = planes[:, :, None] * planes[:, None, :] * areas[valid, None, None]  # Pondérées par l'aire
+    result = np.zeros((len(positions), 4, 4))
+    for corner in range(3):
+        np.add.at(result, faces[valid, corner], quadrics)
+
+    # Bords libres : arêtes d'une seule face, retenues par un plan perpendiculaire à la face
+    edges = np.concatenate([faces[valid][:, [0, 1]], faces[valid][:, [1, 2]], faces[valid][:, [2, 0]]])
+    owners = np.tile(np.arange(len(normals)), 3)
+    _, inverse, counts = _edges(faces[valid], len(positions))
+    border = counts[inverse] == 1
+    if border.any():
+        start, end = positions[edges[border, 0]], positions[edges[border, 1]]
+        sides = np.cross(end - start, normals[owners[border]])
+        lengths = np.linalg.norm(sides, axis=1)
+        keep = lengths > 1e-12
+        sides = sides[keep] / lengths[keep, None]
+        planes = np.c_[sides, -(sides * start[keep]).sum(axis=1)]
+        quadrics = planes[:, :, None] * planes[:, None, :] * (BOUNDARY_WEIGHT * lengths[keep] ** 2)[:, None, None]
+        for column in range(2):
+            np.add.at(result, edges[border][keep, column], quadrics)
+    return result
+
+
+# Fonction pour calculer la position optimale et le coût de la fusion de chaque arête
+def _edge_costs(positions, quadrics, edges):
+    total = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]  # (arêtes, 4, 4)
+    midpoint = (positions[edges[:, 0]] + positions[edges[:, 1]]) / 2
+    system = total[:, :3, :3]
+    determinant = np.einsum("ek,ek->e", system[:, 0], np.cross(system[:, 1], system[:, 2]))
+    solvable = np.abs(determinant) > 1e-10  # Quadrique inversible : position optimale exacte
+    targets = midpoint.copy()
+    if solvable.any():
+        targets[solvable] = np.linalg.solve(system[solvable], -total[solvable, :3, 3][..., None])[..., 0]
+    homogeneous = np.c_[targets, np.ones(len(targets))]
+    costs = np.einsum("ei,eij,ej->e", homogeneous, total, homogeneous)
+    return targets, np.maximum(costs, 0.0)
+
+
+# Fonction pour simplifier un maillage jusqu'à target faces ; faces (n, 3) d'indices de sommets,
+# corners (n, 3) données propres à chaque coin (indices de coordonnées de texture), conservées
+# Retourne (positions, faces, coins, erreur maximale des fusions)
+def simplify(positions, faces, corners, target):
+    positions = np.asarray(positions, dtype=np.float64).copy()
+    faces = np.asarray(faces, dtype=np.int64).copy()
+    corners = np.asarray(corners).copy()
+    quadrics = _vertex_quadrics(positions, faces)
+    error = 0.0
+    while len(faces) > target:
+        edges = _edges(faces, len(positions))[0]
+        targets, costs = _edge_costs(positions, quadrics, edges)
+
+        # Fusions indépendantes : chaque arête retenue est la moins coûteuse pour ses deux sommets
+        ranked = costs + np.arange(len(costs)) * 1e-15 * (costs.max() + 1.0)  # Départager les égalités
+        best = np.full(len(positions), np.inf)
+        np.minimum.at(best, edges[:, 0], ranked)
+        np.minimum.at(best, edges[:, 1], ranked)
+        chosen = np.flatnonzero((ranked == best[edges[:, 0]]) & (ranked == best[edges[:, 1]]))
+        chosen = chosen[np.argsort(costs[chosen], kind="stable")]
+        needed = max(1, (len(faces) - target + 1) // 2)  # Une fusion retire environ deux faces
+        chosen = chosen[: max(1, min(needed, int(len(chosen) * WAVE_SHARE)))]
+
+        # Refuser les fusions qui retourneraient une face restante
+        remap = np.arange(len(positions))
+        remap[edges[chosen, 1]] = edges[chosen, 0]
+        moved = positions.copy()
+        moved[edges[chosen, 0]] = targets[chosen]
+        new_faces = remap[faces]
+        alive = (new_faces[:, 0] != new_faces[:, 1]) & (new_faces[:, 1] != new_faces[:, 2]) & (
+            new_faces[:, 2] != new_faces[:, 0]
+        )
+        before = _face_normals(positions, faces)
+        after = _face_normals(moved, new_faces)
+        cosine = (before * after).sum(axis=1) / np.maximum(
+            np.linalg.norm(before, axis=1) * np.linalg.norm(after, axis=1), 1e-20
+        )
+        flipped = alive & (cosine < FLIP_LIMIT) & (np.linalg.norm(before, axis=1) > 1e-12)
+        if flipped.any():
+            owner = np.full(len(positions), -1)  # Fusion qui touche chaque sommet
+            owner[edges[chosen, 0]] = np.arange(len(chosen))
+            owner[edges[chosen, 1]] = np.arange(len(chosen))
+            refused = np.unique(owner[faces[flipped]])
+            keep = np.ones(len(chosen), dtype=bool)
+            keep[refused[refused >= 0]] = False
+            chosen = chosen[keep]
+            if not len(chosen):  # Plus aucune fusion possible sans retourner de face
+                break
+            remap = np.arange(len(positions))
+            remap[edges[chosen, 1]] = edges[chosen, 0]
+            new_faces = remap[faces]
+            alive = (new_faces[:, 0] != new_faces[:, 1]) & (new_faces[:, 1] != new_faces[:, 2]) & (
+                new_faces[:, 2] != new_faces[:, 0]
+            )
+
+        # Appliquer les fusions
+        keepers, removed = edges[chosen, 0], edges[chosen, 1]
+        positions[keepers] = targets[chosen]
+        quadrics[keepers] += quadrics[removed]
+        error = max(error, float(costs[chosen].max()))
+        faces, corners = new_faces[alive], corners[alive]
+
+    # Retirer les sommets qui ne servent plus
+    used, faces = np.unique(faces, return_inverse=True)
+    return positions[used], faces.reshape(-1, 3), corners, error
@@ -0,0 +1,77 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Ciel du musée : sphère précalculée (sommets et indices pour un VBO) et image
+# du ciel réduite selon le préréglage graphique, gardée en cache sur disque.
+import os  # Importer le module os
+import numpy as np  # Importer la bibliothèque NumPy
+import pygame  # Importer la bibliothèque Pygame
+
+from engine.mesh import VERTEX_SIZE  # Importer le format des sommets entrelacés
+
+CACHE_DIR = os.path.join("cache", "sky")  # Dossier des images du ciel réduites
+SKY_RESOLUTIONS = {
+    "haute": None,  # Image d'origine
+    "moyenne": 2048,  # Largeur maximale en pixels
+    "basse": 1024,
+}  # Largeur de l'image du ciel selon le préréglage graphique
+
+
+# Fonction pour construire une sphère texturée (mêmes coordonnées de texture que gluSphere)
+def build_sky_sphere(radius, slices=64, stacks=32):
+    # s vaut 0 sur +y, 0.25 sur +x... ; t vaut 0 en z = -rayon et 1 en z = +rayon
+    s = np.linspace(0.0, 1.0, slices + 1, dtype=np.float64)  # Une colonne de plus pour la couture
+    t = np.linspace(0.0, 1.0, stacks + 1, dtype=np.float64)
+    s_grid, t_grid = np.meshgrid(s, t)  # (stacks + 1, slices + 1)
+    theta = 2.0 * np.pi * s_grid  # Longitude
+    ring = np.sin(np.pi * t_grid)  # Rayon de chaque cercle de latitude
+
+    interleaved = np.empty((stacks + 1, slices + 1, VERTEX_SIZE), dtype=np.float32)
+    interleaved[..., 0] = radius * np.sin(theta) * ring
+    interleaved[..., 1] = radius * np.cos(theta) * ring
+    interleaved[..., 2] = -radius * np.cos(np.pi * t_grid)
+    interleaved[..., 3] = s_grid
+    interleaved[..., 4] = t_grid
+
+    # Deux triangles par case de la grille
+    corner = (np.arange(stacks)[:, None] * (slices + 1) + np.arange(slices)).reshape(-1)
+    above = corner + slices + 1  # Sommet de la ligne suivante
+    indices = np.stack(
+        (corner, corner + 1, above + 1, corner, above + 1, above), axis=1
+    ).reshape(-1)
+    return interleaved.reshape(-1, VERTEX_SIZE), indices.astype(np.uint16)
+
+
+# Fonction pour charger l'image du ciel, réduite à max_width (None : taille d'origine)
+def load_sky_image(filename, max_width=None):
+    stat = os.stat(filename)
+    name = os.path.splitext(os.path.basename(filename))[0]
+    cache_file = os.path.join(
+        CACHE_DIR, f"{name}-{stat.st_size}-{stat.st_mtime_ns}-{max_width or 0}.npy"
+    )  # Le nom change si l'image source change
+    if os.path.exists(cache_file):
+        try:
+            pixels = np.load(cache_file, mmap_mode="r")  # Pixels RGBA déjà réduits et retournés
+            height, width = pixels.shape[:2]
+            return pixels, width, height
+        except (OSError, ValueError) as e:  # Fichier tronqué ou illisible
+            print(f"Cache du ciel illisible, reconstruction : {e}")
+
+    surface = pygame.image.load(filename)  # Décoder l'image d'origine
+    width, height = surface.get_size()
+    if max_width and width > max_width:  # Réduire l'image pour les petites configurations
+        height = max(1, round(height * max_width / width))
+        width = max_width
+        surface = pygame.transform.smoothscale(surface, (width, height))
+    pixels = np.frombuffer(
+        pygame.image.tostring(surface, "RGBA", True), dtype=np.uint8
+    ).reshape(height, width, 4)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.save(cache_file + ".tmp.npy", pixels)  # Fichier temporaire puis renommage
+        os.replace(cache_file + ".tmp.npy", cache_file)
+    except OSError as e:  # Dossier en lecture seule, disque plein...
+        print(f"Impossible d'écrire le cache du ciel : {e}")
+    return pixels, width, height
@@ -0,0 +1,197 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Affichage du texte avec un atlas de glyphes : chaque police est rendue une
+# seule fois dans une texture, puis les chaînes sont dessinées comme des
+# quadrilatères texturés réunis dans un seul tampon (un appel de dessin).
+import ctypes  # Importer ctypes pour les décalages dans le tampon
+import numpy as np  # Importer la bibliothèque NumPy
+import pygame  # Importer la bibliothèque Pygame
+from OpenGL.GL import *  # Importer les fonctions OpenGL
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+
+# Caractères rendus dans l'atlas (ASCII imprimable et lettres accentuées françaises)
+ATLAS_CHARS = (
+    "".join(chr(code) for code in range(32, 127))
+    + "àâäçéèêëîïôöùûüÿœæÀÂÄÇÉÈÊËÎÏÔÖÙÛÜŸŒÆ°€«»’…"
+)
+FALLBACK_CHAR = "?"  # Caractère affiché à la place d'un caractère absent de l'atlas
+ATLAS_WIDTH = 512  # Largeur de l'atlas en pixels
+GLYPH_PADDING = 1  # Marge autour de chaque glyphe (évite les bavures du filtrage)
+TEXT_VERTEX_SIZE = 8  # Flottants par sommet : x, y, u, v, r, g, b, a
+LAYOUT_CACHE_SIZE = 256  # Nombre de mises en page gardées par police
+
+
+# Classe pour une police rendue dans une texture
+class GlyphAtlas:
+    def __init__(self, font):
+        self.height = font.get_height()  # Hauteur d'une ligne
+        self.glyphs = {}  # Caractère -> (largeur, u0, v0, u1, v1)
+        self.layouts = {}  # Texte -> sommets relatifs et taille (mise en page en cache)
+
+        # Placer les glyphes ligne par ligne dans l'atlas
+        surfaces, positions = {}, {}
+        x, y = 0, 0
+        for char in ATLAS_CHARS:
+            surface = font.render(char, True, (255, 255, 255))  # Glyphe blanc sur fond transparent
+            if x + surface.get_width() + GLYPH_PADDING > ATLAS_WIDTH:  # Ligne suivante
+                x, y = 0, y + self.height + GLYPH_PADDING
+            surfaces[char], positions[char] = surface, (x, y)
+            x += surface.get_width() + GLYPH_PADDING
+        atlas_height = 1 << (y + self.height).bit_length()  # Hauteur en puissance de 2
+
+        atlas = pygame.Surface((ATLAS_WIDTH, atlas_height), pygame.SRCALPHA)
+        atlas.fill((255, 255, 255, 0))
+        for char, surface in surfaces.items():
+            atlas.blit(surface, positions[char])
+            gx, gy = positions[char]
+            width = surface.get_width()
+            # Image retournée à l'envoi : v = 1 en haut de l'atlas
+            self.glyphs[char] = (
+                width,
+                gx / ATLAS_WIDTH,
+                1.0 - gy / atlas_height,
+                (gx + width) / ATLAS_WIDTH,
+                1.0 - (gy + self.height) / atlas_height,
+            )
+
+        self.texture = registry.texture("texte")  # Texture de l'atlas, créée une seule fois
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexImage2D(
+            GL_TEXTURE_2D,
+            0,
+            GL_RGBA,
+            ATLAS_WIDTH,
+            atlas_height,
+            0,
+            GL_RGBA,
+            GL_UNSIGNED_BYTE,
+            pygame.image.tostring(atlas, "RGBA", True),
+        )  # Envoyer l'atlas
+        registry.set_bytes("texture", self.texture, ATLAS_WIDTH * atlas_height * 4)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+    # Mettre en page un texte : coins (x, y vers le bas) et coordonnées de texture de chaque glyphe
+    def layout(self, text):
+        cached = self.layouts.get(text)
+        if cached is not None:
+            return cached
+        glyphs = [self.glyphs.get(char) or self.glyphs[FALLBACK_CHAR] for char in text]
+        table = np.array(glyphs, dtype=np.float32).reshape(-1, 5)
+        widths = table[:, 0]
+        x0 = np.cumsum(widths) - widths  # Position de chaque glyphe sur la ligne
+        x1 = x0 + widths
+        quads = np.empty((len(table), 4, 4), dtype=np.float32)  # (glyphe, coin, x y u v)
+        for corner, (xs, ys, us, vs) in enumerate(
+            (
+                (x0, 0.0, table[:, 1], table[:, 2]),  # Haut gauche
+                (x1, 0.0, table[:, 3], table[:, 2]),  # Haut droit
+                (x1, self.height, table[:, 3], table[:, 4]),  # Bas droit
+                (x0, self.height, table[:, 1], table[:, 4]),  # Bas gauche
+            )
+        ):
+            quads[:, corner, 0], quads[:, corner, 1] = xs, ys
+            quads[:, corner, 2], quads[:, corner, 3] = us, vs
+        cached = (quads.reshape(-1, 4), float(x1[-1]) if len(x1) else 0.0, self.height)
+        if len(self.layouts) >= LAYOUT_CACHE_SIZE:  # Vider le cache des textes trop variés
+            self.layouts.clear()
+        self.layouts[text] = cached
+        return cached
+
+
+# Classe pour dessiner du texte par lots
+class TextRenderer:
+    def __init__(self):
+        self.atlases = {}  # id(police) -> (police, atlas)
+        self.batches = {}  # Texture de l'atlas -> sommets en attente
+        self.vbo = None  # Tampon des sommets, réutilisé d'une image à l'autre
+        self.vbo_size = 0  # Taille du tampon en octets
+
+    # Récupérer l'atlas d'une police (créé au premier usage)
+    def atlas(self, font):
+        entry = self.atlases.get(id(font))
+        if entry is None:
+            entry = self.atlases[id(font)] = (font, GlyphAtlas(font))  # Garder la police en vie
+        return entry[1]
+
+    # Mesurer un texte (largeur, hauteur) sans le dessiner
+    def measure(self, text, font):
+        _, width, height = self.atlas(font).layout(text)
+        return width, height
+
+    # Ajouter un texte au lot ; (x, y) est le coin haut gauche, ou bas gauche si y_up
+    def draw(self, text, font, x, y, color=(255, 255, 255), y_up=False):
+        atlas = self.atlas(font)
+        quads, width, height = atlas.layout(text)
+        if not len(quads):
+            return width, height
+        vertices = np.empty((len(quads), TEXT_VERTEX_SIZE), dtype=np.float32)
+        vertices[:, 0] = quads[:, 0] + x
+        vertices[:, 1] = y + height - quads[:, 1] if y_up else y + quads[:, 1]
+        vertices[:, 2:4] = quads[:, 2:4]
+        vertices[:, 4:] = np.array(
+            [*color, 255][:4], dtype=np.float32
+        ) / 255.0  # Couleur du texte (0-255 comme pygame)
+        self.batches.setdefault(atlas.texture, []).append(vertices)
+        return width, height
+
+    # Dessiner tous les textes en attente : un envoi du tampon et un appel par atlas
+    def flush(self):
+        if not self.batches:
+            return
+        batches = [(texture, np.concatenate(parts)) for texture, parts in self.batches.items()]
+        self.batches = {}
+        data = np.concatenate([vertices for _, vertices in batches])
+
+        if self.vbo is None:
+            self.vbo = registry.buffer("texte")
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        if data.nbytes > self.vbo_size:  # Agrandir le tampon
+            self.vbo_size = max(data.nbytes, self.vbo_size * 2)
+            glBufferData(GL_ARRAY_BUFFER, self.vbo_size, None, GL_STREAM_DRAW)
+            registry.set_bytes("buffer", self.vbo, self.vbo_size)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)  # Un seul envoi par lot
+
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT)  # Sauvegarder les états modifiés
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)  # La transparence de l'atlas découpe les glyphes
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_CULL_FACE)
+
+        stride = TEXT_VERTEX_SIZE * 4  # Taille d'un sommet en octets
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, stride, None)
+        glTexCoordPointer(2, GL_FLOAT, stride, ctypes.c_void_p(2 * 4))
+        glColorPointer(4, GL_FLOAT, stride, ctypes.c_void_p(4 * 4))
+        first = 0
+        for texture, vertices in batches:  # Un appel de dessin par police
+            glBindTexture(GL_TEXTURE_2D, texture)
+            glDrawArrays(GL_QUADS, first, len(vertices))
+            first += len(vertices)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopAttrib()  # Restaurer les états
+        glColor4f(1.0, 1.0, 1.0, 1.0)  # Le tableau de couleurs laisse la couleur courante indéfinie
+
+    # Libérer les atlas et le tampon (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        for _, atlas in self.atlases.values():
+            if delete:
+                registry.delete_texture(atlas.texture)
+            else:
+                registry.forget("texture", atlas.texture)
+        if self.vbo is not None:
+            if delete:
+                registry.delete_buffers(self.vbo)
+            else:
+                registry.forget("buffer", self.vbo)
+        self.atlases, self.batches = {}, {}
+        self.vbo, self.vbo_size = None, 0
@@ -0,0 +1,109 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Cache des textures avec leur chaîne de mipmaps : chaque image est décodée une
+# seule fois, ses niveaux réduits sont calculés sur le processeur et écrits
+# bruts dans un fichier, puis relus avec np.memmap aux lancements suivants.
+import os  # Importer le module os
+import json  # Importer le module json pour l'en-tête du cache
+import hashlib  # Importer le module hashlib pour les clés du cache
+import cv2  # Importer la bibliothèque OpenCV pour les réductions
+import numpy as np  # Importer la bibliothèque NumPy
+
+from engine.textures import MipChain, decode_image  # Importer le décodage des images
+
+CACHE_DIR = os.path.join("cache", "textures")  # Dossier du cache des textures
+CACHE_VERSION = 1  # Version du format, à incrémenter si le format change
+
+# Taille maximale des textures selon le préréglage graphique (None : taille d'origine)
+TEXTURE_MAX_SIZES = {"haute": None, "moyenne": 2048, "basse": 1024}
+
+
+# Fonction pour calculer la chaîne de mipmaps d'une image (lignes du bas vers le haut)
+def build_mip_chain(pixels):
+    levels = [np.ascontiguousarray(pixels)]
+    while max(levels[-1].shape[:2]) > 1:
+        height, width = levels[-1].shape[:2]
+        size = (max(1, width // 2), max(1, height // 2))  # Tailles des niveaux OpenGL
+        level = cv2.resize(levels[-1], size, interpolation=cv2.INTER_AREA)  # Moyenne des pixels couverts
+        levels.append(level.reshape(size[1], size[0], -1))  # cv2 retire l'axe des canaux s'il n'y en a qu'un
+    return levels
+
+
+# Fonction pour obtenir les chemins du cache (niveaux et en-tête) d'une image
+def cache_paths(filename):
+    name = os.path.splitext(os.path.basename(filename))[0]  # Nom de l'image
+    key = hashlib.blake2b(
+        os.path.abspath(filename).encode("utf-8"), digest_size=6
+    ).hexdigest()  # Clé tirée du chemin complet
+    base = os.path.join(CACHE_DIR, f"{name}-{key}")
+    return base + ".mips", base + ".json"
+
+
+# Fonction pour lire le cache, retourne None s'il est absent, périmé ou tronqué
+def _read_cache(filename, stat):
+    data_path, header_path = cache_paths(filename)
+    if not os.path.exists(data_path) or not os.path.exists(header_path):
+        return None
+    try:
+        with open(header_path, "r") as f:
+            header = json.load(f)  # Charger l'en-tête
+        if (
+            header.get("version") != CACHE_VERSION
+            or header.get("source") != os.path.abspath(filename)
+            or header.get("size") != stat.st_size
+            or header.get("mtime_ns") != stat.st_mtime_ns
+        ):
+            return None  # Autre format ou image modifiée
+        shapes = [tuple(shape) for shape in header["levels"]]
+        total = sum(int(np.prod(shape)) for shape in shapes)
+        if os.path.getsize(data_path) != total:
+            return None  # Fichier tronqué
+        payload = np.memmap(data_path, dtype=np.uint8, mode="r")  # Projection en mémoire
+        levels, offset = [], 0
+        for shape in shapes:  # Découper les niveaux sans les copier
+            count = int(np.prod(shape))
+            levels.append(payload[offset : offset + count].reshape(shape))
+            offset += count
+        return MipChain(levels, header["layout"])
+    except (OSError, ValueError, KeyError, TypeError) as e:  # En-tête illisible
+        print(f"Cache de texture illisible, reconstruction : {e}")
+        return None
+
+
+# Fonction pour écrire le cache (fichiers temporaires puis renommage)
+def _write_cache(filename, stat, chain):
+    data_path, header_path = cache_paths(filename)
+    header = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "layout": chain.layout,
+        "levels": [list(level.shape) for level in chain.levels],
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(data_path + ".tmp", "wb") as f:
+            for level in chain.levels:
+                f.write(memoryview(level).cast("B"))
+        with open(header_path + ".tmp", "w") as f:
+            json.dump(header, f, indent=4)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(header_path + ".tmp", header_path)
+    except OSError as e:  # Dossier en lecture seule, disque plein...
+        print(f"Impossible d'écrire le cache de texture : {e}")
+
+
+# Fonction pour charger une texture et ses mipmaps (cache si possible, sinon décodage puis écriture du cache)
+def load_mip_chain(filename):
+    stat = os.stat(filename)
+    chain = _read_cache(filename, stat)
+    if chain is not None:  # Aucun décodage PNG
+        return chain
+    image = decode_image(filename)
+    pixels = image.pixels if image.flipped else image.pixels[::-1]  # Ordre OpenGL : du bas vers le haut
+    chain = MipChain(build_mip_chain(pixels), image.layout)
+    _write_cache(filename, stat, chain)
+    return chain
@@ -0,0 +1,153 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Budget de mémoire graphique des textures : chaque texture retient l'image où
+# elle a servi pour la dernière fois. Au-delà du budget, les textures les moins
+# récemment utilisées perdent leurs plus grands niveaux de mipmaps, ou sont
+# remplacées par leur plus petit niveau si elles ne servent plus ; elles sont
+# rechargées depuis leur chaîne de mipmaps (projetée en mémoire) dès qu'elles
+# resservent et que le budget le permet. L'identifiant OpenGL ne change jamais.
+from engine.textures import MipChain, texture_bytes  # Importer les chaînes de mipmaps
+
+DEFAULT_BUDGET_MB = 512  # Budget par défaut (Mo)
+MIN_LEVEL_SIZE = 64  # Les niveaux réduits ne descendent pas sous cette taille tant que la texture sert
+EVICT_AFTER = 600  # Images sans utilisation avant l'éviction complète (≈ 6 s à 100 images/s)
+RECENT_FRAMES = 1  # Une texture utilisée depuis au plus ce nombre d'images est considérée visible
+
+
+# Classe pour une texture suivie par le gestionnaire
+class _ManagedTexture:
+    def __init__(self, chain, owner, first, last_used):
+        self.chain = chain  # Chaîne complète des mipmaps
+        self.owner = owner  # Propriétaire dans le registre
+        self.wanted = first  # Premier niveau voulu (limite de taille des textures)
+        self.first = first  # Premier niveau envoyé
+        self.last_used = last_used  # Dernière image où la texture a servi
+        self.evicted = False  # Vrai si seul le plus petit niveau est envoyé
+
+    # Mémoire graphique occupée par les niveaux envoyés
+    @property
+    def bytes(self):
+        return texture_bytes(self.chain.levels[-1:] if self.evicted else self.chain.levels[self.first :])
+
+    # Premier niveau le plus réduit autorisé pendant l'utilisation
+    @property
+    def min_first(self):
+        levels = self.chain.levels
+        for index in range(self.wanted, len(levels)):
+            if max(levels[index].shape[:2]) <= MIN_LEVEL_SIZE:
+                return index
+        return len(levels) - 1
+
+
+# Classe pour gérer les textures du musée dans un budget de mémoire graphique
+class TextureManager:
+    def __init__(self, uploader, budget_mb=DEFAULT_BUDGET_MB):
+        self.uploader = uploader  # Envoi des textures (TextureUploader)
+        self.budget = int(budget_mb * 1024 * 1024)  # Budget en octets
+        self.textures = {}  # Identifiant OpenGL -> texture suivie
+        self.frame = 0  # Numéro de l'image en cours
+        self.counters = {"evictions": 0, "drops": 0, "restores": 0}
+
+    # Modifier le budget (Mo)
+    def set_budget(self, budget_mb):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.enforce()
+
+    # Créer une texture suivie à partir d'une chaîne de mipmaps ; retourne son identifiant
+    def load(self, chain, owner="textures", max_size=None):
+        first = len(chain.levels) - len(chain.capped(max_size))  # Niveaux au-delà de la limite ignorés
+        texture_id = self.uploader.upload(MipChain(chain.levels[first:], chain.layout), owner)
+        self.textures[texture_id] = _ManagedTexture(chain, owner, first, self.frame)
+        self.enforce()
+        return texture_id
+
+    # Envoyer de nouveau les niveaux d'une texture, dans le même identifiant
+    def _reupload(self, texture_id, entry):
+        levels = entry.chain.levels[-1:] if entry.evicted else entry.chain.levels[entry.first :]
+        self.uploader.upload(MipChain(levels, entry.chain.layout), entry.owner, texture_id=texture_id)
+        self.uploader.clear_levels(len(levels), len(entry.chain.levels))  # Anciens niveaux en trop
+
+    # Signaler qu'une texture sert à cette image (à appeler avant de la lier) ; retourne l'identifiant
+    def use(self, texture_id):
+        entry = self.textures.get(texture_id)
+        if entry is None:  # Texture non suivie (interface, ciel...)
+            return texture_id
+        entry.last_used = self.frame
+        if entry.evicted or entry.first > entry.wanted:  # Texture réduite : la recharger si possible
+            others = sum(  # Place prise par les autres textures utilisées récemment
+                other.bytes
+                for other_id, other in self.textures.items()
+                if other_id != texture_id and self.frame - other.last_used <= RECENT_FRAMES
+            )  # Les textures inutilisées seront réduites à la fin de l'image
+            first = entry.wanted
+            while (
+                first < entry.min_first
+                and others + texture_bytes(entry.chain.levels[first:]) > self.budget
+            ):
+                first += 1  # Plus grand niveau qui tient dans le budget
+            if entry.evicted or first < entry.first:
+                entry.evicted, entry.first = False, first
+                self._reupload(texture_id, entry)
+                self.counters["restores"] += 1
+        return texture_id
+
+    # Mémoire graphique occupée par les textures suivies
+    def resident_bytes(self):
+        return sum(entry.bytes for entry in self.textures.values())
+
+    # Réduire ou évincer les textures les moins récemment utilisées jusqu'à respecter le budget
+    def enforce(self):
+        resident = self.resident_bytes()
+        changed = set()  # Textures à renvoyer une seule fois, même après plusieurs réductions
+        while resident > self.budget:
+            candidates = [
+                (entry.last_used, texture_id)
+                for texture_id, entry in self.textures.items()
+                if not entry.evicted
+            ]
+            if not candidates:
+                break
+            shrunk = False
+            for _, texture_id in sorted(candidates):  # Les moins récemment utilisées d'abord
+                entry = self.textures[texture_id]
+                before = entry.bytes
+                unused = self.frame - entry.last_used  # Images depuis la dernière utilisation
+                if unused >= EVICT_AFTER or (
+                    unused > RECENT_FRAMES and entry.first >= entry.min_first
+                ):  # Plus utilisée : garder seulement le niveau 1x1
+                    entry.evicted = True
+                    self.counters["evictions"] += 1
+                elif entry.first < entry.min_first:  # Encore utilisée : perdre le plus grand niveau
+                    entry.first += 1
+                    self.counters["drops"] += 1
+                else:
+                    continue
+                resident -= before - entry.bytes
+                changed.add(texture_id)
+                shrunk = True
+                break
+            if not shrunk:  # Toutes les textures sont déjà au minimum
+                break
+        for texture_id in changed:
+            self._reupload(texture_id, self.textures[texture_id])
+
+    # Fin de l'image : passer à l'image suivante et faire respecter le budget
+    def end_frame(self):
+        self.frame += 1
+        self.enforce()
+
+    # Récupérer les statistiques du gestionnaire
+    def stats(self):
+        return {
+            "textures": len(self.textures),
+            "resident_bytes": self.resident_bytes(),
+            "budget_bytes": self.budget,
+            "reduced": sum(1 for e in self.textures.values() if e.evicted or e.first > e.wanted),
+            **self.counters,
+        }
+
+    # Oublier les textures suivies (elles appartiennent à gpu_assets, qui les supprime)
+    def release(self, delete=True):
+        self.textures = {}
@@ -0,0 +1,202 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Envoi des textures à la carte graphique : les pixels sont lus directement
+# dans la surface pygame (sans tostring), copiés une seule fois dans un tampon
+# de pixels (GL_PIXEL_UNPACK_BUFFER) en retournant les lignes au passage, puis
+# la carte graphique crée la texture et ses mipmaps sans bloquer le programme.
+# Les chaînes de mipmaps précalculées (engine/texture_cache.py) sont envoyées
+# niveau par niveau par le même tampon.
+import ctypes  # Importer ctypes pour accéder au tampon projeté
+import numpy as np  # Importer la bibliothèque NumPy
+import pygame  # Importer la bibliothèque Pygame
+from OpenGL.GL import *  # Importer les fonctions OpenGL
+from OpenGL.GL.EXT.texture_filter_anisotropic import (
+    glInitTextureFilterAnisotropicEXT,
+    GL_TEXTURE_MAX_ANISOTROPY_EXT,
+    GL_MAX_TEXTURE_MAX_ANISOTROPY_EXT,
+)  # Importer le filtrage anisotrope (extension)
+
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+
+MAX_ANISOTROPY = 16.0  # Filtrage anisotrope maximal demandé
+
+# Ordre des octets d'un pixel -> (format OpenGL, format interne)
+PIXEL_FORMATS = {
+    "RGBA": (GL_RGBA, GL_RGBA),
+    "BGRA": (GL_BGRA, GL_RGBA),
+    "RGB": (GL_RGB, GL_RGB),
+    "BGR": (GL_BGR, GL_RGB),
+}
+
+
+# Classe pour une image décodée, prête à être envoyée
+class DecodedImage:
+    def __init__(self, pixels, layout="RGBA", flipped=False, owner=None):
+        self.pixels = pixels  # Tableau (hauteur, largeur, canaux), éventuellement une vue de la surface
+        self.height, self.width = pixels.shape[:2]
+        self.layout = layout  # Ordre des octets d'un pixel (clé de PIXEL_FORMATS)
+        self.flipped = flipped  # Vrai si les lignes vont déjà du bas vers le haut (ordre OpenGL)
+        self.owner = owner  # Objet propriétaire de la mémoire (surface pygame), gardé en vie
+
+    # Taille des pixels en octets
+    @property
+    def nbytes(self):
+        return self.width * self.height * self.pixels.shape[2]
+
+
+# Fonction pour trouver l'ordre des octets d'une surface 24 ou 32 bits (None si non pris en charge)
+def surface_layout(surface):
+    size = surface.get_bytesize()
+    if size not in (3, 4):
+        return None
+    masks = surface.get_masks()
+    shifts = surface.get_shifts()
+    channels = ["R", "G", "B", "A"][: size if masks[3] else 3]
+    if len(channels) != size and size == 4:  # Octet de remplissage sans transparence
+        return None
+    order = sorted(channels, key=lambda c: shifts["RGBA".index(c)])  # Petit-boutiste : octet de poids faible en premier
+    layout = "".join(order)
+    return layout if layout in PIXEL_FORMATS else None
+
+
+# Fonction pour décoder une image sans copie supplémentaire (utilisable dans un fil de travail)
+def decode_image(filename):
+    surface = pygame.image.load(filename)  # Décoder l'image
+    layout = surface_layout(surface)
+    width, height = surface.get_size()
+    if layout is None:  # Format rare (palette, 16 bits) : conversion en RGBA
+        pixels = np.frombuffer(pygame.image.tostring(surface, "RGBA"), dtype=np.uint8)
+        return DecodedImage(pixels.reshape(height, width, 4), "RGBA")
+    depth = surface.get_bytesize()
+    rows = np.frombuffer(surface.get_buffer(), dtype=np.uint8).reshape(height, surface.get_pitch())
+    pixels = rows[:, : width * depth].reshape(height, width, depth)  # Vue des pixels, sans le remplissage des lignes
+    return DecodedImage(pixels, layout, owner=surface)
+
+
+# Classe pour une texture et tous ses niveaux de mipmaps (voir engine/texture_cache.py)
+class MipChain:
+    def __init__(self, levels, layout):
+        self.levels = levels  # Niveaux (hauteur, largeur, canaux), du plus grand au plus petit, lignes du bas vers le haut
+        self.layout = layout  # Ordre des octets d'un pixel (clé de PIXEL_FORMATS)
+
+    # Niveaux à envoyer : ceux dont le plus grand côté ne dépasse pas max_size
+    def capped(self, max_size=None):
+        if not max_size:
+            return self.levels
+        for first, level in enumerate(self.levels):
+            if max(level.shape[:2]) <= max_size:
+                return self.levels[first:]
+        return self.levels[-1:]  # Toujours au moins le niveau 1x1
+
+
+# Fonction pour estimer la mémoire graphique d'une texture (les cartes stockent 4 octets par pixel)
+def texture_bytes(levels):
+    return sum(level.shape[0] * level.shape[1] * 4 for level in levels)
+
+
+# Classe pour envoyer les textures par un tampon de pixels
+class TextureUploader:
+    def __init__(self):
+        self.pbo = None  # Tampon de transfert, réutilisé d'un envoi à l'autre
+        self.max_anisotropy = None  # Filtrage anisotrope maximal (0 : non disponible), lu au premier envoi
+        self.uploaded_bytes = 0  # Octets envoyés depuis le début
+
+    # Copier les niveaux (lignes du bas vers le haut) à la suite dans le tampon de transfert ;
+    # retourne les décalages de chaque niveau, ou None en cas d'échec
+    def _stage(self, levels):
+        total = sum(level.nbytes for level in levels)
+        if self.pbo is None:
+            self.pbo = registry.buffer("transferts")
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pbo)
+        # Nouveau stockage à chaque envoi : pas d'attente si la carte lit encore l'envoi précédent
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, total, None, GL_STREAM_DRAW)
+        registry.set_bytes("buffer", self.pbo, total)
+        address = glMapBuffer(GL_PIXEL_UNPACK_BUFFER, GL_WRITE_ONLY)
+        if not address:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+            return None
+        staging = np.frombuffer((ctypes.c_ubyte * total).from_address(address), dtype=np.uint8)
+        offsets, offset = [], 0
+        for level in levels:  # Une seule copie par niveau (retournement compris pour les images)
+            np.copyto(staging[offset : offset + level.nbytes].reshape(level.shape), level)
+            offsets.append(offset)
+            offset += level.nbytes
+        glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+        return offsets
+
+    # Envoyer des niveaux dans la texture liée (niveau 0 = premier niveau de la liste)
+    def _upload_levels(self, levels, layout):
+        pixel_format, internal_format = PIXEL_FORMATS[layout]
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)  # Lignes RGB non alignées sur 4 octets
+        offsets = self._stage(levels)
+        for index, level in enumerate(levels):
+            if offsets is not None:
+                data = ctypes.c_void_p(offsets[index])  # Lecture depuis le tampon de transfert, sans attente
+            else:  # Projection impossible : envoi direct depuis la mémoire du programme
+                data = np.ascontiguousarray(level)
+            glTexImage2D(
+                GL_TEXTURE_2D, index, internal_format, level.shape[1], level.shape[0], 0,
+                pixel_format, GL_UNSIGNED_BYTE, data,
+            )
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        self.uploaded_bytes += sum(level.nbytes for level in levels)
+
+    # Régler le filtrage de la texture liée : trilinéaire, et anisotrope si la carte le permet
+    def _set_filtering(self, mipmapped):
+        glTexParameteri(
+            GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR if mipmapped else GL_LINEAR
+        )
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        if not mipmapped:
+            return
+        if self.max_anisotropy is None:
+            self.max_anisotropy = (
+                min(MAX_ANISOTROPY, float(glGetFloatv(GL_MAX_TEXTURE_MAX_ANISOTROPY_EXT)))
+                if glInitTextureFilterAnisotropicEXT()
+                else 0
+            )
+        if self.max_anisotropy > 1:  # Sol vu en biais : netteté sans scintillement
+            glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAX_ANISOTROPY_EXT, self.max_anisotropy)
+
+    # Créer une texture : image décodée (mipmaps calculées par la carte graphique)
+    # ou chaîne de mipmaps précalculée (niveaux plus grands que max_size ignorés) ;
+    # texture_id : remplacer le contenu d'une texture existante au lieu d'en créer une
+    def upload(self, image, owner="textures", mipmaps=True, max_size=None, texture_id=None):
+        if texture_id is None:
+            texture_id = registry.texture(owner)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        if isinstance(image, MipChain):
+            levels = image.capped(max_size)
+            self._upload_levels(levels, image.layout)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
+            self._set_filtering(True)
+            registry.set_bytes("texture", texture_id, texture_bytes(levels))
+            return texture_id
+
+        pixels = image.pixels if image.flipped else image.pixels[::-1]  # Ordre OpenGL
+        self._upload_levels([pixels], image.layout)
+        nbytes = texture_bytes([pixels])
+        if mipmaps:
+            glGenerateMipmap(GL_TEXTURE_2D)  # Niveaux réduits calculés par la carte graphique
+            nbytes = nbytes * 4 // 3  # Les mipmaps ajoutent un tiers
+        self._set_filtering(mipmaps)
+        registry.set_bytes("texture", texture_id, nbytes)
+        return texture_id
+
+    # Libérer les niveaux start à stop - 1 de la texture liée (taille nulle : mémoire rendue)
+    def clear_levels(self, start, stop):
+        for level in range(start, stop):
+            glTexImage2D(GL_TEXTURE_2D, level, GL_RGBA, 0, 0, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+
+    # Libérer le tampon de transfert (delete=False si le contexte OpenGL a disparu)
+    def release(self, delete=True):
+        if self.pbo is not None:
+            if delete:
+                registry.delete_buffers(self.pbo)
+            else:
+                registry.forget("buffer", self.pbo)
+        self.pbo = None
+        self.max_anisotropy = None  # Le prochain contexte peut avoir d'autres limites
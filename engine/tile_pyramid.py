@@ -0,0 +1,160 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Pyramide de tuiles des œuvres très haute définition : étape hors ligne qui
+# découpe l'image source et chacune de ses réductions en tuiles de taille fixe,
+# écrites brutes dans un seul fichier relu avec np.memmap. Chaque tuile garde
+# une bordure d'un pixel copiée de ses voisines pour un filtrage sans joints.
+#
+# Utilisation : python -m engine.tile_pyramid [images...]
+# (sans argument : toutes les œuvres "gigapixel" de config/artworks.json)
+import os  # Importer le module os
+import sys  # Importer le module sys
+import json  # Importer le module json pour l'en-tête de la pyramide
+import hashlib  # Importer le module hashlib pour les clés du cache
+
+# Les images de plus d'un milliard de pixels sont refusées par défaut par OpenCV
+os.environ.setdefault("OPENCV_IO_MAX_IMAGE_PIXELS", str(1 << 40))
+import cv2  # Importer la bibliothèque OpenCV
+import numpy as np  # Importer la bibliothèque NumPy
+
+CACHE_DIR = os.path.join("cache", "tiles")  # Dossier des pyramides
+CACHE_VERSION = 1  # Version du format, à incrémenter si le format change
+TILE_SIZE = 256  # Taille d'une tuile, bordures comprises
+BORDER = 1  # Bordure copiée des tuiles voisines
+STEP = TILE_SIZE - 2 * BORDER  # Pixels de l'image couverts par une tuile
+
+
+# Fonction pour calculer la taille des niveaux : du plus grand au premier qui tient dans une tuile
+def level_sizes(width, height):
+    sizes = [(width, height)]
+    while max(sizes[-1]) > STEP:
+        width, height = sizes[-1]
+        sizes.append((max(1, width // 2), max(1, height // 2)))
+    return sizes
+
+
+# Fonction pour obtenir les chemins de la pyramide (tuiles et en-tête) d'une image
+def cache_paths(filename):
+    name = os.path.splitext(os.path.basename(filename))[0]  # Nom de l'image
+    key = hashlib.blake2b(
+        os.path.abspath(filename).encode("utf-8"), digest_size=6
+    ).hexdigest()  # Clé tirée du chemin complet
+    base = os.path.join(CACHE_DIR, f"{name}-{key}")
+    return base + ".tiles", base + ".json"
+
+
+# Classe pour lire une pyramide de tuiles projetée en mémoire
+class TilePyramid:
+    def __init__(self, data_path, header):
+        self.width, self.height = header["width"], header["height"]  # Taille de l'image source
+        self.levels = header["levels"]  # Niveaux : largeur, hauteur, lignes, colonnes, décalage
+        payload = np.memmap(data_path, dtype=np.uint8, mode="r")  # Rien n'est lu avant l'accès
+        self.tiles = [
+            payload[level["offset"] : level["offset"] + level["rows"] * level["cols"] * TILE_SIZE * TILE_SIZE * 3]
+            .reshape(level["rows"], level["cols"], TILE_SIZE, TILE_SIZE, 3)
+            for level in self.levels
+        ]  # Tuiles de chaque niveau (lignes, colonnes, pixels BGR), sans copie
+
+    # Lire une tuile (fil de travail : les pages du fichier sont chargées ici)
+    def read_tile(self, level, row, col):
+        return np.array(self.tiles[level][row, col])  # Copie contiguë, prête à l'envoi
+
+
+# Fonction pour ouvrir la pyramide d'une image, retourne None si elle n'a pas été construite ou est périmée
+def open_pyramid(filename):
+    data_path, header_path = cache_paths(filename)
+    if not os.path.exists(data_path) or not os.path.exists(header_path):
+        return None
+    try:
+        with open(header_path, "r") as f:
+            header = json.load(f)  # Charger l'en-tête
+        if header.get("version") != CACHE_VERSION or header.get("tile") != TILE_SIZE:
+            return None  # Autre format
+        if os.path.exists(filename):  # Image source présente : vérifier qu'elle n'a pas changé
+            stat = os.stat(filename)
+            if header.get("size") != stat.st_size or header.get("mtime_ns") != stat.st_mtime_ns:
+                return None
+        last = header["levels"][-1]
+        if os.path.getsize(data_path) != last["offset"] + last["rows"] * last["cols"] * TILE_SIZE * TILE_SIZE * 3:
+            return None  # Fichier tronqué
+        return TilePyramid(data_path, header)
+    except (OSError, ValueError, KeyError, TypeError) as e:  # En-tête illisible
+        print(f"Pyramide de tuiles illisible ({filename}) : {e}")
+        return None
+
+
+# Fonction pour découper un niveau en tuiles (bordures répétées aux bords de l'image)
+def _write_level(level, tiles):
+    height, width = level.shape[:2]
+    rows, cols = tiles.shape[:2]
+    offsets = np.arange(TILE_SIZE) - BORDER  # Pixels d'une tuile autour de son origine
+    for row in range(rows):
+        ys = np.clip(row * STEP + offsets, 0, height - 1)
+        band = level[ys[0] : ys[-1] + 1]  # Bande de lignes de la tuile
+        for col in range(cols):
+            xs = np.clip(col * STEP + offsets, 0, width - 1)
+            tiles[row, col] = band[np.ix_(ys - ys[0], xs)]  # Copie d'une seule tuile
+
+
+# Fonction pour construire la pyramide d'une image (étape hors ligne)
+def build_pyramid(filename):
+    image = cv2.imread(filename, cv2.IMREAD_COLOR)  # Pixels BGR, lignes du haut vers le bas
+    if image is None:
+        raise OSError(f"image illisible : {filename}")
+    stat = os.stat(filename)
+    height, width = image.shape[:2]
+    levels, offset = [], 0
+    for level_width, level_height in level_sizes(width, height):
+        rows, cols = -(-level_height // STEP), -(-level_width // STEP)
+        levels.append(
+            {"width": level_width, "height": level_height, "rows": rows, "cols": cols, "offset": offset}
+        )
+        offset += rows * cols * TILE_SIZE * TILE_SIZE * 3
+
+    data_path, header_path = cache_paths(filename)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    payload = np.memmap(data_path + ".tmp", dtype=np.uint8, mode="w+", shape=(offset,))
+    for index, info in enumerate(levels):
+        if index:  # Niveau suivant : moyenne des pixels couverts ; seuls deux niveaux sont en mémoire
+            image = cv2.resize(image, (info["width"], info["height"]), interpolation=cv2.INTER_AREA)
+        count = info["rows"] * info["cols"] * TILE_SIZE * TILE_SIZE * 3
+        tiles = payload[info["offset"] : info["offset"] + count].reshape(
+            info["rows"], info["cols"], TILE_SIZE, TILE_SIZE, 3
+        )
+        _write_level(image.reshape(info["height"], info["width"], 3), tiles)
+    payload.flush()
+    del payload, tiles  # Fermer la projection avant le renommage
+
+    header = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "tile": TILE_SIZE,
+        "width": width,
+        "height": height,
+        "levels": levels,
+    }
+    with open(header_path + ".tmp", "w") as f:
+        json.dump(header, f, indent=4)
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(header_path + ".tmp", header_path)
+    return offset
+
+
+# Construire les pyramides des images données (ou de toutes les œuvres du catalogue)
+if __name__ == "__main__":
+    from engine.artworks import load_artworks  # Importer le catalogue des œuvres
+
+    sources = sys.argv[1:] or [artwork.gigapixel for artwork in load_artworks() if artwork.gigapixel]
+    if not sources:
+        print("Aucune image à découper (champ \"gigapixel\" de config/artworks.json)")
+    for source in sources:
+        if open_pyramid(source) is not None:
+            print(f"{source} : pyramide à jour")
+            continue
+        print(f"{source} : découpage en tuiles...")
+        size = build_pyramid(source)
+        print(f"{source} : {size / (1024 * 1024):.1f} Mo de tuiles dans {CACHE_DIR}")
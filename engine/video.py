@@ -0,0 +1,250 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Lecture de vidéo en arrière-plan : un fil producteur décode, redimensionne et
+# convertit les images, puis les range dans un tampon circulaire borné ; le fil
+# de l'interface ne fait que récupérer l'image due et l'afficher. Les images
+# converties sont écrites dans un cache sur disque pendant la première boucle,
+# puis relues depuis ce cache sans aucun décodage. Les images sont écrites dans
+# un jeu fixe de surfaces qui partagent leurs pixels avec des tableaux NumPy :
+# aucune surface n'est allouée pendant la lecture.
+import time  # Importer le module time
+import threading  # Importer le module threading
+from collections import deque  # Importer la file à double entrée
+import cv2  # Importer la bibliothèque OpenCV
+import numpy as np  # Importer la bibliothèque NumPy
+import pygame  # Importer la bibliothèque Pygame
+
+from engine.video_cache import open_cached_frames, VideoCacheWriter  # Importer le cache des vidéos
+
+DEFAULT_FPS = 25.0  # Cadence utilisée si la vidéo n'en indique pas
+RESYNC_DELAY = 0.25  # Retard (s) au-delà duquel l'horloge de lecture est recalée
+
+
+# Classe pour lire une vidéo en boucle dans un fil de travail
+class VideoStream:
+    def __init__(self, open_capture, filename, size, buffer_size=8):
+        self.open_capture = open_capture  # Fonction d'ouverture (load_local_video)
+        self.filename = filename  # Chemin de la vidéo
+        self.size = tuple(size)  # Taille des images produites (largeur, hauteur)
+        self.frames = deque()  # Tampon circulaire : (horodatage, (pixels, surface))
+        self.free_slots = []  # Emplacements libres, réutilisés d'une image à l'autre
+        self.shown_slot = None  # Emplacement affiché, rendu libre à l'image suivante
+        self.resized = None  # Image BGR redimensionnée (fil producteur seulement)
+        self.buffer_size = buffer_size  # Nombre maximal d'images prêtes
+        self.condition = threading.Condition()  # Réveille le producteur quand une place se libère
+        self.stopped = False  # Demande d'arrêt du fil
+        self.paused = False  # Lecture suspendue (écran hors de vue) : le producteur attend
+        self.pause_time = None  # Instant de la mise en pause
+        self.generation = 0  # Incrémenté à chaque changement de taille (images périmées)
+        self.start_time = None  # Début de la lecture (horloge de l'interface)
+        self.frame_time = 1.0 / DEFAULT_FPS  # Durée d'une image
+        self.source = None  # Origine des images : "cache" ou "décodage"
+        self.stats_data = {"decoded": 0, "shown": 0, "dropped": 0, "loops": 0}
+        self.thread = threading.Thread(target=self._produce, name="video", daemon=True)
+        self.thread.start()
+
+    # Boucle du producteur : lire le cache si possible, sinon décoder en remplissant le cache
+    def _produce(self):
+        capture = None  # Vidéo ouverte (seulement sans cache)
+        position = 0  # Index de la prochaine image, conservé d'une taille à l'autre
+        timestamp = 0.0  # Horodatage de la prochaine image, continu d'une boucle à l'autre
+        try:
+            while not self.stopped:
+                generation, size = self.generation, self.size
+                cached = open_cached_frames(self.filename, size)
+                if cached is not None:  # Cache prêt : ni décodage, ni OpenCV
+                    if capture is not None:
+                        capture.release()
+                        capture = None
+                    frames, fps = cached
+                    self.frame_time = 1.0 / fps
+                    self.source = "cache"
+                    position, timestamp = self._play_cached(
+                        frames, size, generation, position, timestamp
+                    )
+                    continue
+
+                if capture is None:
+                    capture = self.open_capture(self.filename)
+                    if not capture or not capture.isOpened():
+                        return
+                    fps = capture.get(cv2.CAP_PROP_FPS)
+                    self.frame_time = 1.0 / (fps if fps and fps > 0 else DEFAULT_FPS)
+                    if position:  # Reprendre là où la lecture s'était arrêtée
+                        capture.set(cv2.CAP_PROP_POS_FRAMES, position)
+                self.source = "décodage"
+                writer = VideoCacheWriter.create(
+                    self.filename, size, capture.get(cv2.CAP_PROP_FRAME_COUNT), 1.0 / self.frame_time
+                )  # Le cache se remplit pendant la lecture, en commençant à l'image courante
+                position, timestamp, capture = self._play_decoded(
+                    capture, writer, size, generation, position, timestamp
+                )
+                if capture is None:  # Réouverture impossible
+                    return
+        finally:
+            if capture is not None:
+                capture.release()
+
+    # Lire les images du cache jusqu'au prochain changement de taille
+    def _play_cached(self, frames, size, generation, position, timestamp):
+        while not self.stopped and generation == self.generation:
+            if position >= len(frames):  # Fin de la vidéo : revenir au début
+                position = 0
+                self.stats_data["loops"] += 1
+            slot = self._take_slot(size)
+            np.copyto(slot[0], frames[position])  # Seule copie : du fichier projeté vers la surface
+            if not self._push(generation, timestamp, slot):
+                break
+            position += 1
+            timestamp += self.frame_time
+        return position, timestamp
+
+    # Décoder les images (et les écrire dans le cache) jusqu'à la fin du cache ou un changement de taille
+    def _play_decoded(self, capture, writer, size, generation, position, timestamp):
+        try:
+            while not self.stopped and generation == self.generation:
+                ok, frame = capture.read()
+                if not ok:  # Fin de la vidéo : revenir au début sans couper l'horodatage
+                    if writer is not None and position and writer.complete(position):
+                        writer.finish(position)  # Moins d'images qu'annoncé : cache complet quand même
+                        writer = None
+                        return 0, timestamp, capture
+                    if writer is None and open_cached_frames(self.filename, size) is not None:
+                        return 0, timestamp, capture  # Cache terminé par un autre lecteur de la vidéo
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    position = 0
+                    ok, frame = capture.read()
+                    if not ok:  # Retour au début impossible : rouvrir le fichier
+                        capture.release()
+                        capture = self.open_capture(self.filename)
+                        if not capture or not capture.isOpened():
+                            return position, timestamp, None
+                        continue
+                    self.stats_data["loops"] += 1
+
+                if (frame.shape[1], frame.shape[0]) != size:
+                    if self.resized is None or self.resized.shape[:2] != (size[1], size[0]):
+                        self.resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+                    frame = cv2.resize(frame, size, dst=self.resized, interpolation=cv2.INTER_AREA)
+                slot = self._take_slot(size)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=slot[0])  # Convertie directement dans la surface
+                if writer is not None:
+                    writer.write(position, slot[0])
+                self.stats_data["decoded"] += 1
+                if not self._push(generation, timestamp, slot):
+                    break
+                position += 1
+                timestamp += self.frame_time
+                if writer is not None and writer.complete():  # Toutes les images sont écrites
+                    writer.finish()
+                    writer = None
+                    break  # Continuer depuis le cache
+        finally:
+            if writer is not None:  # Taille changée ou arrêt avant la fin : cache abandonné
+                writer.abort()
+        return position, timestamp, capture
+
+    # Prendre un emplacement libre : des pixels NumPy et la surface qui les partage
+    def _take_slot(self, size):
+        with self.condition:
+            if self.free_slots:
+                return self.free_slots.pop()
+        pixels = np.empty((size[1], size[0], 3), dtype=np.uint8)  # Lignes dans l'ordre de pygame.image
+        return pixels, pygame.image.frombuffer(pixels, size, "RGB")  # Surface sans copie des pixels
+
+    # Rendre un emplacement libre (à appeler avec self.condition verrouillée)
+    def _release_slot(self, slot):
+        if slot is not None and slot[1].get_size() == self.size:  # Emplacements à l'ancienne taille oubliés
+            self.free_slots.append(slot)
+
+    # Ranger une image dans le tampon (False si la taille a changé ou si le fil s'arrête)
+    def _push(self, generation, timestamp, slot):
+        with self.condition:
+            while (len(self.frames) >= self.buffer_size or self.paused) and not self.stopped:
+                self.condition.wait(0.1)  # Tampon plein ou pause : attendre l'interface
+            if self.stopped or generation != self.generation:  # Image à l'ancienne taille
+                return False
+            self.frames.append((timestamp, slot))
+            return True
+
+    # Récupérer l'image due à l'instant présent (None s'il n'y a pas de nouvelle image) ;
+    # la surface retournée est réutilisée : l'afficher avant l'appel suivant
+    def frame(self, now=None):
+        slot = self._next_slot(now)
+        return None if slot is None else slot[1]
+
+    # Récupérer les pixels RGB (hauteur, largeur, 3) de l'image due, pour un envoi OpenGL
+    def pixels(self, now=None):
+        slot = self._next_slot(now)
+        return None if slot is None else slot[0]
+
+    # Retirer du tampon l'image due à l'instant présent
+    def _next_slot(self, now=None):
+        now = time.perf_counter() if now is None else now
+        with self.condition:
+            if self.paused or not self.frames:
+                return None
+            if self.start_time is None:  # Première image : démarrer l'horloge de lecture
+                self.start_time = now - self.frames[0][0]
+            position = now - self.start_time  # Position de lecture
+            if self.frames[0][0] > position:  # Image suivante pas encore due
+                return None
+            timestamp, slot = self.frames.popleft()
+            while self.frames and self.frames[0][0] <= position:  # Images en retard
+                self._release_slot(slot)
+                timestamp, slot = self.frames.popleft()  # Garder la plus récente
+                self.stats_data["dropped"] += 1
+            self._release_slot(self.shown_slot)  # L'image précédente a été affichée
+            self.shown_slot = slot
+            if position - timestamp > RESYNC_DELAY:  # Long retard (fenêtre bloquée, jeu lancé...)
+                self.start_time = now - timestamp  # Recaler l'horloge au lieu de rattraper
+            self.condition.notify()  # Une place s'est libérée
+        self.stats_data["shown"] += 1
+        return slot
+
+    # Changer la taille des images (redimensionnement de la fenêtre)
+    def resize(self, size):
+        size = tuple(size)
+        if size == self.size:
+            return
+        with self.condition:
+            self.size = size
+            self.generation += 1
+            self.frames.clear()  # Images à l'ancienne taille
+            self.free_slots.clear()
+            self.shown_slot = None
+            self.condition.notify()
+
+    # Suspendre la lecture et le décodage (l'horloge de lecture s'arrête aussi)
+    def pause(self, now=None):
+        with self.condition:
+            if not self.paused:
+                self.paused = True
+                self.pause_time = time.perf_counter() if now is None else now
+
+    # Reprendre la lecture là où elle s'était arrêtée
+    def resume(self, now=None):
+        with self.condition:
+            if self.paused:
+                now = time.perf_counter() if now is None else now
+                if self.start_time is not None:
+                    self.start_time += now - self.pause_time  # Décaler l'horloge de la durée de la pause
+                self.paused = False
+                self.condition.notify()
+
+    # Récupérer les statistiques de lecture
+    def stats(self):
+        with self.condition:
+            depth = len(self.frames)
+        return {
+            **self.stats_data, "queue": depth, "capacity": self.buffer_size, "source": self.source
+        }
+
+    # Arrêter le fil producteur
+    def close(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,164 @@
+# Projet : VirtuLouvre
+# Auteurs : Albert Oscar, Moors Michel, Rinckenbach Yann
+
+# -*- coding: utf-8 -*-
+# Cache des vidéos déjà converties : les images redimensionnées à la taille de
+# la fenêtre sont écrites en RGB brut dans un fichier projeté en mémoire
+# (np.memmap), puis relues directement, sans décodage ni OpenCV. Un seul
+# écrivain à la fois par cache : deux écrans qui lisent la même vidéo à la
+# même taille n'écrivent pas le même fichier temporaire.
+import os  # Importer le module os
+import threading  # Importer le module threading
+import glob  # Importer le module glob pour retrouver les anciens caches
+import json  # Importer le module json pour l'en-tête du cache
+import hashlib  # Importer le module hashlib pour les clés du cache
+import numpy as np  # Importer la bibliothèque NumPy
+
+CACHE_DIR = os.path.join("cache", "video")  # Dossier du cache des vidéos
+CACHE_VERSION = 1  # Version du format, à incrémenter si le format change
+MAX_CACHE_BYTES = 1024 * 1024 * 1024  # Taille maximale d'un cache (1 Go)
+SIZES_PER_VIDEO = 2  # Tailles gardées par vidéo (fond du menu et écrans du musée)
+
+_writing = set()  # Caches en cours d'écriture (chemin des images)
+_writing_lock = threading.Lock()  # Protège _writing (partagé par les fils de lecture)
+
+
+# Fonction pour obtenir les chemins du cache (images et en-tête) d'une vidéo à une taille donnée
+def cache_paths(filename, size):
+    name = os.path.splitext(os.path.basename(filename))[0]  # Nom de la vidéo
+    key = hashlib.blake2b(
+        os.path.abspath(filename).encode("utf-8"), digest_size=6
+    ).hexdigest()  # Clé tirée du chemin complet
+    base = os.path.join(CACHE_DIR, f"{name}-{key}-{size[0]}x{size[1]}")
+    return base + ".rgb", base + ".json"
+
+
+# Fonction pour ouvrir les images en cache, retourne (images, fps) ou None si absent ou périmé
+def open_cached_frames(filename, size):
+    frames_path, header_path = cache_paths(filename, size)
+    if not os.path.exists(frames_path) or not os.path.exists(header_path):
+        return None
+    try:
+        stat = os.stat(filename)
+        with open(header_path, "r") as f:
+            header = json.load(f)  # Charger l'en-tête
+        width, height = size
+        frame_bytes = width * height * 3  # Taille d'une image RGB
+        if (
+            header.get("version") != CACHE_VERSION
+            or header.get("source") != os.path.abspath(filename)
+            or header.get("source_size") != stat.st_size
+            or header.get("mtime_ns") != stat.st_mtime_ns
+            or header.get("size") != [width, height]
+            or os.path.getsize(frames_path) < header["count"] * frame_bytes
+        ):
+            return None  # Autre format, vidéo modifiée ou fichier tronqué
+        frames = np.memmap(
+            frames_path, dtype=np.uint8, mode="r", shape=(header["count"], height, width, 3)
+        )  # Projection en mémoire : aucune image n'est lue avant d'être affichée
+        return frames, header["fps"]
+    except (OSError, ValueError, KeyError, TypeError) as e:  # En-tête illisible
+        print(f"Cache vidéo illisible, reconstruction : {e}")
+        return None
+
+
+# Fonction pour signaler la fin de l'écriture d'un cache
+def _release(frames_path):
+    with _writing_lock:
+        _writing.discard(frames_path)
+
+
+# Classe pour écrire le cache d'une vidéo pendant sa lecture
+class VideoCacheWriter:
+    def __init__(self, filename, size, count, fps):
+        self.filename = filename  # Vidéo source
+        self.size = tuple(size)  # Taille des images (largeur, hauteur)
+        self.count = count  # Nombre d'images annoncé par la vidéo
+        self.fps = fps  # Cadence de la vidéo
+        self.frames_path, self.header_path = cache_paths(filename, size)
+        os.makedirs(CACHE_DIR, exist_ok=True)  # Créer le dossier du cache si besoin
+        width, height = self.size
+        self.frames = np.memmap(
+            self.frames_path + ".tmp", dtype=np.uint8, mode="w+", shape=(count, height, width, 3)
+        )  # Fichier temporaire : un cache à moitié écrit n'est jamais lu
+        self.written = np.zeros(count, dtype=bool)  # Images déjà écrites
+
+    # Créer un écrivain, ou None si la vidéo ne peut pas être mise en cache ou si son cache
+    # est déjà en cours d'écriture
+    @classmethod
+    def create(cls, filename, size, count, fps):
+        count = int(count)
+        if count <= 0:  # Nombre d'images inconnu
+            return None
+        if count * size[0] * size[1] * 3 > MAX_CACHE_BYTES:
+            print("Vidéo trop grande pour le cache, lecture directe")
+            return None
+        frames_path = cache_paths(filename, size)[0]
+        with _writing_lock:
+            if frames_path in _writing:  # Un autre lecteur écrit déjà ce cache
+                return None
+            _writing.add(frames_path)
+        try:
+            return cls(filename, size, count, fps)
+        except OSError as e:  # Dossier en lecture seule, disque plein...
+            print(f"Impossible de créer le cache vidéo : {e}")
+            _release(frames_path)
+            return None
+
+    # Écrire une image RGB déjà redimensionnée
+    def write(self, index, frame):
+        if index < self.count:
+            self.frames[index] = frame
+            self.written[index] = True
+
+    # Vérifier si les images 0..count-1 sont toutes écrites
+    def complete(self, count=None):
+        return bool(self.written[: count or self.count].all())
+
+    # Terminer le cache (count : nombre réel d'images si la vidéo en a moins qu'annoncé)
+    def finish(self, count=None):
+        count = count or self.count
+        self.frames.flush()
+        del self.frames  # Fermer la projection avant le renommage
+        header = {
+            "version": CACHE_VERSION,
+            "source": os.path.abspath(self.filename),
+            "source_size": os.path.getsize(self.filename),
+            "mtime_ns": os.stat(self.filename).st_mtime_ns,
+            "size": list(self.size),
+            "count": count,
+            "fps": self.fps,
+        }
+        try:
+            with open(self.header_path + ".tmp", "w") as f:
+                json.dump(header, f, indent=4)
+            os.replace(self.frames_path + ".tmp", self.frames_path)
+            os.replace(self.header_path + ".tmp", self.header_path)
+        except OSError as e:
+            print(f"Impossible d'écrire le cache vidéo : {e}")
+            return
+        finally:
+            _release(self.frames_path)
+        self._remove_old_sizes()
+
+    # Abandonner le cache en cours (changement de taille avant la fin)
+    def abort(self):
+        del self.frames
+        try:
+            os.remove(self.frames_path + ".tmp")
+        except OSError:
+            pass
+        _release(self.frames_path)
+
+    # Supprimer les caches les plus anciens de la même vidéo à d'autres tailles
+    def _remove_old_sizes(self):
+        prefix = self.frames_path.rsplit("-", 1)[0]  # Chemin sans la taille
+        headers = sorted(
+            glob.glob(glob.escape(prefix) + "-*x*.json"), key=os.path.getmtime, reverse=True
+        )  # Du plus récent au plus ancien
+        for header_path in headers[SIZES_PER_VIDEO:]:
+            for path in (header_path, os.path.splitext(header_path)[0] + ".rgb"):
+                try:
+                    os.remove(path)
+                except OSError:  # Fichier encore projeté en mémoire (Windows)
+                    pass
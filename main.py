@@ -15,20 +15,34 @@ import numpy as np  # Importer la bibliothèque NumPy
 import math  # Importer le module math
 import sys  # Importer le module sys
 import json  # Importer le module json pour la gestion des fichiers de configuration
-
-pygame.init()  # Initialiser Pygame
-pygame.mixer.init()  # Initialiser le module mixer de Pygame
-
-# Charger et définir l'icône de la fenêtre
-icon = pygame.image.load(
-    os.sep.join(["src", "icons", "icon.png"])
-)  # Charger l'icône de la fenêtre
-pygame.display.set_icon(icon)  # Définir l'icône de la fenêtre
-
-walk_sound_effect = pygame.mixer.Sound(
-    os.sep.join(["src", "media", "walk.mp3"])
-)  # Charger le son de marche
-walk_sound_effect.set_volume(0.5)  # Définir le volume du son de marche
+from engine.mesh import build_indexed_mesh, VERTEX_STRIDE  # Importer la préparation des maillages
+from engine.mesh_cache import load_cached_mesh  # Importer le cache binaire des maillages
+from engine.portals import PortalGraph  # Importer la visibilité par salles et portes
+from engine.pvs import PotentialVisibility  # Importer les ensembles potentiellement visibles
+from engine.assets import AssetLoader  # Importer le chargement asynchrone des ressources
+from engine.gpu_assets import GpuAssetManager, current_context  # Importer le gestionnaire des ressources OpenGL
+from engine.gpu_registry import registry  # Importer le registre des ressources OpenGL
+from engine.textures import TextureUploader, DecodedImage, MipChain  # Importer l'envoi des textures par tampon de pixels
+from engine.texture_cache import load_mip_chain, TEXTURE_MAX_SIZES  # Importer le cache des mipmaps
+from engine.texture_manager import TextureManager, DEFAULT_BUDGET_MB  # Importer le budget de mémoire des textures
+from engine.text import TextRenderer  # Importer l'affichage du texte par atlas de glyphes
+from engine.batch import PrimitiveBatch  # Importer le dessin par lots des primitives
+from engine.overlay import OverlayLayer  # Importer les calques d'interface en texture
+from engine.backdrop import FrozenBackdrop  # Importer l'arrière-plan figé des menus
+from engine.video import VideoStream  # Importer la lecture de vidéo en arrière-plan
+from engine.exhibits import VideoScreens, load_screens  # Importer les écrans vidéo du musée
+from engine.artworks import load_artworks  # Importer le catalogue des œuvres
+from engine.prefetch import Prefetcher  # Importer le préchargement des œuvres
+from engine.lod import load_lod_mesh, LodSelector  # Importer les niveaux de détail des modèles
+from engine.gigapixel import GigapixelViewer  # Importer l'affichage des œuvres par tuiles
+from engine.skybox import build_sky_sphere, load_sky_image, SKY_RESOLUTIONS  # Importer le ciel
+
+# Son de marche, polices et résolutions : créés par init_pygame(), appelée sous la garde
+# __main__ (un processus lancé par « spawn » réimporte ce module sans initialiser Pygame)
+walk_sound_effect = None  # Son de marche
+font = None  # Police de l'interface
+version_font = None  # Police du numéro de version
+resolutions = []  # Résolutions disponibles
 
 # Centrer la fenêtre
 os.environ["SDL_VIDEO_CENTERED"] = "1"  # Centrer la fenêtre
@@ -41,11 +55,6 @@ BLUE = (100, 200, 255)  # Bleu
 HOVER_BLUE = (50, 150, 255)  # Bleu clair
 GREEN = (0, 255, 0)  # Vert
 
-
-# Police
-FONT = pygame.font.Font(None, 24)  # Réduit de 36 à 24
-font = pygame.font.Font(None, 24)  # Réduit de 36 à 24
-
 # Taille de la fenêtre
 screenwidth = 2560  # Largeur de la fenêtre
 screenheight = 1440  # Hauteur de la fenêtre
@@ -74,6 +83,16 @@ DEFAULT_CONTROLS = [
 # Définition des contrôles actuels (initialisés avec les valeurs par défaut)
 controls = DEFAULT_CONTROLS.copy()
 
+# Paramètres graphiques par défaut ("preset" : "haute", "moyenne" ou "basse")
+DEFAULT_GRAPHICS = {
+    "preset": "haute",
+    "menu_blur": True,  # Flouter la scène derrière le menu
+    "texture_max_size": None,  # Taille maximale des textures (None : selon le préréglage)
+    "texture_budget_mb": DEFAULT_BUDGET_MB,  # Mémoire graphique réservée aux textures du musée (Mo)
+    "lod_bias": None,  # Décalage des niveaux de détail (None : selon le préréglage, positif : moins de détails)
+}
+graphics = DEFAULT_GRAPHICS.copy()
+
 # Variables globales pour le menu des contrôles
 frame_x = 0
 frame_y = 0
@@ -85,6 +104,31 @@ spacing = 40
 input_active = False
 input_text = ""
 
+# Textures et tampons OpenGL conservés d'une visite du musée à l'autre
+gpu_assets = GpuAssetManager()
+
+# Texte OpenGL (FPS, chargement) : un atlas de glyphes par police, dessiné par lots
+text_renderer = TextRenderer()
+
+# Envoi des textures par un tampon de pixels, mipmaps calculées par la carte graphique
+texture_uploader = TextureUploader()
+texture_manager = TextureManager(texture_uploader)  # Textures du musée gardées dans le budget de mémoire
+
+# Primitives (sol, viseur, barres) accumulées puis dessinées en un appel par état
+primitives = PrimitiveBatch()
+
+# Calques d'interface du jeu, gardés dans des textures et mis à jour seulement s'ils changent
+pause_overlay = OverlayLayer("menu pause")
+settings_overlay = OverlayLayer("paramètres")
+pause_backdrop = FrozenBackdrop()  # Scène figée derrière le menu pause
+video_screens = VideoScreens()  # Écrans vidéo du musée, lus dans des fils de travail
+artwork_prefetcher = Prefetcher(gpu_assets)  # Œuvres chargées au fil de la visite
+lod_selector = LodSelector()  # Niveau de détail de chaque modèle d'œuvre selon sa taille à l'écran
+gigapixel_viewer = GigapixelViewer()  # Œuvres très haute définition, lues par tuiles
+museum_rooms = PortalGraph()  # Salles du musée et portes qui les relient
+museum_pvs = PotentialVisibility()  # Blocs visibles depuis chaque cellule du musée (calcul hors ligne)
+SKY_RADIUS = 1000  # Rayon de la sphère du ciel
+
 
 class Player:
 
@@ -419,19 +463,19 @@ def toggle_fullscreen():
 def grid():
     grid_height = -1.5  # Hauteur de la grille
     grid_size = 100  # Taille de la grille
-    grid_step = 1  # Pas de la grille
-
-    glBegin(GL_QUADS)  # Commencer le dessin des quadrilatères
-    glColor3f(0.3, 0.3, 0.3)  # Couleur de la grille
-
-    for x in range(-grid_size, grid_size, grid_step):
-        for z in range(-grid_size, grid_size, grid_step):
-            glVertex3f(x, grid_height, z)  # Coin bas gauche
-            glVertex3f(x + grid_step, grid_height, z)  # Coin bas droit
-            glVertex3f(x + grid_step, grid_height, z + grid_step)  # Coin haut droit
-            glVertex3f(x, grid_height, z + grid_step)  # Coin haut gauche
 
-    glEnd()  # Terminer le dessin des quadrilatères
+    # Les cases pleines d'une même couleur forment un seul quadrilatère
+    primitives.quads(
+        [
+            [
+                (-grid_size, grid_height, -grid_size),  # Coin bas gauche
+                (grid_size, grid_height, -grid_size),  # Coin bas droit
+                (grid_size, grid_height, grid_size),  # Coin haut droit
+                (-grid_size, grid_height, grid_size),  # Coin haut gauche
+            ]
+        ],
+        (0.3, 0.3, 0.3),  # Couleur de la grille
+    )
 
 
 def draw_textured_floor(
@@ -443,58 +487,75 @@ def draw_textured_floor(
     repeat_x = grid_size / texture_width
     repeat_y = grid_size / texture_height
 
-    glEnable(GL_TEXTURE_2D)  # Activer les textures
-    glBindTexture(GL_TEXTURE_2D, texture_id)  # Lier la texture du sol
-
-    glBegin(GL_QUADS)
-    glColor3f(1.0, 1.0, 1.0)  # Blanc pour afficher la texture correctement
-
     # Coordonnées de texture avec répétition pour le sol
-    glTexCoord2f(0 * repeat_x, 0 * repeat_y)
-    glVertex3f(-grid_size, grid_height, -grid_size)  # Coin bas-gauche
-    glTexCoord2f(1 * repeat_x, 0 * repeat_y)
-    glVertex3f(grid_size, grid_height, -grid_size)  # Coin bas-droit
-    glTexCoord2f(1 * repeat_x, 1 * repeat_y)
-    glVertex3f(grid_size, grid_height, grid_size)  # Coin haut-droit
-    glTexCoord2f(0 * repeat_x, 1 * repeat_y)
-    glVertex3f(-grid_size, grid_height, grid_size)  # Coin haut-gauche
+    primitives.quads(
+        [
+            [
+                (-grid_size, grid_height, -grid_size),  # Coin bas-gauche
+                (grid_size, grid_height, -grid_size),  # Coin bas-droit
+                (grid_size, grid_height, grid_size),  # Coin haut-droit
+                (-grid_size, grid_height, grid_size),  # Coin haut-gauche
+            ]
+        ],
+        (1.0, 1.0, 1.0),  # Blanc pour afficher la texture correctement
+        [(0, 0), (repeat_x, 0), (repeat_x, repeat_y), (0, repeat_y)],
+        texture_manager.use(texture_id),  # Texture du sol (rechargée si elle a été réduite)
+    )
 
-    glEnd()
 
-    glDisable(GL_TEXTURE_2D)  # Désactiver les textures après le dessin
+# Fonction pour oublier les ressources OpenGL des modules d'affichage (contexte perdu ou fermeture)
+def forget_gpu_resources(delete=False):
+    for renderer in (
+        text_renderer, primitives, pause_overlay, settings_overlay, pause_backdrop, video_screens,
+        texture_uploader, texture_manager, artwork_prefetcher, gigapixel_viewer,
+    ):
+        renderer.release(delete=delete)
 
 
-# Fonction pour afficher les crédits
-def render_text_to_texture(text, font, color=(255, 255, 0)):
-    text_surface = font.render(text, True, color, (0, 0, 0))  # Rendre le texte
-    text_data = pygame.image.tostring(
-        text_surface, "RGBA", True
-    )  # Convertir le texte en données
-    width, height = text_surface.get_size()  # Récupérer la taille du texte
-    texture_id = glGenTextures(1)  # Générer un identifiant de texture
-    glBindTexture(GL_TEXTURE_2D, texture_id)  # Lier la texture
-    glTexImage2D(
-        GL_TEXTURE_2D,
-        0,
-        GL_RGBA,
-        width,
-        height,
-        0,
-        GL_RGBA,
-        GL_UNSIGNED_BYTE,
-        text_data,
-    )  # Appliquer la texture
-    glTexParameteri(
-        GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR
-    )  # Paramètres de la texture
-    glTexParameteri(
-        GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR
-    )  # Paramètres de la texture
-    return (
-        texture_id,
-        width,
-        height,
-    )  # Retourner l'identifiant de la texture, la largeur et la hauteur
+# Fonction pour libérer toutes les ressources OpenGL avant de fermer la fenêtre
+def release_gpu_resources():
+    model_mesh = gpu_assets.get("model")
+    if model_mesh is not None and model_mesh[4].frames:  # Triangles dessinés par image
+        stats = model_mesh[4].stats()
+        print(
+            f"Modèle : {stats['average']:.0f} triangles dessinés par image en moyenne "
+            f"(de {stats['fewest']} à {stats['most']}) sur {stats['triangles']}, {stats['chunks']} blocs"
+        )
+    stats = museum_rooms.stats()
+    if stats["frames"]:
+        print(f"Salles : {stats['average']:.1f} visibles par image en moyenne sur {stats['rooms']}")
+    stats = museum_pvs.stats()
+    if stats["changes"]:
+        print(f"Ensembles visibles : {stats['changes']} changements de cellule, {stats['kept']:.0%} des blocs gardés")
+    stats = texture_manager.stats()
+    print(
+        f"Textures : {stats['resident_bytes'] / 1048576:.1f}/{stats['budget_bytes'] / 1048576:.0f} Mo, "
+        f"{stats['evictions']} évictions, {stats['drops']} niveaux retirés, {stats['restores']} rechargements"
+    )
+    stats = artwork_prefetcher.stats()
+    if stats["artworks"]:
+        print(
+            f"Préchargement des œuvres : {stats['hits']} prêtes à temps, {stats['misses']} en retard "
+            f"({stats['hit_rate']:.0%}), {stats['ready']}/{stats['artworks']} chargées"
+        )
+    stats = lod_selector.stats()
+    if stats["selections"]:
+        print(
+            f"Niveaux de détail : {stats['share']:.0%} des triangles des modèles d'œuvres dessinés, "
+            f"{stats['switches']} changements de niveau"
+        )
+    stats = gigapixel_viewer.stats()
+    if stats["paintings"]:
+        print(
+            f"Tuiles des œuvres : {stats['resident']}/{stats['capacity']} places occupées "
+            f"({stats['atlas_bytes'] / (1024 * 1024):.0f} Mo), {stats['uploads']} envois, "
+            f"{stats['evictions']} remplacements"
+        )
+    forget_gpu_resources(delete=current_context() is not None)  # Textes, primitives, calques
+    video_screens.close()  # Arrêter la lecture des écrans vidéo
+    gpu_assets.release_all()  # Textures et tampons du musée
+    registry.report()  # Bilan : il ne doit plus rester de ressource vivante
+
 
 # Fonction pour jouer le son de marche
 def walk_sound():
@@ -505,26 +566,58 @@ def walk_sound():
         walk_sound_effect.play()
         last_walk_sound_time = current_time
 
-# Fonction pour dessiner le ciel
-def draw_skybox(texture_id, radius=1000):
+# Fonction pour dessiner le ciel (en dernier : seuls les pixels encore vides sont remplis)
+def draw_skybox(texture_id, position):
+    sky_mesh = gpu_assets.get("sky_mesh")  # Sphère du ciel, envoyée une seule fois
+    if sky_mesh is None:
+        sky_mesh = gpu_assets.adopt(
+            "sky_mesh", "mesh", upload_indexed_mesh(*build_sky_sphere(SKY_RADIUS), owner="ciel")
+        )
+
     glEnable(GL_TEXTURE_2D) # Activer la texture
     glBindTexture(GL_TEXTURE_2D, texture_id) # Lier la texture
+    glDepthMask(GL_FALSE)  # Le ciel n'écrit pas dans le tampon de profondeur
+    glDepthFunc(GL_LEQUAL)  # Les pixels déjà couverts par la scène sont ignorés
 
     glPushMatrix() # Sauvegarder la matrice
-    glColor3f(1, 1, 1)  # Couleur blanche pour voir la texture correctement
-    gluQuadricTexture(gluNewQuadric(), GL_TRUE)  # Activer la texture sur la sphère
-    gluSphere(gluNewQuadric(), radius, 64, 64)  # Dessiner la sphère (rayon, détails)
+    glTranslatef(*position)  # Le ciel suit la caméra
+    draw_indexed_model(*sky_mesh)  # Un seul appel de dessin
     glPopMatrix() # Restaurer la matrice
 
+    glDepthFunc(GL_LESS)  # Restaurer le test de profondeur
+    glDepthMask(GL_TRUE)
     glDisable(GL_TEXTURE_2D)
 
+
+# Fonction pour dessiner les œuvres déjà préchargées (modèles au niveau de détail de leur taille à l'écran)
+# (les tableaux sont ajoutés au lot de primitives ; l'état OpenGL de l'appelant est conservé)
+def draw_artworks(player, screen_height):
+    glPushAttrib(GL_ENABLE_BIT)  # Sauvegarder le test de profondeur et la texture
+    glEnable(GL_DEPTH_TEST)  # Statues cachées par les murs devant elles
+    for artwork in artwork_prefetcher.artworks:
+        texture_id = gpu_assets.get(artwork.asset_key("texture"))
+        mesh = gpu_assets.get(artwork.asset_key("mesh"))
+        if mesh is not None:  # Modèle 3D, texturé par l'image de l'œuvre si elle existe
+            if texture_id is not None:
+                glEnable(GL_TEXTURE_2D)
+                glBindTexture(GL_TEXTURE_2D, texture_manager.use(texture_id))
+            glPushMatrix()
+            glTranslatef(*artwork.center)
+            glRotatef(artwork.yaw, 0.0, 1.0, 0.0)
+            draw_indexed_model(
+                *mesh[:4], lod_selector.select(mesh[4], artwork.center, artwork.yaw, player, screen_height)
+            )
+            glPopMatrix()
+            glDisable(GL_TEXTURE_2D)
+        elif texture_id is not None and not gigapixel_viewer.shows(artwork):  # Tableau : un quadrilatère texturé
+            artwork.draw(primitives, texture_manager.use(texture_id))
+    glPopAttrib()  # Restaurer les états de l'appelant
+
+
 # Fonction pour dessiner les FPS
 def draw_fps(clock, font, screenwidth, screenheight):
     fps = int(clock.get_fps())  # Calculer les FPS
     text = f"FPS: {fps}"  # Texte à afficher
-    texture_id, width, height = render_text_to_texture(
-        text, font
-    )  # Rendre le texte en texture
     glMatrixMode(GL_PROJECTION)  # Changer le mode de la matrice à la projection
     glPushMatrix()  # Sauvegarder la matrice
     glLoadIdentity()  # Réinitialiser la matrice
@@ -534,182 +627,119 @@ def draw_fps(clock, font, screenwidth, screenheight):
     glMatrixMode(GL_MODELVIEW)  # Changer le mode de la matrice au modèle
     glPushMatrix()  # Sauvegarder la matrice
     glLoadIdentity()  # Réinitialiser la matrice
-    glEnable(GL_TEXTURE_2D)  # Activer la texture
-    glBindTexture(GL_TEXTURE_2D, texture_id)  # Lier la texture
-    glColor3f(1, 1, 1)  # Couleur du texte
-    glBegin(GL_QUADS)  # Commencer le dessin des quads
-    glTexCoord2f(0, 0)
-    glVertex2f(10, 560)  # Dessiner le quad
-    glTexCoord2f(1, 0)
-    glVertex2f(10 + width, 560)  # Dessiner le quad
-    glTexCoord2f(1, 1)
-    glVertex2f(10 + width, 560 + height)  # Dessiner le quad
-    glTexCoord2f(0, 1)
-    glVertex2f(10, 560 + height)  # Dessiner le quad
-    glEnd()  # Terminer le dessin des quads
-    glDisable(GL_TEXTURE_2D)  # Désactiver la texture
+    text_renderer.draw(text, font, 10, 560, (255, 255, 0), y_up=True)  # Ajouter le texte au lot
+    text_renderer.flush()  # Dessiner le texte (aucun envoi de texture)
     glMatrixMode(GL_PROJECTION)  # Changer le mode de la matrice à la projection
     glPopMatrix()  # Restaurer la matrice
     glMatrixMode(GL_MODELVIEW)  # Changer le mode de la matrice au modèle
     glPopMatrix()  # Restaurer la matrice
 
 
-# Fonction pour charger un fichier OBJ
-def load_obj(filename):
-    vertices = []  # Initialiser la liste des sommets
-    texcoords = []  # Initialiser la liste des coordonnées de texture
-    faces = []  # Initialiser la liste des faces
-    with open(filename, "r") as file:  # Ouvrir le fichier en mode lecture
-        for line in file:  # Lire chaque ligne du fichier
-            if line.startswith("v "):  # Si la ligne commence par 'v'
-                vertex = [
-                    float(coord) for coord in line.strip().split()[1:4]
-                ]  # Récupérer les coordonnées du sommet
-                vertices.append(vertex)  # Ajouter le sommet à la liste
-            elif line.startswith("vt "):  # Si la ligne commence par 'vt'
-                texcoord = [
-                    float(coord) for coord in line.strip().split()[1:3]
-                ]  # Récupérer les coordonnées de texture
-                texcoords.append(
-                    texcoord
-                )  # Ajouter les coordonnées de texture à la liste
-            elif line.startswith("f "):  # Si la ligne commence par 'f'
-                face_vertices = []  # Initialiser la liste des sommets de la face
-                face_texcoords = (
-                    []
-                )  # Initialiser la liste des coordonnées de texture de la face
-                for v in line.strip().split()[1:]:  # Lire chaque sommet de la face
-                    v_split = v.split("/")  # Séparer les indices
-                    face_vertices.append(
-                        int(v_split[0]) - 1
-                    )  # Ajouter l'indice du sommet
-                    if (
-                        len(v_split) >= 2 and v_split[1]
-                    ):  # Si l'indice de la coordonnée de texture existe
-                        face_texcoords.append(
-                            int(v_split[1]) - 1
-                        )  # Ajouter l'indice de la coordonnée de texture
-                if len(face_vertices) >= 3:  # Si la face a au moins 3 sommets
-                    faces.append(
-                        (face_vertices[:3], face_texcoords[:3])
-                    )  # Ajouter la face à la liste
-    return (
-        vertices,
-        texcoords,
-        faces,
-    )  # Retourner les sommets, les coordonnées de texture et les faces
-
-
 # Fonction pour charger une texture
 def load_texture(filename):
-    texture_surface = pygame.image.load(filename)  # Charger l'image
-    texture_data = pygame.image.tostring(
-        texture_surface, "RGBA", True
-    )  # Convertir l'image en données
-    width, height = texture_surface.get_size()  # Récupérer la taille de l'image
-
-    texture_id = glGenTextures(1)  # Générer un identifiant de texture
-    glBindTexture(GL_TEXTURE_2D, texture_id)  # Lier la texture
-    glTexImage2D(
-        GL_TEXTURE_2D,
-        0,
-        GL_RGBA,
-        width,
-        height,
-        0,
-        GL_RGBA,
-        GL_UNSIGNED_BYTE,
-        texture_data,
-    )  # Appliquer la texture
-    glTexParameteri(
-        GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR
-    )  # Paramètres de la texture
-    glTexParameteri(
-        GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR
-    )  # Paramètres de la texture
-    return texture_id  # Retourner l'identifiant de la texture
-
-
-# Fonction pour créer un modèle VBO
-def create_model_vbo(vertices, texcoords, faces):
-    vertex_data = []  # Initialiser les données des sommets
-    texcoord_data = []  # Initialiser les données des coordonnées de texture
-    for face in faces:  # Pour chaque face
-        for vertex_idx, texcoord_idx in zip(
-            face[0], face[1]
-        ):  # Pour chaque sommet et coordonnée de texture
-            vertex_data.extend(
-                vertices[vertex_idx]
-            )  # Ajouter les coordonnées du sommet
-            texcoord_data.extend(
-                texcoords[texcoord_idx]
-            )  # Ajouter les coordonnées de texture
-
-    vertex_data = np.array(
-        vertex_data, dtype=np.float32
-    )  # Convertir les données des sommets en tableau NumPy
-    texcoord_data = np.array(
-        texcoord_data, dtype=np.float32
-    )  # Convertir les données des coordonnées de texture en tableau NumPy
-
-    vbo = glGenBuffers(1)  # Générer un identifiant de VBO
+    return upload_texture(decode_texture(filename))  # Décoder puis envoyer la texture
+
+
+# Fonction pour charger une image et ses mipmaps (sans appel OpenGL, utilisable dans un fil de travail)
+def decode_texture(filename):
+    return load_mip_chain(filename)  # Cache des mipmaps, ou décodage PNG au premier lancement
+
+
+# Fonction pour obtenir la taille maximale des textures (None : pas de limite)
+def texture_max_size():
+    return graphics.get("texture_max_size") or TEXTURE_MAX_SIZES.get(graphics.get("preset"))
+
+
+# Fonction pour décoder l'image du ciel à la résolution du préréglage graphique
+def decode_sky(filename):
+    max_width = SKY_RESOLUTIONS.get(graphics.get("preset"), None)  # Largeur maximale
+    pixels, _, _ = load_sky_image(filename, max_width)  # Image réduite, en cache sur disque
+    return DecodedImage(pixels, "RGBA", flipped=True)  # Lignes déjà du bas vers le haut
+
+
+# Fonction pour envoyer une image décodée à la carte graphique
+def upload_texture(image, owner="textures"):
+    if isinstance(image, MipChain):  # Textures du musée : suivies dans le budget de mémoire
+        return texture_manager.load(image, owner, max_size=texture_max_size())
+    return texture_uploader.upload(image, owner)  # Envoi par tampon de pixels et mipmaps
+
+
+# Fonction pour créer un modèle indexé (un VBO entrelacé et un tampon d'éléments)
+def create_indexed_model_vbo(vertices, texcoords, faces):
+    interleaved, indices = build_indexed_mesh(
+        vertices, texcoords, faces
+    )  # Sommets (x, y, z, u, v) uniques et indices des triangles
+    return upload_indexed_mesh(interleaved, indices)  # Envoyer le maillage
+
+
+# Fonction pour envoyer un maillage indexé (tableaux NumPy ou np.memmap) à la carte graphique
+def upload_indexed_mesh(interleaved, indices, owner="modèle"):
+    vbo = registry.buffer(owner)  # Générer un identifiant de VBO
     glBindBuffer(GL_ARRAY_BUFFER, vbo)  # Lier le VBO
     glBufferData(
-        GL_ARRAY_BUFFER, vertex_data.nbytes + texcoord_data.nbytes, None, GL_STATIC_DRAW
-    )  # Appliquer les données
-    glBufferSubData(
-        GL_ARRAY_BUFFER, 0, vertex_data.nbytes, vertex_data
-    )  # Ajouter les données des sommets
-    glBufferSubData(
-        GL_ARRAY_BUFFER, vertex_data.nbytes, texcoord_data.nbytes, texcoord_data
-    )  # Ajouter les données des coordonnées de texture
+        GL_ARRAY_BUFFER, interleaved.nbytes, interleaved, GL_STATIC_DRAW
+    )  # Envoyer les sommets entrelacés
+    registry.set_bytes("buffer", vbo, interleaved.nbytes)
+
+    ebo = registry.buffer(owner)  # Générer un identifiant de tampon d'éléments
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)  # Lier le tampon d'éléments
+    glBufferData(
+        GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW
+    )  # Envoyer les indices
+    registry.set_bytes("buffer", ebo, indices.nbytes)
 
+    glBindBuffer(GL_ARRAY_BUFFER, 0)  # Délier les tampons
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    index_type = (
+        GL_UNSIGNED_SHORT if indices.dtype == np.uint16 else GL_UNSIGNED_INT
+    )  # Type des indices
     return (
         vbo,
-        len(vertex_data) // 3,
-    )  # Retourner l'identifiant du VBO et le nombre de sommets
+        ebo,
+        len(indices),
+        index_type,
+    )  # Retourner les identifiants des tampons, le nombre d'indices et leur type
 
 
-# Fonction pour dessiner un modèle
-def draw_model(vbo, vertex_count):
+# Fonction pour dessiner un modèle indexé
+# (ranges : plages d'indices (premier, nombre) à dessiner dans l'ordre, par défaut tout le modèle)
+def draw_indexed_model(vbo, ebo, index_count, index_type, ranges=None):
     glBindBuffer(GL_ARRAY_BUFFER, vbo)  # Lier le VBO
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)  # Lier le tampon d'éléments
     glEnableClientState(GL_VERTEX_ARRAY)  # Activer le tableau des sommets
-    glVertexPointer(3, GL_FLOAT, 0, None)  # Pointer vers les sommets
+    glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, None)  # Position au début du sommet
     glEnableClientState(
         GL_TEXTURE_COORD_ARRAY
     )  # Activer le tableau des coordonnées de texture
     glTexCoordPointer(
-        2, GL_FLOAT, 0, ctypes.c_void_p(vertex_count * 3 * 4)
-    )  # Pointer vers les coordonnées de texture
+        2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(3 * 4)
+    )  # Coordonnées de texture après la position
 
-    # Active le test de profondeur
+    # Active le test de profondeur (l'état de l'appelant est restauré à la fin)
+    glPushAttrib(GL_ENABLE_BIT | GL_POLYGON_BIT)
     glEnable(GL_DEPTH_TEST)
 
     # Dessiner le modèle plein
     glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
     glColor3f(1.0, 1.0, 1.0)  # Couleur blanche pour que la texture soit visible
-    glDrawArrays(GL_TRIANGLES, 0, vertex_count)  # Dessiner le modèle
+    if ranges is None:
+        glDrawElements(GL_TRIANGLES, index_count, index_type, None)  # Dessiner le modèle
+    else:
+        index_size = 2 if index_type == GL_UNSIGNED_SHORT else 4  # Octets par indice
+        for first, count in ranges:  # Un appel par bloc visible
+            glDrawElements(GL_TRIANGLES, count, index_type, ctypes.c_void_p(first * index_size))
 
     glDisableClientState(
         GL_TEXTURE_COORD_ARRAY
     )  # Désactiver le tableau des coordonnées de texture
     glDisableClientState(GL_VERTEX_ARRAY)  # Désactiver le tableau des sommets
-    glDisable(GL_DEPTH_TEST)  # Désactiver le test de profondeur
-
-
-# Initialisation de Pygame et de la police
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)  # Délier les tampons
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    glPopAttrib()  # Restaurer le test de profondeur et le mode des polygones
 
 
 version_text = "Version 1.0.0"  # Texte de la version
-try:  # Essayer de charger la police par défaut
-    version_font = pygame.font.Font(None, 24)  # Police par défaut
-except:  # En cas d'erreur
-    print(
-        "Erreur lors de l'initialisation de la police, utilisation de la police par défaut."
-    )
-    version_font = pygame.font.SysFont(
-        "Arial", 24
-    )  # Si 'None' échoue, utiliser Arial comme fallback
 
 
 def draw_crosshair(screen_width, screen_height):  # Fonction pour dessiner le viseur
@@ -736,21 +766,17 @@ def draw_crosshair(screen_width, screen_height):  # Fonction pour dessiner le vi
     glPushMatrix()  # Sauvegarde de la matrice
     glLoadIdentity()  # Réinitialisation de la matrice
 
-    glColor4f(1.0, 1.0, 1.0, 1.0)  # Couleur blanche semi-transparente
-    glLineWidth(thickness)  # Définition de l'épaisseur des lignes
-    glBegin(GL_LINES)  # Début du dessin des lignes
-
-    glVertex2f(center_x - size, center_y)  # Ligne horizontale gauche
-    glVertex2f(center_x - gap / 2, center_y)
-    glVertex2f(center_x + gap / 2, center_y)  # Ligne horizontale droite
-    glVertex2f(center_x + size, center_y)
-
-    glVertex2f(center_x, center_y - size)  # Ligne verticale haut
-    glVertex2f(center_x, center_y - gap / 2)
-    glVertex2f(center_x, center_y + gap / 2)  # Ligne verticale bas
-    glVertex2f(center_x, center_y + size)
-
-    glEnd()  # Fin du dessin des lignes
+    primitives.lines(
+        [
+            [(center_x - size, center_y), (center_x - gap / 2, center_y)],  # Ligne horizontale gauche
+            [(center_x + gap / 2, center_y), (center_x + size, center_y)],  # Ligne horizontale droite
+            [(center_x, center_y - size), (center_x, center_y - gap / 2)],  # Ligne verticale haut
+            [(center_x, center_y + gap / 2), (center_x, center_y + size)],  # Ligne verticale bas
+        ],
+        (1.0, 1.0, 1.0, 1.0),  # Couleur blanche
+        thickness,  # Épaisseur des lignes
+    )
+    primitives.flush()  # Dessiner le viseur en un appel
 
     glMatrixMode(GL_PROJECTION)  # Retour en mode projection
     glPopMatrix()  # Restauration de la matrice
@@ -1074,6 +1100,7 @@ def display_credits(screen, font, back_button_image, event=None):
 
 # Fonction pour quitter le jeu  
 def quit_game():
+    release_gpu_resources()  # Libérer les ressources OpenGL avant de fermer la fenêtre
     pygame.quit()
     sys.exit()
     subprocess.run(["python", "main.py"])
@@ -1113,12 +1140,6 @@ def size_screen():
     ]
 
 
-# Initialisation de Pygame
-pygame.init()
-
-# Récupération des résolutions disponibles
-resolutions = size_screen()
-
 # Index de la résolution actuelle
 current_resolution_index = 0
 
@@ -1135,6 +1156,8 @@ def change_resolution(index):
         width, height = pygame.display.Info().current_w, pygame.display.Info().current_h
     else:
         screen = pygame.display.set_mode((width, height), DOUBLEBUF | OPENGL)
+    if gpu_assets.check_context():  # Certaines plateformes recréent le contexte OpenGL
+        forget_gpu_resources()
 
     # Réinitialiser le contexte OpenGL
     glViewport(0, 0, width, height)
@@ -1649,13 +1672,7 @@ def draw_loading_screen(screen, progress, font):
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)  # Définir le mode de blending
 
     # Dessiner le fond noir
-    glColor4f(0.0, 0.0, 0.0, 1.0)  # Définir la couleur du fond
-    glBegin(GL_QUADS)  # Dessiner un rectangle
-    glVertex2f(0, 0)  # Dessiner le coin supérieur gauche
-    glVertex2f(screen.get_width(), 0)  # Dessiner le coin supérieur droit
-    glVertex2f(screen.get_width(), screen.get_height())  # Dessiner le coin inférieur droit
-    glVertex2f(0, screen.get_height())  # Dessiner le coin inférieur gauche
-    glEnd()  # Terminer le dessin
+    primitives.rect(0, 0, screen.get_width(), screen.get_height(), (0.0, 0.0, 0.0, 1.0))
 
     # Dessiner la barre de progression
     bar_width = screen.get_width() * 0.6  # Largeur de la barre
@@ -1663,49 +1680,19 @@ def draw_loading_screen(screen, progress, font):
     bar_x = (screen.get_width() - bar_width) / 2  # Position x de la barre
     bar_y = screen.get_height() / 2  # Position y de la barre
 
-    # Fond de la barre
-    glColor4f(0.3, 0.3, 0.3, 1.0)  # Définir la couleur du fond
-    glBegin(GL_QUADS)  # Dessiner un rectangle
-    glVertex2f(bar_x, bar_y)  # Dessiner le coin supérieur gauche
-    glVertex2f(bar_x + bar_width, bar_y)  # Dessiner le coin supérieur droit
-    glVertex2f(bar_x + bar_width, bar_y + bar_height)  # Dessiner le coin inférieur droit
-    glVertex2f(bar_x, bar_y + bar_height)  # Dessiner le coin inférieur gauche
-    glEnd()  # Terminer le dessin
-
-    # Barre de progression
-    glColor4f(0.0, 0.7, 1.0, 1.0)  # Définir la couleur de la barre
-    glBegin(GL_QUADS)  # Dessiner un rectangle
-    glVertex2f(bar_x, bar_y)  # Dessiner le coin supérieur gauche
-    glVertex2f(bar_x + bar_width * progress, bar_y)  # Dessiner le coin supérieur droit
-    glVertex2f(bar_x + bar_width * progress, bar_y + bar_height)  # Dessiner le coin inférieur droit
-    glVertex2f(bar_x, bar_y + bar_height)  # Dessiner le coin inférieur gauche
-    glEnd()  # Terminer le dessin
+    primitives.rect(bar_x, bar_y, bar_width, bar_height, (0.3, 0.3, 0.3, 1.0))  # Fond de la barre
+    primitives.rect(
+        bar_x, bar_y, bar_width * progress, bar_height, (0.0, 0.7, 1.0, 1.0)
+    )  # Barre de progression
+    primitives.flush()  # Fond et barre en un seul appel
 
     # Texte de chargement
     loading_text = f"Chargement : {int(progress * 100)}%"  # Texte de chargement
-    texture_id, width, height = render_text_to_texture(
-        loading_text, font, (255, 255, 255)  # Définir la couleur du texte
-    )
-
-    glEnable(GL_TEXTURE_2D)  # Activer le texte
-    glBindTexture(GL_TEXTURE_2D, texture_id)  # Associer la texture
-    glColor4f(1.0, 1.0, 1.0, 1.0)  # Définir la couleur du texte
-
+    width, _ = text_renderer.measure(loading_text, font)  # Largeur du texte
     text_x = (screen.get_width() - width) / 2  # Position x du texte
     text_y = bar_y - 40  # Position y du texte
-
-    glBegin(GL_QUADS)  # Dessiner un rectangle
-    glTexCoord2f(0, 0)  # Coordonnées de la texture
-    glVertex2f(text_x, text_y)  # Dessiner le coin supérieur gauche
-    glTexCoord2f(1, 0)  # Coordonnées de la texture
-    glVertex2f(text_x + width, text_y)  # Dessiner le coin supérieur droit
-    glTexCoord2f(1, 1)  # Coordonnées de la texture
-    glVertex2f(text_x + width, text_y + height)  # Dessiner le coin inférieur droit
-    glTexCoord2f(0, 1)  # Coordonnées de la texture
-    glVertex2f(text_x, text_y + height)  # Dessiner le coin inférieur gauche
-    glEnd()  # Terminer le dessin
-
-    glDisable(GL_TEXTURE_2D)  # Désactiver le texte
+    text_renderer.draw(loading_text, font, text_x, text_y)  # Ajouter le texte au lot
+    text_renderer.flush()  # Dessiner le texte
 
     # Restaurer les états OpenGL
     glMatrixMode(GL_PROJECTION)  # Changer le mode de projection
@@ -1715,76 +1702,12 @@ def draw_loading_screen(screen, progress, font):
 
     pygame.display.flip()  # Actualiser l'affichage
 
-# Fonction pour dessiner un rectangle arrondi rempli en OpenGL
+# Fonction pour dessiner un rectangle arrondi rempli en OpenGL (ajouté au lot des primitives)
 def draw_rounded_rect(x, y, width, height, radius, color):
-    glColor4f(*color)  # Définir la couleur
-
-    # Dessiner le corps principal
-    glBegin(GL_QUADS)  # Dessiner un rectangle
-    glVertex2f(x + radius, y)  # Dessiner le coin supérieur gauche
-    glVertex2f(x + width - radius, y)  # Dessiner le coin supérieur droit
-    glVertex2f(x + width - radius, y + height)  # Dessiner le coin inférieur droit
-    glVertex2f(x + radius, y + height)  # Dessiner le coin inférieur gauche
-    glEnd()  # Terminer le dessin
-
-    # Dessiner les coins arrondis
-    segments = 32  # Nombre de segments pour chaque coin
-    for i in range(segments): 
-        angle = 2.0 * math.pi * i / segments # Calculer l'angle pour chaque segment
-
-        # Coin supérieur gauche
-        glBegin(GL_TRIANGLES)  # Dessiner un triangle
-        glVertex2f(x + radius, y + radius)  # Dessiner le coin supérieur gauche 
-        glVertex2f(
-            x + radius + radius * math.cos(angle), y + radius + radius * math.sin(angle)
-        )  # Dessiner le coin supérieur droit   
-        glVertex2f(
-            x + radius + radius * math.cos(angle + 2.0 * math.pi / segments),
-            y + radius + radius * math.sin(angle + 2.0 * math.pi / segments),
-        )  # Dessiner le coin inférieur droit   
-        glEnd()  # Terminer le dessin
-
-        # Coin supérieur droit
-        glBegin(GL_TRIANGLES)  # Dessiner un triangle   
-        glVertex2f(x + width - radius, y + radius)  # Dessiner le coin supérieur droit
-        glVertex2f(
-            x + width - radius + radius * math.cos(angle),
-            y + radius + radius * math.sin(angle),
-        )  # Dessiner le coin supérieur droit
-        glVertex2f(
-            x + width - radius + radius * math.cos(angle + 2.0 * math.pi / segments),
-            y + radius + radius * math.sin(angle + 2.0 * math.pi / segments),
-        )  # Dessiner le coin inférieur droit
-        glEnd()  # Terminer le dessin
-
-        # Coin inférieur gauche
-        glBegin(GL_TRIANGLES)  # Dessiner un triangle
-        glVertex2f(x + radius, y + height - radius)  # Dessiner le coin inférieur gauche
-        glVertex2f(
-            x + radius + radius * math.cos(angle),
-            y + height - radius + radius * math.sin(angle),
-        )  # Dessiner le coin supérieur droit   
-        glVertex2f( 
-            x + radius + radius * math.cos(angle + 2.0 * math.pi / segments),
-            y + height - radius + radius * math.sin(angle + 2.0 * math.pi / segments),
-        )  # Dessiner le coin inférieur droit
-        glEnd()  # Terminer le dessin
-
-        # Coin inférieur droit
-        glBegin(GL_TRIANGLES)  # Dessiner un triangle
-        glVertex2f(x + width - radius, y + height - radius)  # Dessiner le coin inférieur droit
-        glVertex2f(
-            x + width - radius + radius * math.cos(angle),
-            y + height - radius + radius * math.sin(angle),
-        )  # Dessiner le coin supérieur droit
-        glVertex2f(
-            x + width - radius + radius * math.cos(angle + 2.0 * math.pi / segments),
-            y + height - radius + radius * math.sin(angle + 2.0 * math.pi / segments),
-        )  # Dessiner le coin inférieur droit
-        glEnd()  # Terminer le dessin
+    primitives.rounded_rect(x, y, width, height, radius, color)  # Coins tirés des tables du cercle unité
 
 # Fonction pour afficher une barre de chargement arrondie avec texte
-def draw_loading_bar(screen, font, progress):
+def draw_loading_bar(screen, font, progress, detail=None):
     bar_x, bar_y = screen.get_width() * 0.2, screen.get_height() * 0.5  # Position x et y de la barre
     bar_width, bar_height = screen.get_width() * 0.6, 30  # Largeur et hauteur de la barre
     radius = 15  # Rayon des coins arrondis
@@ -1800,34 +1723,100 @@ def draw_loading_bar(screen, font, progress):
     draw_rounded_rect(
         bar_x, bar_y, bar_width * progress, bar_height, radius, (0.0, 0.5, 1.0, 1.0)  # Dessiner la barre de progression (bleue)
     )
+    primitives.flush()  # Les deux barres en un seul appel
 
     # Afficher le texte "Chargement : ... %"
     percentage_text = f"Chargement : {int(progress * 100)}%"  # Texte de chargement
-    texture_id, text_width, text_height = render_text_to_texture(
-        percentage_text, font, (255, 255, 255)  # Définir la couleur du texte
-    )
-    text_x = (screen.get_width() - text_width) / 2  # Position x du texte
-    text_y = bar_y - 40  # Position y du texte
-
-    glEnable(GL_TEXTURE_2D)  # Activer le texte
-    glBindTexture(GL_TEXTURE_2D, texture_id)  # Associer la texture
-    glColor4f(1.0, 1.0, 1.0, 1.0)  # Définir la couleur du texte
-    glBegin(GL_QUADS)  # Dessiner un rectangle
-    glTexCoord2f(0, 1)  # Coordonnées de la texture
-    glVertex2f(text_x, text_y)  # Dessiner le coin supérieur gauche
-    glTexCoord2f(1, 1)  # Coordonnées de la texture
-    glVertex2f(text_x + text_width, text_y)  # Dessiner le coin supérieur droit
-    glTexCoord2f(1, 0)  # Coordonnées de la texture
-    glVertex2f(text_x + text_width, text_y + text_height)  # Dessiner le coin inférieur droit
-    glTexCoord2f(0, 0)  # Coordonnées de la texture
-    glVertex2f(text_x, text_y + text_height)  # Dessiner le coin inférieur gauche
-    glEnd()  # Terminer le dessin
-    glDisable(GL_TEXTURE_2D)  # Désactiver le texte
+    text_width, _ = text_renderer.measure(percentage_text, font)  # Largeur du texte
+    text_renderer.draw(
+        percentage_text, font, (screen.get_width() - text_width) / 2, bar_y - 40
+    )  # Ajouter le texte au lot
+
+    # Afficher le détail du chargement (ressources et octets chargés) sous la barre
+    if detail:
+        text_width, _ = text_renderer.measure(detail, font)  # Largeur du texte
+        text_renderer.draw(
+            detail,
+            font,
+            (screen.get_width() - text_width) / 2,
+            bar_y + bar_height + 15,
+            (180, 180, 180),  # Définir la couleur du texte
+        )  # Ajouter le texte au lot
+    text_renderer.flush()  # Dessiner les deux textes en un seul appel
 
     pygame.display.flip()  # Actualiser l'affichage
 
+# Fonction pour lire le modèle du musée dans un fil de travail : analyse sur un seul processus,
+# pour ne pas prendre les cœurs de la vidéo du menu (le cache se construit à l'avance avec
+# python -m engine.mesh_cache)
+def decode_model(filename):
+    return load_cached_mesh(filename, workers=1)
+
+
+# Fonction pour envoyer le modèle chargé par load_cached_mesh (fil principal)
+def upload_model(model_data):
+    interleaved, indices, chunks, report = model_data  # Données du modèle, blocs et rapport de chargement
+    if report["hit"]:
+        print(
+            f"Modèle chargé depuis le cache en {report['seconds']:.2f} s "
+            f"(gain : {report['saved']:.2f} s)"
+        )
+    else:
+        print(f"Modèle analysé en {report['seconds']:.2f} s, cache créé")
+    return upload_indexed_mesh(interleaved, indices) + (chunks,)  # Créer le VBO indexé, garder les blocs
+
+
+# Fonction pour envoyer un modèle d'œuvre et ses niveaux de détail chargés par load_lod_mesh (fil principal)
+def upload_lod_model(model_data):
+    interleaved, indices, lods = model_data  # Tous les niveaux dans un seul tampon
+    return upload_indexed_mesh(interleaved, indices) + (lods,)  # Créer le VBO indexé, garder les niveaux
+
+
+# Fonction pour envoyer une texture décodée par decode_texture (fil principal)
+def upload_decoded_texture(decoded):
+    return upload_texture(decoded)
+
+
+# Ressources du musée : nom -> (fichier, décodage dans un fil, envoi OpenGL, type de ressource)
+MUSEUM_ASSETS = {
+    "model": (
+        os.sep.join(["src", "models", "Untitled.obj"]),
+        decode_model,  # Analyse du OBJ sur un processus (ou lecture du cache binaire)
+        upload_model,  # Création du VBO indexé
+        "mesh",
+    ),
+    "texture": (
+        os.sep.join(["src", "textures", "texture.png"]),
+        decode_texture,
+        upload_decoded_texture,
+        "texture",
+    ),  # Texture du modèle
+    "floor": (
+        os.sep.join(["src", "textures", "sol.png"]),
+        decode_texture,
+        upload_decoded_texture,
+        "texture",
+    ),  # Texture du sol
+    "sky": (
+        os.sep.join(["src", "textures", "sky.png"]),
+        decode_sky,
+        upload_decoded_texture,
+        "texture",
+    ),  # Texture du ciel
+}
+
+
+# Fonction pour lancer la lecture et le décodage des ressources du musée dans des fils de travail
+def create_asset_loader(names=None, workers=None, throttle=0.0):
+    loader = AssetLoader(workers, throttle)
+    for name in names if names is not None else MUSEUM_ASSETS:
+        filename, decode, upload, _ = MUSEUM_ASSETS[name]
+        loader.add(name, filename, decode, upload)
+    return loader
+
+# Fonction pour commencer le jeu (retourne False si le chargement du musée échoue)
 # Fonction pour commencer le jeu
-def start_game(screen, font, background_image, dimensions_possibles, current_state):
+def start_game(screen, font, background_image, dimensions_possibles, current_state, loader=None):
     global master_volume, video_capture, current_tab, waiting_for_key, slider_value, controls, frame_x, frame_y, frame_width, frame_height, spacing, is_dragging, input_active, input_text  # Variables globales
 
     # Charger les paramètres sauvegardés avant l'initialisation
@@ -1870,39 +1859,75 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
         display, DOUBLEBUF | OPENGL
     )  # Créer la fenêtre Pygame
     pygame.display.set_caption("VirtuLouvre")  # Titre de la fenêtre
-    start_time = time.time()  # Démarrer le chronomètre
-    loading_duration = 5  # Durée de chargement en secondes
-
-    vertices, texcoords, faces = [], [], []
-    model_vbo, model_vertex_count, texture_id, floor_texture, sky_texture = (
-        None,
-        0,
-        None,
-        None,
-        None,
-    )  # Initialiser les variables VBO et textures
 
-    while True:
-        elapsed = time.time() - start_time  # Calculer le temps écoulé
-        progress = min(elapsed / loading_duration, 1.0)  # Calculer la progression
-
-        if progress >= 0.1 and not vertices:  # Charger le modèle
-            vertices, texcoords, faces = load_obj(
-                os.sep.join(["src", "models", "Untitled.obj"])
-            )  # Charger le modèle
-        if progress >= 0.3 and not model_vbo:  # Créer le VBO du modèle
-            model_vbo, model_vertex_count = create_model_vbo(vertices, texcoords, faces)
-        if progress >= 0.5 and not texture_id:  # Charger la texture
-            texture_id = load_texture(os.sep.join(["src", "textures", "texture.png"]))
-        if progress >= 0.7 and not floor_texture:  # Charger la texture du sol
-            floor_texture = load_texture(os.sep.join(["src", "textures", "sol.png"]))
-        if progress >= 0.9 and not sky_texture:  # Charger la texture du ciel   
-            sky_texture = load_texture(os.sep.join(["src", "textures", "sky.png"]))
-
-        draw_loading_bar(screen, font, progress)  # Dessiner la barre de chargement
-
-        if progress >= 1.0:  # Arrêter le chargement
-            break
+    # Réutiliser les ressources déjà présentes sur la carte graphique (visite précédente)
+    if gpu_assets.check_context():  # Oublier les ressources d'un contexte perdu
+        forget_gpu_resources()
+    missing = [name for name in MUSEUM_ASSETS if gpu_assets.get(name) is None]
+
+    if missing:
+        # Reprendre le préchargement lancé par le menu, sinon lancer le chargement maintenant
+        # (un chargeur déjà utilisé ou incomplet est remplacé)
+        if (
+            loader is None
+            or loader.cancelled
+            or loader.results
+            or not set(missing) <= {job["name"] for job in loader.jobs}
+        ):
+            if loader is not None:
+                loader.cancel()  # Arrêter l'ancien chargeur
+            loader = create_asset_loader(missing)
+
+        # Afficher la progression réelle jusqu'à ce que tout soit prêt
+        while not loader.done():
+            for event in pygame.event.get():  # Garder la fenêtre réactive
+                if event.type == pygame.QUIT:  # Si l'événement est de quitter
+                    loader.cancel()  # Annuler le chargement
+                    save_controls()  # Sauvegarder les paramètres
+                    quit_game()  # Libérer les ressources OpenGL et terminer le programme
+
+            registry.begin_frame()  # Suivre les objets créés pendant l'image
+            try:
+                loader.poll()  # Envoyer à OpenGL les ressources décodées
+            except Exception as e:  # Fichier absent ou invalide : revenir au menu
+                print(f"Erreur lors du chargement du musée : {e}")
+                for name, handle in loader.results.items():  # Ressources déjà envoyées, suivies
+                    gpu_assets.adopt(name, MUSEUM_ASSETS[name][3], handle)
+                loader.cancel()  # Arrêter les autres décodages
+                registry.end_frame()
+                return False  # Chargement échoué
+            stats = loader.stats()  # Ressources et octets chargés
+            draw_loading_bar(
+                screen,
+                font,
+                loader.progress(),
+                f"{stats['done']}/{stats['total']} ressources - "
+                f"{stats['bytes_loaded'] / 1048576:.1f}/{stats['bytes_total'] / 1048576:.1f} Mo",
+            )  # Dessiner la barre de chargement
+            registry.end_frame()  # Signaler les objets accumulés image après image
+            clock.tick(60)  # Limiter l'affichage pendant le chargement
+        loader.close()  # Libérer les fils de travail
+
+        for name, handle in loader.results.items():  # Confier les ressources au gestionnaire
+            gpu_assets.adopt(name, MUSEUM_ASSETS[name][3], handle)
+
+    model_mesh = gpu_assets.get("model")  # Modèle indexé
+    texture_id = gpu_assets.get("texture")  # Texture du modèle
+    floor_texture = gpu_assets.get("floor")  # Texture du sol
+    sky_texture = gpu_assets.get("sky")  # Texture du ciel
+    video_screens.open(load_local_video, load_screens())  # Démarrer la lecture des écrans (config/screens.json)
+    museum_rooms.open(model_mesh[4])  # Répartir les blocs du modèle entre les salles
+    museum_pvs.open(MUSEUM_ASSETS["model"][0], model_mesh[4])  # Ensembles visibles calculés hors ligne
+    texture_manager.set_budget(graphics.get("texture_budget_mb", DEFAULT_BUDGET_MB))  # Budget configuré
+    lod_selector.set_bias(graphics.get("lod_bias"), graphics.get("preset"))  # Détails des modèles configurés
+    artwork_prefetcher.open(
+        load_artworks(),
+        {
+            "texture": (load_mip_chain, upload_texture, "texture"),  # Image de l'œuvre
+            "mesh": (load_lod_mesh, upload_lod_model, "mesh"),  # Modèle 3D de l'œuvre et ses niveaux de détail
+        },
+    )  # Les œuvres sont chargées pendant la visite, pas avant
+    gigapixel_viewer.open(artwork_prefetcher.artworks)  # Pyramides de tuiles déjà construites
 
     glMatrixMode(GL_MODELVIEW)  # Assure que nous sommes en mode ModelView
     glLoadIdentity()  # Réinitialiser la matrice de projection 
@@ -1912,7 +1937,6 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
     glFrontFace(GL_CCW)  # Définir le sens de la face avant
 
     glDisable(GL_CULL_FACE)  # Désactiver le masquage des faces cachées
-    menu_screen = pygame.Surface((display[0], display[1]), pygame.SRCALPHA)  # Créer une surface transparente
     slider_value = 110  # Valeur initiale du curseur
     is_dragging = False  # Indicateur de glissement
 
@@ -1934,6 +1958,33 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
     clock = pygame.time.Clock()  # Initialiser le chronomètre
     font = pygame.font.Font(None, 24)  # Mise à jour de la police ici aussi
 
+    # Boutons du menu pause, créés une seule fois
+    buttons = [
+        Button(
+            display[0] // 2 - 100, # Position x du bouton
+            display[1] // 2 + offset, # Position y du bouton
+            200, # Largeur du bouton
+            50, # Hauteur du bouton
+            text, # Texte du bouton
+            (255, 255, 255), # Couleur du texte
+            font, # Police du texte
+            BLUE, # Couleur du bouton
+            HOVER_BLUE, # Couleur du bouton au survol
+        )
+        for text, offset in (("Resume", -100), ("Settings", -20), ("Quit", 60))
+    ]
+
+    # Fonction pour dessiner le menu pause dans son calque
+    def draw_pause_menu(surface):
+        pygame.draw.rect(
+            surface,
+            (20, 20, 20, 180),
+            (menu_x, menu_y, menu_width, menu_height),
+            border_radius=15,
+        )  # Dessiner le fond semi-transparent du menu
+        for button in buttons:  # Pour chaque bouton
+            button.draw(surface)  # Dessiner le bouton
+
     glEnable(GL_BLEND)  # Activer le mélange des couleurs
     glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)  # Définir le mode de mélange
 
@@ -1944,10 +1995,12 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
     # Boucle principale du jeu
     while True:
         delta_time = clock.tick(100) / 1000.0  # Calculer le temps écoulé
+        registry.begin_frame()  # Suivre les objets créés pendant l'image
         keys = pygame.key.get_pressed()  # Récupérer les touches pressées
 
         for event in pygame.event.get():  # Pour chaque événement Pygame
             if event.type == pygame.QUIT:  # Si l'événement est de quitter
+                release_gpu_resources()  # Libérer les ressources OpenGL
                 pygame.quit()  # Quitter Pygame
                 return
 
@@ -2136,7 +2189,12 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
                 if current_state == "game":  # Si le jeu est dans l'état "game"
                     if event.type == pygame.MOUSEMOTION:  # Si l'événement est un mouvement de la souris    
                         xoffset, yoffset = event.rel  # Récupérer le déplacement de la souris
-                        player.process_mouse(xoffset, -yoffset)  # Mettre à jour la position du joueur
+                        zoom = gigapixel_viewer.zoom  # Visée plus précise en inspection
+                        player.process_mouse(xoffset / zoom, -yoffset / zoom)  # Mettre à jour la position du joueur
+                    elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:  # Clic droit
+                        gigapixel_viewer.toggle_inspection(player)  # Inspecter l'œuvre visée
+                    elif event.type == pygame.MOUSEWHEEL:  # Molette : grossissement en inspection
+                        gigapixel_viewer.zoom_by(event.y)
 
         # Mise à jour du joueur
         if current_state == "game":  # Si le jeu est dans l'état "game"
@@ -2145,77 +2203,80 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
 
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)  # Effacer le tampon
 
+        paused = current_state in ["game_menu", "game_settings"]  # La caméra ne bouge pas dans les menus
+        if not paused:
+            pause_backdrop.clear()  # Recapturer la scène à la prochaine pause
+
+        # Menus : afficher l'image figée de la scène au lieu de la redessiner
+        if paused and pause_backdrop.ready:
+            glMatrixMode(GL_PROJECTION)  # Changer le mode de projection
+            glPushMatrix()  # Sauvegarder la matrice de projection
+            glLoadIdentity()  # Réinitialiser la matrice de projection
+            glOrtho(0, display[0], display[1], 0, -1, 1)  # Définir la projection orthographique
+            glMatrixMode(GL_MODELVIEW)  # Changer le mode de vue
+            glPushMatrix()  # Sauvegarder la matrice de vue
+            glLoadIdentity()  # Réinitialiser la matrice de vue
+            glDisable(GL_DEPTH_TEST)  # Désactiver le test de profondeur
+
+            pause_backdrop.draw(primitives)  # Un seul quadrilatère texturé
+            primitives.flush()
+            video_screens.pause()  # Aucun décodage derrière le menu
+
+            glMatrixMode(GL_PROJECTION)  # Changer le mode de projection
+            glPopMatrix()  # Restaurer la matrice de projection
+            glMatrixMode(GL_MODELVIEW)  # Changer le mode de vue
+            glPopMatrix()  # Restaurer la matrice de vue
+
         # Rendu de la scène 3D
-        if current_state in ["game", "game_menu", "game_settings"]:  # Si le jeu est dans l'état "game", "game_menu" ou "game_settings"
+        elif current_state in ["game", "game_menu", "game_settings"]:  # Si le jeu est dans l'état "game", "game_menu" ou "game_settings"
             player.apply()  # Appliquer la projection
-            player.fov = slider_value  # Mettre à jour la valeur du FOV
+            player.fov = slider_value / gigapixel_viewer.zoom  # Mettre à jour la valeur du FOV (réduite en inspection)
             player.apply_projection()  # Appliquer la projection
 
             glDisable(GL_CULL_FACE)  # Désactiver le masquage des faces cachées
-            draw_skybox(sky_texture)  # Dessiner le ciel
+            glEnable(GL_DEPTH_TEST)  # Le sol remplit le tampon de profondeur
             draw_textured_floor(floor_texture)  # Dessiner le sol
+            primitives.flush()  # Envoyer le sol
 
             glEnable(GL_TEXTURE_2D)  # Activer le masquage des faces cachées
-            glBindTexture(GL_TEXTURE_2D, texture_id)  # Associer la texture
-            draw_model(model_vbo, model_vertex_count)  # Dessiner le modèle
+            glBindTexture(GL_TEXTURE_2D, texture_manager.use(texture_id))  # Associer la texture
+            model_chunks = model_mesh[4]  # Blocs du modèle
+            possible = museum_pvs.lookup(player.position)  # Blocs visibles depuis la cellule du joueur
+            visible = museum_rooms.visible_chunks(model_chunks, player, possible)  # Blocs des salles visibles
+            draw_indexed_model(*model_mesh[:4], model_chunks.ranges(visible))  # Du plus proche au plus lointain
             glDisable(GL_TEXTURE_2D)  # Désactiver le masquage des faces cachées
 
-            draw_crosshair(display[0], display[1])  # Dessiner la cible
+            if paused:
+                video_screens.pause()  # Image figée : garder la dernière image des écrans
+            else:
+                video_screens.update(player)  # Pause hors de vue, envoi des nouvelles images
+                artwork_prefetcher.update(player, delta_time)  # Œuvres sur le trajet du visiteur
+                gigapixel_viewer.update(player, display[1])  # Tuiles au niveau de détail de l'écran
+            draw_artworks(player, display[1])  # Œuvres déjà chargées
+            gigapixel_viewer.draw(primitives)  # Œuvres très haute définition
+            video_screens.draw(primitives)  # Écrans visibles
+            glEnable(GL_DEPTH_TEST)  # Cachés par les murs et statues devant eux
+            glEnable(GL_POLYGON_OFFSET_FILL)  # Légèrement avancés : pas de scintillement contre le mur porteur
+            glPolygonOffset(-1.0, -1.0)  # (visible surtout en inspection, quand le champ de vision est réduit)
+            primitives.flush()
+            glDisable(GL_POLYGON_OFFSET_FILL)
+
+            draw_skybox(sky_texture, player.position)  # Dessiner le ciel en dernier
+
+            if paused:  # Ouverture du menu : capturer la scène une seule fois (sans la cible)
+                pause_backdrop.capture(display[0], display[1], graphics.get("menu_blur", True))
+            else:
+                draw_crosshair(display[0], display[1])  # Dessiner la cible
 
         # Gestion des différents états
         if current_state == "game_menu":  # Si le jeu est dans l'état "game_menu"   
-            # Effacer le menu
-            menu_screen.fill((0, 0, 0, 0))
-
-            # Dessiner le fond semi-transparent du menu
-            pygame.draw.rect(
-                menu_screen, 
-                (20, 20, 20, 180),
-                (menu_x, menu_y, menu_width, menu_height),
-                border_radius=15,
-            )  # Dessiner le fond semi-transparent du menu  
-
-            # Définir les boutons
-            buttons = [
-                Button(
-                    display[0] // 2 - 100, # Position x du bouton
-                    display[1] // 2 - 100, # Position y du bouton
-                    200, # Largeur du bouton
-                    50, # Hauteur du bouton
-                    "Resume", # Texte du bouton
-                    (255, 255, 255), # Couleur du texte
-                    font, # Police du texte
-                    BLUE, # Couleur du bouton
-                    HOVER_BLUE, # Couleur du bouton au survol
-                ),
-                Button(
-                    display[0] // 2 - 100, # Position x du bouton
-                    display[1] // 2 - 20, # Position y du bouton
-                    200, # Largeur du bouton
-                    50, # Hauteur du bouton
-                    "Settings", # Texte du bouton
-                    (255, 255, 255), # Couleur du texte
-                    font, # Police du texte
-                    BLUE, # Couleur du bouton
-                    HOVER_BLUE, # Couleur du bouton au survol
-                ),
-                Button(
-                    display[0] // 2 - 100, # Position x du bouton
-                    display[1] // 2 + 60, # Position y du bouton
-                    200, # Largeur du bouton
-                    50, # Hauteur du bouton
-                    "Quit", # Texte du bouton
-                    (255, 255, 255), # Couleur du texte
-                    font, # Police du texte
-                    BLUE, # Couleur du bouton
-                    HOVER_BLUE, # Couleur du bouton au survol
-                ),
-            ]
-
             mouse_pos = pygame.mouse.get_pos()  # Récupérer la position de la souris
 
+            # Redessiner le menu seulement si le bouton survolé change
+            hovered = tuple(button.rect.collidepoint(mouse_pos) for button in buttons)
+            pause_overlay.update(display, hovered, draw_pause_menu)
+
             for button in buttons:  # Pour chaque bouton
-                button.draw(menu_screen)  # Dessiner le bouton
                 if pygame.mouse.get_pressed()[0]:  # Si le bouton gauche de la souris est enfoncé
                     if button.rect.collidepoint(mouse_pos):  # Si le bouton est enfoncé
                         if button.text == "Resume":  # Si le texte du bouton est "Resume"
@@ -2241,11 +2302,8 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
             glEnable(GL_BLEND)  # Activer le mélange
             glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)  # Définir le mélange
 
-            menu_texture_data = pygame.image.tostring(menu_screen, "RGBA", True)  # Récupérer les données de la texture du menu
-            glWindowPos2d(0, 0)  # Définir la position de la texture
-            glDrawPixels(
-                display[0], display[1], GL_RGBA, GL_UNSIGNED_BYTE, menu_texture_data
-            )  # Dessiner la texture
+            pause_overlay.draw(primitives)  # Texture du menu (aucun envoi si rien n'a changé)
+            primitives.flush()  # Dessiner le menu
 
             glMatrixMode(GL_PROJECTION)  # Changer le mode de projection
             glPopMatrix()  # Restaurer la matrice de projection
@@ -2269,10 +2327,29 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
             glEnable(GL_BLEND)  # Activer le mélange
             glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)  # Définir le mélange
 
-            settings_screen = pygame.Surface((display[0], display[1]), pygame.SRCALPHA)  # Créer une surface pour le rendu 2D
-            settings_screen.fill((0, 0, 0, 180))  # Remplir la surface avec une couleur semi-transparente
-
-            # Récupérer tous les événements pygame
+            # Redessiner les paramètres seulement si une valeur, le survol ou un clic change
+            mouse_pos = pygame.mouse.get_pos()  # Récupérer la position de la souris
+            hovered = ()  # Zones survolées, d'après les rectangles du dernier dessin
+            if settings_overlay.result is not None:
+                back, tabs, left, right, slider, reset = settings_overlay.result
+                hovered = tuple(
+                    rect.collidepoint(mouse_pos)
+                    for rect in (back, *(tab.rect for tab in tabs), left, right, slider, reset)
+                )
+            settings_state = (
+                current_tab,
+                slider_value,
+                master_volume,
+                input_active,
+                input_text,
+                waiting_for_key,
+                current_resolution_index,
+                is_dragging,
+                str(controls),
+                hovered,
+                mouse_pos if is_dragging else None,  # Position suivie seulement pendant le glisser
+                pygame.mouse.get_pressed(),
+            )
             (
                 back_rect,
                 tab_buttons,
@@ -2280,13 +2357,15 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
                 right_rect,
                 volume_slider_rect,
                 reset_button_rect,
-            ) = display_settings(settings_screen, font, back_button_image, current_tab)  # Afficher les paramètres
+            ) = settings_overlay.update(
+                display,
+                settings_state,
+                lambda surface: display_settings(surface, font, back_button_image, current_tab),
+                (0, 0, 0, 180),  # Fond semi-transparent
+            )  # Afficher les paramètres
 
-            settings_texture_data = pygame.image.tostring(settings_screen, "RGBA", True)  # Récupérer les données de la texture du menu
-            glWindowPos2d(0, 0)  # Définir la position de la texture
-            glDrawPixels(
-                display[0], display[1], GL_RGBA, GL_UNSIGNED_BYTE, settings_texture_data
-            )  # Dessiner la texture
+            settings_overlay.draw(primitives)  # Texture des paramètres
+            primitives.flush()  # Dessiner les paramètres
 
             glMatrixMode(GL_PROJECTION)  # Changer le mode de projection
             glPopMatrix()  # Restaurer la matrice de projection
@@ -2417,6 +2496,8 @@ def start_game(screen, font, background_image, dimensions_possibles, current_sta
                     elif event.unicode.isdigit() and len(input_text) < 3:  # Si le caractère est un chiffre et que le texte est inférieur à 3 caractères
                         input_text += event.unicode  # Ajouter le caractère au texte
 
+        texture_manager.end_frame()  # Respecter le budget de mémoire des textures
+        registry.end_frame()  # Signaler les objets accumulés image après image
         pygame.display.flip()  # Mettre à jour l'affichage
 
 
@@ -2452,14 +2533,11 @@ def main_menu():
     game_background = pygame.Surface((screen_width, screen_height))
     game_background.fill((20, 20, 20))  # Presque noir
 
-    # Charger la vidéo de fond pour le menu principal
+    # Lire la vidéo de fond du menu principal dans un fil de travail
     local_video_path = os.sep.join(["src", "media", "bg.mp4"])  # Chemin de la vidéo de fond
-    video_capture = load_local_video(local_video_path)  # Charger la vidéo de fond
-
-    # Variables pour le contrôle de la vidéo
-
-    frame_delay = 1.0 / 35  # Temps entre chaque frame en secondes
-    last_frame_time = time.time()  # Temps de la dernière frame
+    menu_video = VideoStream(
+        load_local_video, local_video_path, (screen_width, screen_height)
+    )  # Décodage, redimensionnement et conversion hors du fil de l'interface
 
     # Charger l'image de la flèche pour le retour
     back_button_image = pygame.image.load(  
@@ -2529,6 +2607,15 @@ def main_menu():
         ),
     ]
 
+    # Précharger les ressources du musée pendant que le menu est affiché :
+    # un seul fil de travail, avec une pause entre deux ressources, pour ne pas
+    # ralentir la vidéo du menu
+    preloader = create_asset_loader(
+        [name for name in MUSEUM_ASSETS if gpu_assets.get(name) is None],
+        workers=1,
+        throttle=0.05,
+    )  # Seulement les ressources qui ne sont pas déjà sur la carte graphique
+
     clock = pygame.time.Clock()  # Créer un horloge
     running = True  # Variable pour suivre si le jeu est en cours
     current_state = "parametres"  # État actuel du menu
@@ -2537,12 +2624,11 @@ def main_menu():
     is_dragging = False  # Variable pour suivre si la fenêtre est en train de être déplacée
 
     while running:
-        current_time = time.time()  # Temps actuel
-
         for event in pygame.event.get():
             if event.type == pygame.QUIT:  # Si l'événement est la fermeture de la fenêtre
                 # Sauvegarder les contrôles avant de quitter
                 save_controls()  # Sauvegarder les contrôles
+                preloader.cancel()  # Annuler le préchargement
                 running = False  # Arrêter la boucle
 
             # Gestion du déplacement de la fenêtre
@@ -2582,6 +2668,7 @@ def main_menu():
 
             elif event.type == pygame.VIDEORESIZE:  # Détecte le redimensionnement
                 screen_width, screen_height = event.w, event.h  # Redimensionner la fenêtre 
+                menu_video.resize((screen_width, screen_height))  # Images de la vidéo à la nouvelle taille
                 screen = pygame.display.set_mode(
                     (screen_width, screen_height), pygame.RESIZABLE | pygame.NOFRAME
                 )  # Redimensionner la fenêtre
@@ -2622,6 +2709,7 @@ def main_menu():
                         elif button.text == "Crédits":
                             current_state = "credits"  # Passer à l'état de crédits 
                         elif button.text == "Quitter":
+                            preloader.cancel()  # Annuler le préchargement
                             pygame.quit()  # Quitter le jeu
                             sys.exit()  # Quitter le programme
 
@@ -2731,18 +2819,10 @@ def main_menu():
 
         # Afficher l'état courant
         if current_state == "parametres":
-            # Contrôle du framerate de la vidéo
-            if current_time - last_frame_time >= frame_delay:
-                if video_capture:
-                    ret, frame = video_capture.read()
-                    if ret:
-                        frame = cv2.resize(frame, (screen_width, screen_height))
-                        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        frame_surface = pygame.surfarray.make_surface(frame)
-                        screen.blit(pygame.transform.rotate(frame_surface, -90), (0, 0))
-                    else:
-                        video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                last_frame_time = current_time
+            # Afficher l'image de la vidéo due à cet instant (déjà décodée et convertie)
+            frame_surface = menu_video.frame()
+            if frame_surface is not None:
+                screen.blit(frame_surface, (0, 0))
 
             # Dessiner la barre de titre
             pygame.draw.rect(screen, (40, 40, 40), (0, 0, screen_width, 30))
@@ -2768,9 +2848,16 @@ def main_menu():
         elif current_state == "settings":
             display_settings(screen, font, back_button_image, current_tab) # Afficher le menu paramètres
         elif current_state == "game":
-            start_game(
-                screen, font, game_background, dimensions_possibles, current_state
-            ) # Démarrer le jeu
+            if start_game(
+                screen, font, game_background, dimensions_possibles, current_state, preloader
+            ) is False: # Démarrer le jeu avec les ressources préchargées
+                # Chargement échoué (message déjà affiché) : retrouver la fenêtre du menu
+                screen = pygame.display.set_mode(
+                    (screen_width, screen_height), pygame.RESIZABLE | pygame.NOFRAME
+                )
+                pygame.display.set_caption("Menu principal")
+                current_state = "parametres"
+                continue
             pygame.display.flip()
         elif current_state == "quitter": 
             quit_game() # Quitter le jeu
@@ -2778,11 +2865,17 @@ def main_menu():
         
         pygame.display.flip()  # Limiter le framerate global à 60 FPS
 
-        # Sauvegarder les contrôles avant de quitter
-        if video_capture:
-            video_capture.release()
-        # Sauvegarder les contrôles avant de quitter
+    # Arrêter la vidéo et afficher ses statistiques
+    menu_video.close()
+    video_stats = menu_video.stats()
+    print(
+        f"Vidéo du menu : {video_stats['shown']} images affichées, "
+        f"{video_stats['dropped']} sautées, file {video_stats['queue']}/{video_stats['capacity']}, "
+        f"source : {video_stats['source']}"
+    )
+    # Sauvegarder les contrôles avant de quitter
     save_controls() # Sauvegarder les contrôles
+    release_gpu_resources() # Libérer les ressources OpenGL
     pygame.quit() # Quitter le jeu
 
 # Sauvegarder les contrôles dans le fichier de configuration
@@ -2797,6 +2890,7 @@ def save_controls():
         "controls": controls,
         "master_volume": master_volume,
         "slider_value": slider_value,
+        "graphics": graphics,
     }
 
     with open(config_file, "w") as f:
@@ -2804,7 +2898,7 @@ def save_controls():
 
 # Charger les contrôles depuis le fichier de configuration
 def load_controls():
-    global controls, master_volume, slider_value # Variables globales
+    global controls, master_volume, slider_value, graphics # Variables globales
 
     # S'assurer que controls a une valeur par défaut
     if controls is None:
@@ -2820,10 +2914,12 @@ def load_controls():
                 if "master_volume" in config_data: # Vérifier si le volume existe dans le fichier de configuration
                     master_volume = config_data["master_volume"] # Charger le volume
                     # Appliquer le volume aux effets sonores
-                    if "walk_sound_effect" in globals():
+                    if walk_sound_effect is not None:
                         walk_sound_effect.set_volume(master_volume) # Appliquer le volume aux effets sonores
                 if "slider_value" in config_data: # Vérifier si la valeur du slider existe dans le fichier de configuration
                     slider_value = config_data["slider_value"] # Charger la valeur du slider
+                if "graphics" in config_data: # Vérifier si les paramètres graphiques existent
+                    graphics = {**DEFAULT_GRAPHICS, **config_data["graphics"]} # Charger les paramètres graphiques
         except Exception as e:
             print(f"Erreur lors du chargement des contrôles: {e}") # Afficher une erreur si le chargement des contrôles échoue
             # En cas d'erreur, utiliser les contrôles par défaut
@@ -2831,6 +2927,38 @@ def load_controls():
 
     return controls  # Retourner les contrôles chargés ou par défaut
 
+# Fonction pour initialiser Pygame, l'icône, le son de marche, les polices et les résolutions
+def init_pygame():
+    global walk_sound_effect, font, version_font, resolutions  # Variables globales
+    pygame.init()  # Initialiser Pygame
+    pygame.mixer.init()  # Initialiser le module mixer de Pygame
+
+    # Charger et définir l'icône de la fenêtre
+    icon = pygame.image.load(
+        os.sep.join(["src", "icons", "icon.png"])
+    )  # Charger l'icône de la fenêtre
+    pygame.display.set_icon(icon)  # Définir l'icône de la fenêtre
+
+    walk_sound_effect = pygame.mixer.Sound(
+        os.sep.join(["src", "media", "walk.mp3"])
+    )  # Charger le son de marche
+    walk_sound_effect.set_volume(0.5)  # Définir le volume du son de marche
+
+    font = pygame.font.Font(None, 24)  # Réduit de 36 à 24
+    try:  # Essayer de charger la police par défaut
+        version_font = pygame.font.Font(None, 24)  # Police par défaut
+    except:  # En cas d'erreur
+        print(
+            "Erreur lors de l'initialisation de la police, utilisation de la police par défaut."
+        )
+        version_font = pygame.font.SysFont(
+            "Arial", 24
+        )  # Si 'None' échoue, utiliser Arial comme fallback
+
+    resolutions = size_screen()  # Récupération des résolutions disponibles
+
+
 # Démarrer le menu principal
 if __name__ == "__main__":
+    init_pygame() # Initialiser Pygame et les ressources de l'interface
     main_menu() # Démarrer le menu principal